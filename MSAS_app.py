@@ -1,16 +1,35 @@
+import os
+
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
-import matplotlib.pyplot as plt
+
+import charts
+from aggregates import COUNT_COL, build_cube, count_by, count_table, rollup, slice_cube
+from assets import FONT_STACK, font_face_css, logo_path, preload_links
+from data_reloader import DatasetReloader
+from dataset import DATA_FILE, load_versioned_dataset
+from export import EXPORT_FORMATS, EXPORT_SPLITS, available_formats, export_bytes, export_zip
+from figure_cache import FigureCache
+from filter_index import build_filter_index, filter_positions, select_rows, status_positions
+from header import DEFAULT_CYCLES, HEADER_HEIGHT, HEADER_MODES, animated_header_html, static_header_html
+from profiling import PROFILE_LOG, Profiler, append_jsonl, cache_miss
+from scoring import performance_table, score_table
+from search_index import build_search_index, search_positions
+from shared_data import buffer_ranges, owned_bytes, share_frame
+from sections import register_section, run_section, section_labels
+from snapshots import (KEY_COL, SNAPSHOT_COL, progression, signature_counts, snapshot_cubes, snapshot_list, status_moves,
+                       store_version)
+from stats_engine import (compute_moments, correlation_from_moments, cv_from_moments, describe_from_moments,
+                          merge_moments, slice_moments)
 
 
 # --- FONCTION POUR LE TITRE DYNAMIQUE (VERSION ALLER-RETOUR) ---
 def dynamic_typing_header(title, subtitle, title_color="#2F3C7E", cursor_color="#2F3C7E", 
-                          typing_speed=70, delete_speed=40, pause_duration=1500):
+                          typing_speed=70, delete_speed=40, pause_duration=1500,
+                          mode="animated", cycles=DEFAULT_CYCLES):
     """
-    Crée un composant HTML avec un effet de machine à écrire en boucle (aller-retour).
+    Affiche le titre avec un effet de machine à écrire aller-retour (voir header.py).
     
     Args:
         title (str): Le texte du titre principal.
@@ -20,97 +39,16 @@ def dynamic_typing_header(title, subtitle, title_color="#2F3C7E", cursor_color="
         typing_speed (int): Vitesse de frappe en millisecondes.
         delete_speed (int): Vitesse de suppression en millisecondes.
         pause_duration (int): Pause avant de supprimer le texte en millisecondes.
+        mode (str): 'animated' (iframe animée, arrêtée après `cycles` allers-retours)
+            ou 'static' (titre fixe, sans iframe ni script).
+        cycles (int): Nombre d'allers-retours avant l'affichage définitif.
     """
-    title_safe = title.replace("'", "\\'")
-    subtitle_safe = subtitle.replace("'", "\\'")
-
-    html_code = f"""
-    <html>
-    <head>
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@300;400;700&display=swap');
-        body {{ font-family: 'Roboto', sans-serif; background-color: transparent; }}
-        
-        .dynamic-title-container {{
-            min-height: 120px; /* Espace total réservé pour éviter les sauts de page */
-        }}
-        .dynamic-title {{
-            font-size: 2.2rem; font-weight: 700; color: {title_color};
-            border-bottom: 3px solid {title_color};
-            padding-bottom: 10px; margin-bottom: 0.5rem; min-height: 50px;
-        }}
-        .dynamic-subtitle {{
-            font-size: 1.1rem; color: #333333; min-height: 30px;
-        }}
-        .typing-cursor {{
-            display: inline-block; width: 10px; height: 1.7rem;
-            background-color: {cursor_color}; animation: blink 1s step-end infinite;
-            vertical-align: bottom;
-        }}
-        @keyframes blink {{
-            from, to {{ background-color: transparent; }}
-            50% {{ background-color: {cursor_color}; }}
-        }}
-    </style>
-    </head>
-    <body>
-        <div class="dynamic-title-container">
-            <div id="dynamic-title" class="dynamic-title"><span class="typing-cursor"></span></div>
-            <div id="dynamic-subtitle" class="dynamic-subtitle"></div>
-        </div>
-
-        <script>
-            const titleElement = document.getElementById('dynamic-title');
-            const subtitleElement = document.getElementById('dynamic-subtitle');
-            
-            const titleText = '{title_safe}';
-            const subtitleText = '{subtitle_safe}';
-            const typingSpeed = {typing_speed};
-            const deleteSpeed = {delete_speed};
-            const pause = {pause_duration};
-
-            // Fonction pour écrire le texte
-            function typeWriter(element, text, index, callback) {{
-                if (index < text.length) {{
-                    element.innerHTML = text.substring(0, index + 1) + '<span class="typing-cursor"></span>';
-                    setTimeout(() => typeWriter(element, text, index + 1, callback), typingSpeed);
-                }} else {{
-                    if (callback) setTimeout(callback, pause); // Pause avant d'exécuter la suite
-                }}
-            }}
-
-            // Fonction pour effacer le texte
-            function deleteWriter(element, callback) {{
-                let text = element.innerHTML.replace('<span class="typing-cursor"></span>', '');
-                let index = text.length;
-                if (index > 0) {{
-                    element.innerHTML = text.substring(0, index - 1) + '<span class="typing-cursor"></span>';
-                    setTimeout(() => deleteWriter(element, callback), deleteSpeed);
-                }} else {{
-                    if (callback) callback();
-                }}
-            }}
-
-            // La boucle infinie qui orchestre l'animation
-            function startAnimationCycle() {{
-                typeWriter(titleElement, titleText, 0, () => {{
-                    deleteWriter(titleElement, () => {{
-                        subtitleElement.innerHTML = '<span class="typing-cursor"></span>'; // Met le curseur sur la 2e ligne
-                        typeWriter(subtitleElement, subtitleText, 0, () => {{
-                            deleteWriter(subtitleElement, () => {{
-                                startAnimationCycle(); // Recommence le cycle
-                            }});
-                        }});
-                    }});
-                }});
-            }}
-
-            document.addEventListener('DOMContentLoaded', startAnimationCycle);
-        </script>
-    </body>
-    </html>
-    """
-    st.components.v1.html(html_code, height=180)
+    if mode == "static":
+        st.markdown(static_header_html(title, subtitle, title_color), unsafe_allow_html=True)
+        return
+    html_code = animated_header_html(title, subtitle, title_color, cursor_color,
+                                     typing_speed, delete_speed, pause_duration, cycles)
+    st.components.v1.html(html_code, height=HEADER_HEIGHT)
 
 # --- CONFIGURATION DE LA PAGE ---
 st.set_page_config(
@@ -123,14 +61,15 @@ st.set_page_config(
 
 
 # --- INJECTION DU CSS PROFESSIONNEL ---
-professional_styling = """
+# Polices servies localement (voir assets.py), ou police système si elles n'ont pas été récupérées
+professional_styling = preload_links() + """
 <style>
-@import url('https://fonts.googleapis.com/css2?family=Roboto:wght@300;400;700&display=swap');
+""" + font_face_css() + """
 :root {
     --primary-color: #2F3C7E; --secondary-color: #1E2757; --accent-color: #FBEAEB;
     --background-color: #F0F2F6; --text-color: #333333; --light-text-color: #FFFFFF;
 }
-html, body, [class*="st-"] { font-family: 'Roboto', sans-serif; }
+html, body, [class*="st-"] { font-family: """ + FONT_STACK + """; }
 .main { background-color: var(--background-color); }
 [data-testid="stSidebar"] { background: linear-gradient(200deg, var(--primary-color), var(--secondary-color)); }
 [data-testid="stSidebar"] div, [data-testid="stSidebar"] span, [data-testid="stSidebar"] p, 
@@ -141,6 +80,9 @@ html, body, [class*="st-"] { font-family: 'Roboto', sans-serif; }
 [data-testid="stTabs"] button { background-color: transparent; color: var(--text-color); border: none; border-bottom: 2px solid transparent; transition: all 0.3s ease; }
 [data-testid="stTabs"] button:hover { background-color: #E0E0E0; border-bottom: 2px solid var(--primary-color); }
 [data-testid="stTabs"] button[aria-selected="true"] { background-color: var(--primary-color); color: var(--light-text-color); font-weight: 700; border-bottom: 2px solid var(--primary-color); box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
+[data-testid="stRadio"] div[role="radiogroup"] label { padding: 6px 12px; border-bottom: 2px solid transparent; transition: all 0.3s ease; }
+[data-testid="stRadio"] div[role="radiogroup"] label:has(input:checked) { background-color: var(--primary-color); border-bottom: 2px solid var(--primary-color); border-radius: 5px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
+[data-testid="stRadio"] div[role="radiogroup"] label:has(input:checked) p { color: var(--light-text-color); font-weight: 700; }
 [data-testid="stHeading"] h2 { border-left: 5px solid var(--primary-color); padding-left: 15px; color: var(--primary-color); }
 [data-testid="stMetric"] { background-color: #FFFFFF; border: 1px solid #E0E0E0; border-radius: 10px; padding: 20px; box-shadow: 0 4px 12px rgba(0,0,0,0.08); transition: all 0.2s ease-in-out; }
 [data-testid="stMetric"]:hover { transform: scale(1.03); box-shadow: 0 6px 16px rgba(0,0,0,0.12); }
@@ -156,101 +98,121 @@ def apply_professional_theme(fig):
     return fig
 
 
+def profile_sent_elements(profiler):
+    """
+    Attribue chaque élément envoyé au navigateur (type, octets sérialisés) à l'étape profilée en cours.
+
+    S'appuie sur `ScriptRunContext._enqueue`, attribut privé de Streamlit :
+    s'il n'existe pas (autre version), les éléments ne sont pas mesurés et
+    le profil ne donne que les durées.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None or not hasattr(ctx, '_enqueue'):
+        return
+    # Le contexte survit aux reruns : on enveloppe toujours la fonction d'origine
+    enqueue = ctx.__dict__.setdefault('_unprofiled_enqueue', ctx._enqueue)
+    if not profiler.enabled:
+        ctx._enqueue = enqueue
+        return
+
+    def profiled_enqueue(msg):
+        if msg.WhichOneof('type') == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+            profiler.record_element(msg.delta.new_element.WhichOneof('type'), msg.ByteSize())
+        enqueue(msg)
+
+    ctx._enqueue = profiled_enqueue
+
+
 # --- CHARGEMENT ET PRÉPARATION DES DONNÉES ---
+def build_shared_state(path):
+    # Lecture via le cache Parquet : le CSV n'est réingéré que si son contenu change.
+    # Un seul exemplaire en lecture seule, partagé sans copie par toutes les sessions,
+    # avec ses dérivés : cube Région × District × Type × Statut, moments des colonnes
+    # numériques par Région × District, index des filtres et de la recherche
+    data, data_version = load_versioned_dataset(path)
+    data = share_frame(data)
+    return {
+        'data': data,
+        'data_version': data_version,
+        'cube': build_cube(data),
+        'moments': compute_moments(data),
+        'filter_index': build_filter_index(data),
+        'search_index': build_search_index(data),
+    }
+
+
+@st.cache_resource
+def load_reloader():
+    # État partagé reconstruit en arrière-plan quand le CSV change (voir data_reloader.py)
+    cache_miss()
+    return DatasetReloader(DATA_FILE, build_shared_state).start()
+
+
 @st.cache_data
-def load_data():
-    try:
-        data = pd.read_csv('Final_Full__type_colonnes_Cleaned.csv')
-    except UnicodeDecodeError:
-        data = pd.read_csv('Final_Full__type_colonnes_Cleaned.csv', encoding='latin1')
-
-    data['Type'] = data['NOM DES STRUCTURES SANITAIRES CIBLES'].apply(
-        lambda x: 'Hôpital' if 'hopital' in str(x).lower()
-        else 'Centre de Santé' if 'centre de santé' in str(x).lower()
-        else 'Poste de Santé' if 'poste de santé' in str(x).lower()
-        else 'EPS' if 'eps' in str(x).lower()
-        else 'Autre')
-    
-    #data['Région'] = data['Région'].str.strip().str.upper()
-    # Création de colonnes dérivées pour l'analyse
-    data['Type'] = data['NOM DES STRUCTURES SANITAIRES CIBLES'].apply(lambda x: 'Hôpital' if 'hopital' in str(x).lower() else 'Centre de Santé' if 'centre de santé' in str(x).lower() else 'Poste de Santé' if 'poste de santé' in str(x).lower() else 'EPS' if 'eps' in str(x).lower() else 'Autre')
-    data['Région'] = data['Région'].str.strip().str.upper()
-    data['Statut Convention'] = np.where(data['Nb Conventions Signées'] > 0, 'Signée', 'Non Signée')
-    return data
+def load_snapshot_timeline(version):
+    # Cubes datés de tous les instantanés, relus uniquement lorsqu'un instantané est ajouté (`version`)
+    cache_miss()
+    return snapshot_list(), snapshot_cubes()
 
 
-# --- FONCTION POUR LE GRAPHIQUE ANIME ---
-def create_animated_summary_chart(nb_signe, nb_non_signe):
-    """
-    Crée un graphique à barres animé qui montre la transition des décomptes
-    des conventions signées vs non signées.
-    """
-    total = nb_signe + nb_non_signe
-    if total == 0:
-        # Affiche un message si aucune donnée n'est disponible
-        fig = go.Figure()
-        fig.update_layout(
-            title="Aucune donnée à afficher pour les filtres actuels",
-            xaxis = {"visible": False},
-            yaxis = {"visible": False},
-            annotations=[{
-                "text": "Veuillez changer votre sélection de filtres.",
-                "xref": "paper", "yref": "paper", "showarrow": False, "font": {"size": 16}
-            }]
-        )
-        return fig
-
-    # Créer les "frames" de l'animation, de 0% à 100%
-    animation_steps = []
-    for step in range(101):
-        progress = step / 100.0
-        animation_steps.append({'Statut': '✅ Signée', 'Nombre': nb_signe * progress, 'Étape': step})
-        animation_steps.append({'Statut': '❌ Non Signée', 'Nombre': nb_non_signe * progress, 'Étape': step})
-    anim_df = pd.DataFrame(animation_steps)
-
-    # Créer le graphique à barres animé avec Plotly Express
-    fig = px.bar(
-        anim_df,
-        x='Statut', y='Nombre', color='Statut',
-        animation_frame='Étape',
-        color_discrete_map={'✅ Signée': '#28a745', '❌ Non Signée': '#dc3545'},
-        labels={'Nombre': 'Nombre de Structures', 'Statut': 'Statut de la Convention'},
-        text='Nombre'
-    )
-    
-    # Personnalisation de l'animation et du style
-    fig.update_yaxes(range=[0, max(1, nb_signe, nb_non_signe) * 1.15])
-    fig.update_traces(texttemplate='%{y:.0f}', textposition='outside')
-    fig.update_layout(
-        title_text="Répartition Animée des Conventions Signées vs Non Signées",
-        showlegend=False,
-        updatemenus=[{
-            'type': 'buttons',
-            'buttons': [
-                {'label': '▶️ Rejouer', 'method': 'animate', 'args': [None, {'frame': {'duration': 20, 'redraw': True}, 'fromcurrent': True, 'transition': {'duration': 5}}]},
-            ],
-            'direction': 'left', 'pad': {'r': 10, 't': 87}, 'showactive': False,
-            'x': 0.1, 'xanchor': 'right', 'y': 0, 'yanchor': 'top'
-        }]
-    )
-    return fig
+@st.cache_resource
+def load_figure_cache():
+    # Cache de figures partagé par toutes les sessions, borné en octets (LRU)
+    cache_miss()
+    return FigureCache()
 
-# --- CORPS DE L'APPLICATION ---
-df = load_data()
 
+@st.cache_resource(max_entries=16, show_spinner="Préparation de l'export...")
+def build_export(_rows, data_version, filter_key, search_term, search_prefix, fmt, split):
+    # Calculé une seule fois par (données, filtre, recherche, format, découpage), à la demande
+    cache_miss()
+    by = EXPORT_SPLITS[split]
+    return export_bytes(_rows, fmt) if by is None else export_zip(_rows, by, fmt)
+
+
+# --- CORPS DE L'APPLICATION ---
+# Profilage du rerun (?profile=1 ou MSAS_PROFILE=1), affiché dans la barre latérale
+profile_enabled = st.query_params.get('profile') == '1' or os.environ.get('MSAS_PROFILE') == '1'
+profiler = Profiler(profile_enabled, session=getattr(get_script_run_ctx(), 'session_id', None))
+profile_sent_elements(profiler)
+profiler.step('chargement')
+reloader = profiler.call('load_reloader', load_reloader, cached=True)
+# Lu une seule fois : tout le rerun utilise le même état, même s'il est remplacé entre-temps
+shared_state = reloader.current()
+df, cube, moments = shared_state['data'], shared_state['cube'], shared_state['moments']
+filter_index, search_index = shared_state['filter_index'], shared_state['search_index']
+data_version = shared_state['data_version']
+# Signale à la session que les données ont été rechargées depuis son dernier rerun
+seen_version = st.session_state.get('shared_state_version')
+if seen_version is not None and seen_version != shared_state['version']:
+    st.toast(f"Données mises à jour (version {shared_state['version']}).", icon="🔄")
+st.session_state['shared_state_version'] = shared_state['version']
+figure_cache = profiler.call('load_figure_cache', load_figure_cache, cached=True)
+show_admin_panel = st.query_params.get('admin') == '1' or os.environ.get('MSAS_ADMIN') == '1'
+# Titre fixe (sans animation) pour les postes modestes : ?header=static ou MSAS_HEADER=static
+header_mode = st.query_params.get('header', os.environ.get('MSAS_HEADER', 'animated'))
+header_mode = header_mode if header_mode in HEADER_MODES else 'animated'
+
+profiler.step('barre latérale')
 with st.sidebar:
     # ... (le code de la sidebar reste le même, avec la description en bas) ...
     #st.image("https://upload.wikimedia.org/wikipedia/commons/f/fd/Flag_of_Senegal.svg", width=100)
-    st.image("https://www.africa-newsroom.com/files/large/3b2d908cc6dc36e/200/150", width=480)
+    sidebar_logo = logo_path()
+    if sidebar_logo is not None:
+        st.image(sidebar_logo, width=480)
     st.title("Dashboard DPRS / Division Partenariat")
     st.divider()
     st.header("Filtres de Navigation")
-    all_regions = ["Toutes les régions"] + sorted(df['Région'].unique())
+    all_regions = ["Toutes les régions"] + filter_index['regions']
     selected_region = st.selectbox("Filtrer par Région:", all_regions)
-    if selected_region == "Toutes les régions": filtered_df = df; districts = ["Tous les districts"] + sorted(df['District Sanitaire'].unique())
-    else: filtered_df = df[df['Région'] == selected_region]; districts = ["Tous les districts"] + sorted(filtered_df['District Sanitaire'].unique())
+    region_filter = None if selected_region == "Toutes les régions" else selected_region
+    if region_filter is None: districts = ["Tous les districts"] + filter_index['districts']
+    else: districts = ["Tous les districts"] + filter_index['districts_by_region'][region_filter]
     selected_district = st.selectbox("Filtrer par District:", districts)
-    if selected_district != "Tous les districts": filtered_df = filtered_df[filtered_df['District Sanitaire'] == selected_district]
+    district_filter = None if selected_district == "Tous les districts" else selected_district
+    filtered_df = select_rows(df, filter_index, region_filter, district_filter)
+    cube_view = slice_cube(cube, region_filter, district_filter)
+    profiler.set_rows(len(filtered_df))
     st.divider()
     st.header("Description")
     st.markdown(""" Assurer la Couverture Sanitaire Universel (CSU) des Artisans sur l’étendue du territoire national enfin de leur faciliter l’accès aux soins médicales.
@@ -261,9 +223,11 @@ with st.sidebar:
 
 
 # --- TITRE PRINCIPAL ET KPIS (AVEC EFFET DYNAMIQUE ALLER-RETOUR) ---
+profiler.step('en-tête')
 dynamic_typing_header(
     title="🏥 Dashboard d'Analyse Approfondie de la CSU Sénégal (Protection Contre le risque Financier - MNSA du Sénegal)",
     subtitle="DIRECTION DE LA PLANIFICATION, DE LA RECHERCHE ET DES STATISTIQUES (DPRS) / DIVISION PARTENARIAT",
+    mode=header_mode,
 )
 st.markdown("Visualisation détaillée des structures sanitaires conventionnées au Sénégal.")
 
@@ -293,9 +257,15 @@ st.markdown("Visualisation détaillée des structures sanitaires conventionnées
 # st.title("🏥 Dashboard d'Analyse Approfondie de la CSU Sénégal (Protection Contre le risque Financier - MNSA du Sénegal)")
 # st.markdown("Visualisation détaillée des structures sanitaires conventionnées au Sénégal.")
 
-total_structures = len(filtered_df)
-regions_couvertes = len(filtered_df['Région'].unique())
-districts_sanitaires = len(filtered_df['District Sanitaire'].unique())
+# Tous les indicateurs sont dérivés du cube filtré (quelques centaines de groupes)
+profiler.step('indicateurs', rows=len(cube_view))
+type_counts = count_by(cube_view, 'Type')
+region_counts = count_by(cube_view, 'Région')
+district_counts = count_by(cube_view, 'District Sanitaire')
+
+total_structures = int(cube_view[COUNT_COL].sum())
+regions_couvertes = len(region_counts)
+districts_sanitaires = len(district_counts)
 moy_structures_region = total_structures / regions_couvertes if regions_couvertes > 0 else 0
 
 kpi1, kpi2, kpi3, kpi4 = st.columns(4)
@@ -308,11 +278,9 @@ kpi4.metric("Moy. Structures/Région", f"{moy_structures_region:.1f}")
 kpi5, kpi6, kpi7, kpi8 = st.columns(4)
 
 # Calculs pour nouveaux KPI
-type_counts = filtered_df['Type'].value_counts()
 type_dominant = type_counts.index[0] if len(type_counts) > 0 else "N/A"
 pourcentage_dominant = (type_counts.iloc[0] / total_structures * 100) if total_structures > 0 else 0
 
-region_counts = filtered_df['Région'].value_counts()
 region_max = region_counts.index[0] if len(region_counts) > 0 else "N/A"
 structures_max = region_counts.iloc[0] if len(region_counts) > 0 else 0
 
@@ -323,75 +291,52 @@ kpi6.metric("Région avec le + de Structures", f"{region_max} ({structures_max})
 kpi7.metric("Moy. Districts/Région", f"{moy_districts_region:.1f}")
 kpi8.metric("Taux de Couverture", f"{(regions_couvertes/14)*100:.1f}%" if regions_couvertes > 0 else "0%")
 
-# --- NAVIGATION PRINCIPALE PAR ONGLETS ---
-tab_overview, tab_conventions, tab_stats, tab_geo, tab_deepdive, tab_density, tab_comparative = st.tabs([
-    "📊 Vue d'Ensemble", 
-
-    "✍️ Suivi des Conventions",
-    "📈 Analyses Statistiques Avancées",
-    "🌍 Distribution Géographique", 
-
-    "🔬 Analyse Approfondie & Données",
-    "🗺️ Distribution & Densité", 
-    "🔍 Analyse Comparative & Types",
-
-    
-])
+# --- NAVIGATION PRINCIPALE PAR SECTIONS ---
+# Seule la section sélectionnée est calculée à chaque rerun (voir sections.py)
+filter_key = (region_filter, district_filter)
+sections_memo = st.session_state.setdefault('sections_memo', {})
+# Nombre de districts affichés par page dans l'explorateur hiérarchique
+EXPLORER_PAGE_SIZE = 10
+
+# --- AGRÉGATS PARTAGÉS ENTRE LES ONGLETS (dérivés du cube filtré) ---
+district_analysis = rollup(cube_view, ['Région', 'District Sanitaire'])[['Région', 'District Sanitaire', COUNT_COL]]
+region_agg = district_analysis.groupby('Région', observed=True).agg(
+    Nb_Structures=(COUNT_COL, 'sum'),
+    Nb_Districts=('District Sanitaire', 'nunique')
+).reset_index()
+region_agg['Structures_par_District'] = (region_agg['Nb_Structures'] / region_agg['Nb_Districts']).round(2)
+
+region_type_counts = rollup(cube_view, ['Région', 'Type'])[['Région', 'Type', COUNT_COL]].rename(columns={COUNT_COL: 'Nombre'})
+region_type_pivot = region_type_counts.pivot_table(index='Région', columns='Type', values='Nombre',
+                                                   aggfunc='sum', fill_value=0, observed=True)
+type_dominant_by_region = region_type_counts.loc[region_type_counts.groupby('Région', observed=True)['Nombre'].idxmax(), ['Région', 'Type']]
+type_dominant_by_region = type_dominant_by_region.rename(columns={'Type': 'Type_Dominant'})
 
 # == ONGELET 1: VUE D'ENSEMBLE ===============================================
-with tab_overview:
+@register_section('overview', "📊 Vue d'Ensemble", position=0)
+def section_overview(memo):
     st.header("Aperçu Global de la Répartition")
     col1, col2 = st.columns((2, 3))
     
     with col1:
         st.subheader("Répartition par Type de Structure")
-        type_counts = filtered_df['Type'].value_counts().reset_index()
-        type_counts.columns = ['Type', 'Nombre']
-        fig_pie = px.pie(
-            type_counts, names='Type', values='Nombre', hole=0.4,
-            color_discrete_sequence=px.colors.qualitative.Pastel,
-            title="Proportion des Types de Structures"
-        )
-        fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+        type_counts_df = type_counts.reset_index()
+        type_counts_df.columns = ['Type', 'Nombre']
+        fig_pie = memo.figure('fig_pie', charts.create_type_pie_chart, type_counts_df)
         st.plotly_chart(fig_pie, use_container_width=True)
 
     with col2:
         st.subheader("Vue Hiérarchique : Région > District")
-        fig_treemap = px.treemap(
-            filtered_df, path=[px.Constant("Sénégal"), 'Région', 'District Sanitaire'],
-            color='Région', color_discrete_sequence=px.colors.qualitative.Alphabet,
-            title="Explorez la hiérarchie des structures"
-        )
-        fig_treemap.update_layout(margin = dict(t=50, l=25, r=25, b=25))
+        fig_treemap = memo.figure('fig_treemap', charts.create_region_treemap_chart, district_analysis, COUNT_COL)
         st.plotly_chart(fig_treemap, use_container_width=True)
 
 # == ONGELET 2: DISTRIBUTION & DENSITÉ ========================================
-with tab_density:
+@register_section('density', "🗺️ Distribution & Densité", position=5)
+def section_density(memo):
     st.header("Analyse de la Distribution et de la Densité Géographique")
 
     st.subheader("Analyse de la Densité par Région")
-    # Préparation des données pour le graphique à bulles
-    region_agg = filtered_df.groupby('Région').agg(
-        Nb_Structures=('NOM DES STRUCTURES SANITAIRES CIBLES', 'count'),
-        Nb_Districts=('District Sanitaire', 'nunique')
-    ).reset_index()
-    region_agg['Structures_par_District'] = (region_agg['Nb_Structures'] / region_agg['Nb_Districts']).round(2)
-
-    fig_bubble = px.scatter(
-        region_agg,
-        x="Nb_Districts",
-        y="Nb_Structures",
-        size="Structures_par_District",
-        color="Région",
-        hover_name="Région",
-        size_max=60,
-        title="Densité des Structures : Nb Structures vs. Nb Districts par Région"
-    )
-    fig_bubble.update_layout(
-        xaxis_title="Nombre de Districts Sanitaires",
-        yaxis_title="Nombre Total de Structures",
-        legend_title="Régions"
-    )
+    fig_bubble = memo.figure('fig_bubble', charts.create_density_bubble_chart, region_agg)
     st.plotly_chart(fig_bubble, use_container_width=True)
 
     st.markdown("---")
@@ -399,44 +344,28 @@ with tab_density:
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Distribution des Structures par District")
-        district_analysis = filtered_df.groupby(['Région', 'District Sanitaire']).size().reset_index(name='Nb_Structures')
-        fig_violin = px.violin(
-            district_analysis, x='Région', y='Nb_Structures',
-            title='Dispersion et Densité du Nb de Structures par District',
-            color='Région', box=True, points="all"
-        )
-        fig_violin.update_layout(showlegend=False, xaxis_tickangle=-45)
+        fig_violin = memo.figure('fig_violin', charts.create_district_violin_chart, district_analysis)
         st.plotly_chart(fig_violin, use_container_width=True)
 
     with col2:
         st.subheader("Classement des Districts")
-        district_counts = filtered_df['District Sanitaire'].value_counts().reset_index()
-        district_counts.columns = ['District', 'Nb_Structures']
+        district_counts_df = district_counts.reset_index()
+        district_counts_df.columns = ['District', 'Nb_Structures']
         
         st.success("🏆 Top 5 des Districts les Mieux Dotés")
-        st.dataframe(district_counts.head(5), use_container_width=True, hide_index=True)
+        st.dataframe(district_counts_df.head(5), use_container_width=True, hide_index=True)
         
         st.warning("📉 Top 5 des Districts les Moins Dotés")
-        st.dataframe(district_counts.tail(5), use_container_width=True, hide_index=True)
+        st.dataframe(district_counts_df.tail(5), use_container_width=True, hide_index=True)
 
 
 # == ONGELET 3: ANALYSE COMPARATIVE & TYPES =================================
-with tab_comparative:
+@register_section('comparative', "🔍 Analyse Comparative & Types", position=6)
+def section_comparative(memo):
     st.header("Analyse Comparative et Focus sur les Types de Structures")
 
     st.subheader("Composition des Structures par Région")
-    region_type_counts = filtered_df.groupby(['Région', 'Type']).size().reset_index(name='Nombre')
-    fig_stacked_bar = px.bar(
-        region_type_counts,
-        x='Région',
-        y='Nombre',
-        color='Type',
-        title='Mix des Types de Structures par Région',
-        labels={'Nombre': 'Nombre de Structures', 'Région': 'Région'},
-        barmode='stack',
-        text_auto=True
-    )
-    fig_stacked_bar.update_layout(xaxis={'categoryorder':'total descending'})
+    fig_stacked_bar = memo.figure('fig_stacked_bar', charts.create_type_stacked_bar_chart, region_type_counts)
     st.plotly_chart(fig_stacked_bar, use_container_width=True)
     
     st.markdown("---")
@@ -444,58 +373,38 @@ with tab_comparative:
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Matrice Région vs. Type")
-        pivot = pd.crosstab(filtered_df['Région'], filtered_df['Type'])
-        fig_heatmap = px.imshow(
-            pivot, labels=dict(x="Type de Structure", y="Région", color="Nombre"),
-            aspect="auto", text_auto=True, color_continuous_scale='Cividis_r',
-            title="Concentration par Type"
-        )
+        fig_heatmap = memo.figure('fig_heatmap', charts.create_region_type_heatmap_chart, region_type_pivot,
+                           "Type de Structure", 'Cividis_r', "Concentration par Type")
         st.plotly_chart(fig_heatmap, use_container_width=True)
     
     with col2:
         st.subheader("Focus Hiérarchique sur les Types")
-        fig_sunburst = px.sunburst(
-            filtered_df,
-            path=['Région', 'Type'],
-            title='Explorez la Répartition Région -> Type',
-            color='Région'
-        )
+        fig_sunburst = memo.figure('fig_sunburst', charts.create_region_type_sunburst_chart, region_type_counts)
         st.plotly_chart(fig_sunburst, use_container_width=True)
 
 # == ONGELET 2: DISTRIBUTION GÉOGRAPHIQUE ========================================
-with tab_geo:
+@register_section('geo', "🌍 Distribution Géographique", position=3)
+def section_geo(memo):
     st.header("Analyse de la Distribution Géographique")
     
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Structures par Région")
-        region_counts = filtered_df['Région'].value_counts().reset_index()
-        region_counts.columns = ['Région', 'Nombre']
-        fig_bar_region = px.bar(
-            region_counts.sort_values('Nombre'),
-            x='Nombre', y='Région', orientation='h',
-            labels={'Région': 'Région', 'Nombre': 'Nombre de Structures'},
-            color='Nombre', color_continuous_scale='Viridis',
-            height=500, text='Nombre'
-        )
+        region_counts_df = region_counts.reset_index()
+        region_counts_df.columns = ['Région', 'Nombre']
+        fig_bar_region = memo.figure('fig_bar_region', charts.create_region_bar_chart, region_counts_df)
         st.plotly_chart(fig_bar_region, use_container_width=True)
 
     with col2:
         st.subheader("Distribution des Structures par District")
-        district_analysis = filtered_df.groupby(['Région', 'District Sanitaire']).size().reset_index(name='Nb_Structures')
-        fig_box = px.box(
-            district_analysis, x='Région', y='Nb_Structures',
-            title='Dispersion du Nombre de Structures par District',
-            color='Région', points="all"
-        )
-        fig_box.update_layout(showlegend=False, xaxis_tickangle=-45)
+        fig_box = memo.figure('fig_box', charts.create_district_box_chart, district_analysis)
         st.plotly_chart(fig_box, use_container_width=True)
 
     st.subheader("Analyse des Écarts de Couverture")
     expander_gap = st.expander("Afficher l'analyse des régions sous et sur-représentées (basée sur toutes les données)")
     with expander_gap:
         gap_col1, gap_col2 = st.columns(2)
-        region_counts_all = df['Région'].value_counts()
+        region_counts_all = count_by(cube, 'Région')
         with gap_col1:
             threshold_low = region_counts_all.quantile(0.25)
             sous_representees = region_counts_all[region_counts_all <= threshold_low].reset_index()
@@ -510,24 +419,19 @@ with tab_geo:
             st.dataframe(performantes, use_container_width=True)
 
 # == ONGELET 3: ANALYSE APPROFONDIE & DONNÉES =================================
-with tab_deepdive:
+@register_section('deepdive', "🔬 Analyse Approfondie & Données", position=4)
+def section_deepdive(memo):
     st.header("Analyse Croisée et Exploration des Données")
 
     st.subheader("Matrice de Corrélation : Région vs. Type de Structure")
-    pivot = pd.crosstab(filtered_df['Région'], filtered_df['Type'])
-    fig_heatmap = px.imshow(
-        pivot, labels=dict(x="Type", y="Région", color="Nombre"),
-        aspect="auto", text_auto=True, color_continuous_scale='Blues',
-        title="Concentration des Types de Structures par Région"
-    )
+    fig_heatmap = memo.figure('fig_heatmap', charts.create_region_type_heatmap_chart, region_type_pivot,
+                       "Type", 'Blues', "Concentration des Types de Structures par Région")
     st.plotly_chart(fig_heatmap, use_container_width=True)
     
     st.subheader("Tableau de Bord Comparatif par Région")
-    region_analysis = filtered_df.groupby('Région').agg(
-        Nb_Districts=('District Sanitaire', 'nunique'),
-        Type_Dominant=('Type', lambda x: x.mode()[0] if not x.mode().empty else 'N/A'),
-        Total_Structures=('NOM DES STRUCTURES SANITAIRES CIBLES', 'count')
-    ).reset_index()
+    region_analysis = region_agg[['Région', 'Nb_Districts']].merge(
+        type_dominant_by_region, on='Région'
+    ).merge(region_agg[['Région', 'Nb_Structures']].rename(columns={'Nb_Structures': 'Total_Structures'}), on='Région')
     region_analysis['Structures_par_District'] = (region_analysis['Total_Structures'] / region_analysis['Nb_Districts']).round(2)
     
     st.markdown("Utilisez ce tableau pour comparer la performance et la composition de chaque région.")
@@ -537,50 +441,69 @@ with tab_deepdive:
     )
 
 #ONGELET 2: SUIVI DES CONVENTIONS AVEC ANIMATION =======================
-with tab_conventions:
+@register_section('conventions', "✍️ Suivi des Conventions", position=1)
+def section_conventions(memo):
     st.header("Suivi Détaillé du Statut des Conventions")
     
     # Calcul des nombres pour l'animation
-    statut_counts = filtered_df['Statut Convention'].value_counts()
+    statut_counts = count_by(cube_view, 'Statut Convention')
     nb_signe = statut_counts.get('Signée', 0)
     nb_non_signe = statut_counts.get('Non Signée', 0)
 
     # Affichage du graphique animé
-    st.plotly_chart(create_animated_summary_chart(nb_signe, nb_non_signe), use_container_width=True)
+    fig_animated = memo.figure('fig_animated', charts.create_animated_summary_chart, nb_signe, nb_non_signe)
+    st.plotly_chart(fig_animated, use_container_width=True)
     
     st.markdown("---")
     st.subheader("Explorateur Hiérarchique des Structures")
-    regions_in_view = sorted(filtered_df['Région'].unique())
-    if not regions_in_view:
+    # Effectifs Région × District × Statut en une seule passe sur le cube filtré
+    district_status = memo('explorer_counts', count_table, cube_view,
+                           ['Région', 'District Sanitaire'], 'Statut Convention')
+    if district_status.empty:
         st.warning("Aucune donnée disponible pour les filtres sélectionnés.")
     else:
-        for region in regions_in_view:
-            with st.expander(f"**Région : {region}**"):
-                region_df = filtered_df[filtered_df['Région'] == region]
-                districts_in_region = sorted(region_df['District Sanitaire'].unique())
-                for district in districts_in_region:
+        for region, region_districts in district_status.groupby(level='Région', observed=True, sort=True):
+            nb_signees = int(region_districts.get('Signée', pd.Series(dtype=int)).sum())
+            nb_non_signees = int(region_districts.get('Non Signée', pd.Series(dtype=int)).sum())
+            label = (f"**Région : {region}** — {len(region_districts)} district(s), "
+                     f"{nb_signees} signée(s), {nb_non_signees} non signée(s)")
+            with st.expander(label):
+                # Les listes ne sont construites que si l'utilisateur les demande
+                if not st.toggle("Afficher les structures par district", key=f"explorer_open_{region}"):
+                    st.caption("Activez l'affichage pour charger la liste des structures de la région.")
+                    continue
+                districts_in_region = region_districts.index.get_level_values('District Sanitaire')
+                nb_pages = -(-len(districts_in_region) // EXPLORER_PAGE_SIZE)
+                page = 1
+                if nb_pages > 1:
+                    page = st.number_input(f"Page (sur {nb_pages})", min_value=1, max_value=nb_pages,
+                                           value=1, step=1, key=f"explorer_page_{region}")
+                page_start = (page - 1) * EXPLORER_PAGE_SIZE
+                for district in districts_in_region[page_start:page_start + EXPLORER_PAGE_SIZE]:
                     st.markdown(f"#### District Sanitaire : {district}")
-                    district_df = region_df[region_df['District Sanitaire'] == district]
                     col_signe, col_non_signe = st.columns(2)
                     with col_signe:
                         st.markdown("##### ✅ Structures avec Convention Signée")
-                        structures_signees = district_df[district_df['Statut Convention'] == 'Signée']
+                        structures_signees = df[['NOM DES STRUCTURES SANITAIRES CIBLES']].take(
+                            status_positions(filter_index, region, district, 'Signée'))
                         if structures_signees.empty:
                             st.info("Aucune structure avec convention signée.")
                         else:
-                            st.dataframe(structures_signees[['NOM DES STRUCTURES SANITAIRES CIBLES']], hide_index=True, use_container_width=True)
+                            st.dataframe(structures_signees, hide_index=True, use_container_width=True)
                     with col_non_signe:
                         st.markdown("##### ❌ Structures sans Convention Signée")
-                        structures_non_signees = district_df[district_df['Statut Convention'] == 'Non Signée']
+                        structures_non_signees = df[['NOM DES STRUCTURES SANITAIRES CIBLES']].take(
+                            status_positions(filter_index, region, district, 'Non Signée'))
                         if structures_non_signees.empty:
                             st.success("Toutes les structures ciblées ont signé.")
                         else:
-                             st.dataframe(structures_non_signees[['NOM DES STRUCTURES SANITAIRES CIBLES']], hide_index=True, use_container_width=True)
+                             st.dataframe(structures_non_signees, hide_index=True, use_container_width=True)
                     st.markdown("---")
 
 
 # == ONGELET 6: ANALYSES STATISTIQUES AVANCÉES =============================
-with tab_stats:
+@register_section('stats', "📈 Analyses Statistiques Avancées", position=2)
+def section_stats(memo):
     st.header("📈 Analyses Statistiques Avancées et Indicateurs de Performance")
     st.markdown("Section dédiée aux analyses quantitatives approfondies des conventions et performances régionales.")
     
@@ -596,16 +519,21 @@ with tab_stats:
     
     # Calculs seulement si des colonnes numériques sont trouvées
     if numeric_cols:
+        region_totals = rollup(cube_view, 'Région')
+        # Moments par district de la sélection, fusionnés à la demande (voir stats_engine.py)
+        view_moments = memo('view_moments', slice_moments, moments, region_filter, district_filter)
+        selection_moments = memo('selection_moments', merge_moments, view_moments)
+        selection_summary = memo('selection_summary', describe_from_moments, selection_moments)
         stats_col1, stats_col2 = st.columns(2)
         
         with stats_col1:
             st.markdown("**📋 Résumé Statistique des Variables Clés**")
-            stats_summary = filtered_df[numeric_cols].describe().round(2)
+            stats_summary = memo('stats_summary', lambda: selection_summary.round(2))
             st.dataframe(stats_summary, use_container_width=True)
             
             # Calculs d'indicateurs personnalisés
-            total_conventions_signees = filtered_df['Nb Conventions Signées'].sum()
-            total_conventions_non_signees = filtered_df['Nb Conventions Non Signées'].sum()
+            total_conventions_signees = cube_view['Nb Conventions Signées'].sum()
+            total_conventions_non_signees = cube_view['Nb Conventions Non Signées'].sum()
             total_conventions = total_conventions_signees + total_conventions_non_signees
             taux_signature_global = (total_conventions_signees / total_conventions * 100) if total_conventions > 0 else 0
             
@@ -614,29 +542,16 @@ with tab_stats:
             - **Taux de signature global:** {taux_signature_global:.1f}%
             - **Total conventions signées:** {int(total_conventions_signees):,}
             - **Total conventions non signées:** {int(total_conventions_non_signees):,}
-            - **Valeur totale:** {filtered_df['Valeurs'].sum():,.0f}
+            - **Valeur totale:** {cube_view['Valeurs'].sum():,.0f}
             """)
         
         with stats_col2:
             st.markdown("**📈 Distribution des Taux de Signature par Région**")
-            region_perf = filtered_df.groupby('Région').agg({
-                'Nb Conventions Signées': 'sum',
-                'Nb Conventions Non Signées': 'sum'
-            }).reset_index()
+            region_perf = region_totals[['Région', 'Nb Conventions Signées', 'Nb Conventions Non Signées']].copy()
             region_perf['Taux_Signature'] = (region_perf['Nb Conventions Signées'] / 
                                             (region_perf['Nb Conventions Signées'] + region_perf['Nb Conventions Non Signées']) * 100).fillna(0)
             
-            fig_taux = px.bar(
-                region_perf.sort_values('Taux_Signature'),
-                x='Taux_Signature', y='Région', orientation='h',
-                title='Taux de Signature des Conventions par Région (%)',
-                labels={'Taux_Signature': 'Taux de Signature (%)', 'Région': 'Région'},
-                color='Taux_Signature',
-                color_continuous_scale='RdYlGn',
-                text='Taux_Signature'
-            )
-            fig_taux.update_traces(texttemplate='%{text:.1f}%', textposition='inside')
-            fig_taux.update_layout(height=400)
+            fig_taux = memo.figure('fig_taux', charts.create_signature_rate_chart, region_perf)
             st.plotly_chart(fig_taux, use_container_width=True)
         
         st.markdown("---")
@@ -648,19 +563,9 @@ with tab_stats:
         
         with corr_col1:
             # Calcul de la matrice de corrélation
-            correlation_matrix = filtered_df[numeric_cols].corr()
+            correlation_matrix = memo('correlation_matrix', correlation_from_moments, selection_moments)
             
-            fig_corr = px.imshow(
-                correlation_matrix,
-                labels=dict(color="Corrélation"),
-                x=correlation_matrix.columns,
-                y=correlation_matrix.columns,
-                color_continuous_scale='RdBu_r',
-                aspect="auto",
-                title="Matrice de Corrélation entre Variables Quantitatives",
-                text_auto='.2f'
-            )
-            fig_corr.update_layout(height=500)
+            fig_corr = memo.figure('fig_corr', charts.create_correlation_chart, correlation_matrix)
             st.plotly_chart(fig_corr, use_container_width=True)
         
         with corr_col2:
@@ -669,7 +574,7 @@ with tab_stats:
             # Identification des corrélations les plus fortes
             corr_pairs = correlation_matrix.unstack().reset_index()
             corr_pairs.columns = ['Var1', 'Var2', 'Corrélation']
-            corr_pairs = corr_pairs[corr_pairs['Var1'] != corr_pairs['Var2']]
+            corr_pairs = corr_pairs[corr_pairs['Var1'] != corr_pairs['Var2']].copy()
             corr_pairs['abs_corr'] = corr_pairs['Corrélation'].abs()
             corr_df = corr_pairs.sort_values('abs_corr', ascending=False).drop_duplicates(subset=['abs_corr'])
             
@@ -688,26 +593,8 @@ with tab_stats:
         # === SECTION 3: ANALYSES DE PERFORMANCE PAR RÉGION ===
         st.subheader("🏆 Tableau de Bord de Performance par Région")
         
-        # Calcul des métriques de performance
-        performance_df = filtered_df.groupby('Région').agg(
-            Valeurs_sum=('Valeurs', 'sum'),
-            Nb_Conventions_Signees_sum=('Nb Conventions Signées', 'sum'),
-            Nb_Conventions_Non_Signees_sum=('Nb Conventions Non Signées', 'sum'),
-            Part_Conventions_Signees_mean=('Part Conventions Signées', 'mean'),
-            Nb_Structures_count=('NOM DES STRUCTURES SANITAIRES CIBLES', 'count')
-        ).reset_index().round(2)
-        
-        # Ajout d'indicateurs calculés
-        total_conv = performance_df['Nb_Conventions_Signees_sum'] + performance_df['Nb_Conventions_Non_Signees_sum']
-        performance_df['Efficacite_Signature'] = (performance_df['Nb_Conventions_Signees_sum'] / total_conv * 100).fillna(0)
-        performance_df['Valeur_Moyenne_Structure'] = (performance_df['Valeurs_sum'] / performance_df['Nb_Structures_count']).fillna(0)
-        
-        # Classement et scoring
-        performance_df['Score_Global'] = (
-            performance_df['Efficacite_Signature'].rank(pct=True) * 0.4 +
-            performance_df['Valeur_Moyenne_Structure'].rank(pct=True) * 0.3 +
-            performance_df['Part_Conventions_Signees_mean'].rank(pct=True) * 0.3
-        ) * 100
+        # Calcul des métriques de performance et scoring (voir scoring.py)
+        performance_df = memo('performance_df', lambda: score_table(performance_table(region_totals, ['Région'])))
         
         performance_df = performance_df.sort_values('Score_Global', ascending=False)
         
@@ -737,32 +624,13 @@ with tab_stats:
         
         with viz_col1:
             st.markdown("**📈 Analyse de la Distribution des Valeurs**")
-            fig_hist = px.histogram(
-                filtered_df, x='Valeurs', nbins=30,
-                title='Distribution des Valeurs des Conventions',
-                labels={'Valeurs': 'Valeur des Conventions', 'count': 'Fréquence'},
-                color_discrete_sequence=['#1f77b4']
-            )
-            fig_hist.add_vline(x=filtered_df['Valeurs'].mean(), line_dash="dash", 
-                              line_color="red", annotation_text=f"Moyenne: {filtered_df['Valeurs'].mean():.0f}")
-            fig_hist.add_vline(x=filtered_df['Valeurs'].median(), line_dash="dash", 
-                              line_color="green", annotation_text=f"Médiane: {filtered_df['Valeurs'].median():.0f}")
+            fig_hist = memo.figure('fig_hist', charts.create_values_histogram_chart, filtered_df,
+                                   selection_summary.loc['mean', 'Valeurs'], selection_summary.loc['50%', 'Valeurs'])
             st.plotly_chart(fig_hist, use_container_width=True)
         
         with viz_col2:
             st.markdown("**🎯 Scatter Plot: Efficacité vs Valeur Moyenne**")
-            fig_scatter = px.scatter(
-                performance_df, 
-                x='Valeur_Moyenne_Structure', 
-                y='Efficacite_Signature',
-                size='Nb_Structures_count',
-                color='Score_Global',
-                hover_name='Région',
-                title='Performance: Efficacité de Signature vs Valeur Moyenne par Structure',
-                labels={'Valeur_Moyenne_Structure': 'Valeur Moyenne par Structure',
-                       'Efficacite_Signature': 'Efficacité de Signature (%)'},
-                color_continuous_scale='Viridis'
-            )
+            fig_scatter = memo.figure('fig_scatter', charts.create_performance_scatter_chart, performance_df)
             st.plotly_chart(fig_scatter, use_container_width=True)
         
         # === SECTION 5: ANALYSES DE VARIANCE ===
@@ -772,47 +640,92 @@ with tab_stats:
         
         with variance_col1:
             st.markdown("**📊 Box Plot: Distribution des Parts de Conventions Signées**")
-            fig_box_region = px.box(
-                filtered_df, x='Région', y='Part Conventions Signées',
-                title='Dispersion des Parts de Conventions Signées par Région',
-                color='Région'
-            )
-            fig_box_region.update_layout(showlegend=False, xaxis_tickangle=-45)
+            fig_box_region = memo.figure('fig_box_region', charts.create_signed_share_box_chart, filtered_df)
             st.plotly_chart(fig_box_region, use_container_width=True)
         
         with variance_col2:
             st.markdown("**📈 Analyse des Coefficients de Variation**")
-            cv_analysis = filtered_df.groupby('Région')[numeric_cols].agg(['mean', 'std']).round(3)
-            cv_data = []
-            
-            for region in cv_analysis.index:
-                for col in numeric_cols:
-                    mean_val = cv_analysis.loc[region, (col, 'mean')]
-                    std_val = cv_analysis.loc[region, (col, 'std')]
-                    if mean_val is not None and mean_val != 0:
-                        cv = (std_val / abs(mean_val)) * 100
-                        cv_data.append({'Région': region, 'Variable': col, 'CV (%)': cv})
-            
-            cv_df = pd.DataFrame(cv_data)
+            # Moyennes et écarts-types seulement : pas d'esquisses de quantiles à fusionner
+            cv_df = memo('cv_analysis', lambda: cv_from_moments(merge_moments(view_moments, ['Région'], sketches=False)))
             
             key_vars = ['Part Conventions Signées', 'Valeurs', 'Nb Conventions Signées']
             cv_filtered = cv_df[cv_df['Variable'].isin(key_vars)]
             
-            fig_cv = px.bar(
-                cv_filtered, x='CV (%)', y='Région', color='Variable',
-                title='Coefficients de Variation par Région (Stabilité)',
-                orientation='h', barmode='group'
-            )
+            fig_cv = memo.figure('fig_cv', charts.create_cv_chart, cv_filtered)
             st.plotly_chart(fig_cv, use_container_width=True)
             
         st.markdown("---")
         st.markdown("**📋 Téléchargements et Rapports**")
         
         dl_col1, dl_col2, dl_col3 = st.columns(3)
-        
-        
+
+
+# == ONGELET 8: PROGRESSION DES CONVENTIONS ENTRE INSTANTANÉS ===============
+@register_section('progression', "📅 Progression des Conventions", position=7)
+def section_progression(memo):
+    st.header("Progression des Conventions entre Missions")
+    version = store_version()
+    snapshot_info, timeline_cubes = load_snapshot_timeline(version)
+    if len(snapshot_info) < 2:
+        st.info("L'historique compte moins de deux instantanés. Ajoutez chaque nouvel extrait avec "
+                "`python -m snapshots add extrait.csv --label \"Mission ...\" --date AAAA-MM-JJ`.")
+        return
+    snapshot_labels = {f"{row.id} — {row.label} ({row.date})": row.id for row in snapshot_info.itertuples()}
+    labels = list(snapshot_labels)
+    start_col, end_col = st.columns(2)
+    start_id = snapshot_labels[start_col.selectbox("Instantané de départ", labels[:-1], index=len(labels) - 2,
+                                                   key="progression_start")]
+    end_id = snapshot_labels[end_col.selectbox("Instantané d'arrivée", labels, index=len(labels) - 1,
+                                               key="progression_end")]
+    if end_id <= start_id:
+        st.warning("L'instantané d'arrivée doit être postérieur à celui de départ.")
+        return
+
+    # Sans filtre : par région ; une région sélectionnée : par district
+    by = 'Région' if region_filter is None else 'District Sanitaire'
+    # Une seule entrée par résultat, remplacée quand les instantanés comparés changent
+    selection = (version, start_id, end_id)
+    progress = memo('progression', progression, start_id, end_id, by, key=selection)
+    moves = memo('status_moves', status_moves, start_id, end_id, key=selection)
+    if region_filter is not None:
+        progress = progress[progress['Région'] == region_filter]
+        moves = moves[moves['Région'] == region_filter]
+    if district_filter is not None:
+        progress = progress[progress['District Sanitaire'] == district_filter]
+        moves = moves[moves['District Sanitaire'] == district_filter]
+
+    nb_signees = moves['Statut Convention'].eq('Signée').sum()
+    prog_col1, prog_col2, prog_col3 = st.columns(3)
+    prog_col1.metric("Structures Signées", f"{int(progress['Signées (fin)'].sum())}",
+                     f"{int(progress['Δ Signées'].sum()):+d}")
+    prog_col2.metric("Non Signée → Signée", f"{nb_signees}")
+    prog_col3.metric("Signée → Non Signée", f"{len(moves) - nb_signees}")
+
+    fig_progress = memo.figure('fig_progress', charts.create_signature_progression_chart, progress, by,
+                               key=selection)
+    st.plotly_chart(fig_progress, use_container_width=True)
+
+    timeline = signature_counts(slice_cube(timeline_cubes, region_filter, district_filter))
+    fig_timeline = memo.figure('fig_timeline', charts.create_signature_timeline_chart, timeline, key=version)
+    st.plotly_chart(fig_timeline, use_container_width=True)
+
+    st.subheader("Structures ayant changé de statut")
+    if moves.empty:
+        st.info("Aucun changement de statut entre ces deux instantanés.")
+    else:
+        st.dataframe(moves.drop(columns=KEY_COL).rename(columns={SNAPSHOT_COL: 'Changement constaté'}),
+                     hide_index=True, use_container_width=True)
+
+section_keys = {label: key for key, label in section_labels().items()}
+selected_section = st.radio(
+    "Section d'analyse", list(section_keys), horizontal=True, key="section", label_visibility="collapsed"
+)
+profiler.step(f"section {section_keys[selected_section]}", rows=len(filtered_df))
+run_section(section_keys[selected_section], sections_memo, filter_key, figure_cache, data_version)
+
 
 # --- SYNTHÈSE & RECOMMANDATIONS ---
+profiler.step('synthèse', rows=len(region_agg))
 st.header("💡 Synthèse Analytique & Pistes d'Action")
 st.markdown("Cette section résume les observations clés issues des données pour guider la stratégie.")
 
@@ -848,15 +761,19 @@ with rec_col3:
 
 
 # --- EXPLORATION DES DONNÉES BRUTES ---
+profiler.step('explorateur')
 with st.expander("📋 Explorer, rechercher et télécharger les données détaillées"):
     search_term = st.text_input("Rechercher dans les données...", key="search")
+    search_prefix = st.checkbox("Rechercher uniquement en début de mot", key="search_prefix")
 
     if search_term:
-        search_df = filtered_df[
-            filtered_df.apply(lambda row: row.astype(str).str.contains(search_term, case=False).any(), axis=1)
-        ]
+        search_df = df.take(search_positions(
+            search_index, search_term, filter_positions(filter_index, region_filter, district_filter),
+            prefix=search_prefix
+        ))
     else:
         search_df = filtered_df
+    profiler.set_rows(len(search_df))
 
     st.dataframe(
         search_df[['Région', 'District Sanitaire', 'NOMBRE DE DISTRICTS SANITAIRES VISITES','NOM DES STRUCTURES SANITAIRES CIBLES', 'Valeurs',	'Nb Conventions Signées',
@@ -864,11 +781,24 @@ with st.expander("📋 Explorer, rechercher et télécharger les données détai
         height=400, hide_index=True, use_container_width=True
     )
 
-    st.download_button(
-        label="💾 Télécharger les données affichées",
-        data=search_df.to_csv(index=False, sep=';').encode('utf-8'),
-        file_name='donnees_filtrees.csv', mime='text/csv'
-    )
+    # L'export n'est sérialisé que sur demande, puis servi depuis le cache
+    export_col1, export_col2, export_col3 = st.columns(3)
+    format_labels = {EXPORT_FORMATS[fmt]['label']: fmt for fmt in available_formats(len(search_df))}
+    export_format = format_labels[export_col1.selectbox("Format d'export", list(format_labels), key="export_format")]
+    export_split = export_col2.selectbox("Découpage", list(EXPORT_SPLITS), key="export_split")
+    export_key = (data_version, filter_key, search_term, search_prefix, export_format, export_split)
+    if export_col3.button("📦 Préparer l'export", use_container_width=True):
+        st.session_state['export_request'] = export_key
+    if st.session_state.get('export_request') == export_key:
+        export_data = profiler.call('export', build_export, search_df, *export_key, cached=True)
+        is_zip = EXPORT_SPLITS[export_split] is not None
+        extension = 'zip' if is_zip else EXPORT_FORMATS[export_format]['extension']
+        st.download_button(
+            label="💾 Télécharger les données affichées",
+            data=export_data,
+            file_name=f'donnees_filtrees.{extension}',
+            mime='application/zip' if is_zip else EXPORT_FORMATS[export_format]['mime']
+        )
 
 
 # # --- STYLE CSS PERSONNALISÉ ---
@@ -886,6 +816,59 @@ with st.expander("📋 Explorer, rechercher et télécharger les données détai
 
 
 
+# --- PANNEAU D'ADMINISTRATION (?admin=1 ou MSAS_ADMIN=1) ---
+profiler.step('administration')
+if show_admin_panel or profiler.enabled:
+    # Mémoire propre à la session : tout ce qu'elle détient hors du jeu de données partagé
+    session_bytes = owned_bytes([filtered_df, search_df, st.session_state.to_dict()], buffer_ranges(df))
+if show_admin_panel:
+    with st.sidebar.expander("⚙️ Administration"):
+        st.markdown("**Cache des figures**")
+        cache_stats = figure_cache.stats()
+        admin_col1, admin_col2 = st.columns(2)
+        admin_col1.metric("Succès", cache_stats['hits'])
+        admin_col2.metric("Échecs", cache_stats['misses'])
+        st.markdown(f"""
+        - **Taux de succès :** {cache_stats['hit_rate'] * 100:.1f}%
+        - **Figures en cache :** {cache_stats['entries']}
+        - **Occupation :** {cache_stats['bytes'] / 1024:,.0f} / {cache_stats['max_bytes'] / 1024:,.0f} Ko
+        - **Évictions :** {cache_stats['evictions']}
+        - **Octets servis :** {cache_stats['bytes_served'] / 1024:,.0f} Ko
+        - **Version des données :** `{data_version}`
+        """)
+        st.markdown("**Rechargement des données**")
+        loaded_at = pd.Timestamp(shared_state['loaded_at'], unit='s', tz='UTC').strftime('%Y-%m-%d %H:%M:%S UTC')
+        st.markdown(f"""
+        - **Version chargée :** {shared_state['version']} ({reloader.reloads} rechargement(s))
+        - **Chargée le :** {loaded_at}, en {shared_state['seconds']:.1f} s
+        """)
+        if reloader.last_error:
+            st.warning(f"Dernier rechargement en échec, version {shared_state['version']} conservée : {reloader.last_error}")
+        if st.button("Recharger les données"):
+            reloader.request()
+        st.markdown("**Mémoire**")
+        memory_col1, memory_col2 = st.columns(2)
+        memory_col1.metric("Jeu partagé", f"{df.memory_usage(deep=True).sum() / 1024 ** 2:,.1f} Mo")
+        memory_col2.metric("Cette session", f"{session_bytes / 1024:,.0f} Ko")
+        if st.button("Vider le cache des figures"):
+            figure_cache.clear()
+
+
 # --- FOOTER ---
+profiler.step('pied de page')
 st.markdown("---")
 st.markdown("<div style='text-align: center; color: #666;'><p>Dashboard d'Analyse CSU Sénégal - MSAS</p><p><small>Version 4.4 - Propulsé par Streamlit avec style</small></p></div>", unsafe_allow_html=True)
+
+
+# --- PANNEAU DE PROFILAGE (?profile=1 ou MSAS_PROFILE=1) ---
+if profiler.enabled:
+    profile_record = profiler.finish()
+    profile_record.update(filter=filter_key, section=section_keys[selected_section], data_version=data_version,
+                          session_bytes=session_bytes)
+    append_jsonl(profile_record)
+    with st.sidebar.expander("⏱️ Profilage du rerun"):
+        profile_col1, profile_col2 = st.columns(2)
+        profile_col1.metric("Durée totale", f"{profile_record['seconds'] * 1000:,.0f} ms")
+        profile_col2.metric("Mémoire de la session", f"{session_bytes / 1024:,.0f} Ko")
+        st.dataframe(profiler.to_frame(), hide_index=True, use_container_width=True)
+        st.caption(f"Journal JSON lines : `{PROFILE_LOG}`")
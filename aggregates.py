@@ -0,0 +1,70 @@
+"""
+Agrégats Région × District × Type × Statut du jeu de données des conventions.
+
+Les agrégats sont additifs (effectifs et sommes) : des agrégats partiels
+calculés sur des morceaux du fichier se combinent exactement par une simple
+somme groupée, ce qui permet de les construire de façon incrémentale.
+
+Le cube complet sert de source unique aux indicateurs et graphiques du
+dashboard : appliquer un filtre revient à découper puis ré-agréger le cube,
+pour un coût proportionnel au nombre de groupes et non au nombre de lignes.
+"""
+import numpy as np
+import pandas as pd
+
+
+CUBE_DIMENSIONS = ['Région', 'District Sanitaire', 'Type', 'Statut Convention']
+CUBE_MEASURES = ['Valeurs', 'Nb Conventions Signées', 'Nb Conventions Non Signées',
+                 'Part Structures Ciblées', 'Part Conventions Signées', 'Part Conventions Non Signées']
+COUNT_COL = 'Nb_Structures'
+
+
+def aggregate_chunk(data):
+    """Calcule l'agrégat (effectif + sommes des mesures) d'un DataFrame préparé."""
+    measures = [col for col in CUBE_MEASURES if col in data.columns]
+    grouped = data.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False)
+    cube = grouped[measures].sum()
+    cube.insert(0, COUNT_COL, grouped.size())
+    return cube.reset_index()
+
+
+def merge_aggregates(parts):
+    """Combine plusieurs agrégats partiels en un seul agrégat."""
+    parts = [part for part in parts if part is not None and len(part)]
+    if not parts:
+        return pd.DataFrame(columns=CUBE_DIMENSIONS + [COUNT_COL] + CUBE_MEASURES)
+    combined = pd.concat(parts, ignore_index=True)
+    return combined.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False).sum().reset_index()
+
+
+def build_cube(data):
+    """Construit le cube d'agrégats complet d'un jeu de données préparé."""
+    return aggregate_chunk(data)
+
+
+def slice_cube(cube, region=None, district=None):
+    """Restreint le cube à une région et/ou un district (None = pas de filtre)."""
+    mask = np.ones(len(cube), dtype=bool)
+    if region is not None:
+        mask &= (cube['Région'] == region).to_numpy()
+    if district is not None:
+        mask &= (cube['District Sanitaire'] == district).to_numpy()
+    return cube[mask]
+
+
+def rollup(cube, by):
+    """Ré-agrège le cube (effectifs et sommes) sur les dimensions `by`."""
+    columns = [COUNT_COL] + [col for col in CUBE_MEASURES if col in cube.columns]
+    return cube.groupby(by, observed=True)[columns].sum().reset_index()
+
+
+def count_by(cube, by):
+    """Nombre de structures par modalité de `by`, trié par ordre décroissant (équivalent de value_counts)."""
+    counts = cube.groupby(by, observed=True)[COUNT_COL].sum()
+    return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+
+def count_table(cube, index, columns):
+    """Tableau croisé des effectifs (`index` en lignes, `columns` en colonnes), équivalent de crosstab."""
+    return cube.pivot_table(index=index, columns=columns, values=COUNT_COL,
+                            aggfunc='sum', fill_value=0, observed=True)
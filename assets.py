@@ -0,0 +1,178 @@
+"""
+Ressources statiques locales (polices et logo) du dashboard.
+
+Aucune page ne doit dépendre d'un hôte externe : les bureaux régionaux sans
+accès Internet attendaient jusqu'à l'expiration des requêtes vers Google
+Fonts avant le premier affichage. Les fichiers sont regroupés dans `static/`,
+servi par Streamlit sous `app/static/` (voir `.streamlit/config.toml`). Les
+URL portent l'empreinte du fichier (`?v=...`) : le serveur les envoie alors
+avec un en-tête de cache d'un an ou plus, et une nouvelle version du fichier
+change l'URL. Tant que les fichiers n'ont pas été récupérés (extraction
+fraîche du dépôt), la page retombe sur une police système, sans logo : aucune
+requête externe n'est faite. Les URL d'origine (Google Fonts et logo distant)
+ne sont reprises que sur demande explicite, avec `MSAS_REMOTE_ASSETS=1`.
+
+Les fichiers sont récupérés une fois, sur une machine connectée, avant le
+déploiement :
+    python -m assets fetch
+"""
+import argparse
+import hashlib
+import os
+import re
+import urllib.request
+from functools import lru_cache
+from io import BytesIO
+
+from PIL import Image
+
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+STATIC_URL = 'app/static'
+
+FONT_FAMILY = 'Roboto'
+FONT_WEIGHTS = (300, 400, 700)
+FONT_STACK = "'Roboto', system-ui, -apple-system, 'Segoe UI', 'Helvetica Neue', Arial, sans-serif"
+LOGO_FILE = 'logo.png'
+# Repli sur les URL d'origine lorsque les fichiers locaux sont absents (désactivé par défaut)
+REMOTE_FALLBACK = os.environ.get('MSAS_REMOTE_ASSETS') == '1'
+
+# Sources de `python -m assets fetch`, et repli lorsque les fichiers locaux sont absents
+FONT_CSS_URL = 'https://fonts.googleapis.com/css2?family=Roboto:wght@300;400;700&display=swap'
+LOGO_URL = 'https://www.africa-newsroom.com/files/large/3b2d908cc6dc36e/200/150'
+# Google Fonts ne sert le WOFF2 qu'aux navigateurs qui l'annoncent
+FETCH_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                    '(KHTML, like Gecko) Chrome/120.0 Safari/537.36')
+
+
+def font_file(weight):
+    return f"fonts/roboto-{weight}.woff2"
+
+
+def _file_hash(path, mtime):
+    # `mtime` fait partie de la clé du cache : un fichier remplacé est réempreinté
+    digest = hashlib.blake2b(digest_size=6)
+    with open(path, 'rb') as source:
+        digest.update(source.read())
+    return digest.hexdigest()
+
+
+_cached_hash = lru_cache(maxsize=32)(_file_hash)
+
+
+def asset_url(name, static_dir=STATIC_DIR):
+    """URL versionnée de `static/<name>`, ou None si le fichier est absent."""
+    path = os.path.join(static_dir, name)
+    if not os.path.isfile(path):
+        return None
+    return f"{STATIC_URL}/{name}?v={_cached_hash(path, os.path.getmtime(path))}"
+
+
+def logo_path(static_dir=STATIC_DIR, remote_fallback=REMOTE_FALLBACK):
+    """
+    Chemin local du logo de la barre latérale ; s'il n'a pas été récupéré,
+    None (pas de logo), ou son URL d'origine avec `remote_fallback=True`.
+    """
+    path = os.path.join(static_dir, LOGO_FILE)
+    if os.path.isfile(path):
+        return path
+    return LOGO_URL if remote_fallback else None
+
+
+def font_face_css(static_dir=STATIC_DIR, remote_fallback=REMOTE_FALLBACK):
+    """
+    Règles @font-face de Roboto pointant vers les fichiers locaux.
+
+    `local('Roboto')` est essayé en premier (police installée sur le poste) ;
+    `font-display: swap` affiche le texte immédiatement en police système.
+    Si aucune police n'a été récupérée : chaîne vide (police système de
+    `FONT_STACK`), ou import de la feuille Google Fonts d'origine avec
+    `remote_fallback=True`.
+    """
+    rules = []
+    for weight in FONT_WEIGHTS:
+        url = asset_url(font_file(weight), static_dir)
+        if url is None:
+            continue
+        rules.append(
+            f"@font-face {{ font-family: '{FONT_FAMILY}'; font-style: normal; font-weight: {weight}; "
+            f"font-display: swap; src: local('{FONT_FAMILY}'), url('{url}') format('woff2'); }}"
+        )
+    if not rules and remote_fallback:
+        return f"@import url('{FONT_CSS_URL}');"
+    return "\n".join(rules)
+
+
+def preload_links(static_dir=STATIC_DIR):
+    """Balises <link rel="preload"> des polices locales, à placer avant le CSS."""
+    links = []
+    for weight in FONT_WEIGHTS:
+        url = asset_url(font_file(weight), static_dir)
+        if url is not None:
+            links.append(f'<link rel="preload" href="{url}" as="font" type="font/woff2" crossorigin>')
+    return "\n".join(links)
+
+
+def _download(url):
+    request = urllib.request.Request(url, headers={'User-Agent': FETCH_USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def _latin_font_urls(css):
+    """URL WOFF2 du sous-ensemble 'latin' (accents français compris) par graisse."""
+    urls = {}
+    for block in re.findall(r'/\*\s*latin\s*\*/\s*@font-face\s*{([^}]*)}', css):
+        weight = re.search(r'font-weight:\s*(\d+)', block)
+        url = re.search(r'url\((https://[^)]+\.woff2)\)', block)
+        if weight and url:
+            urls[int(weight.group(1))] = url.group(1)
+    return urls
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as target:
+        target.write(content)
+    os.replace(tmp_path, path)
+
+
+def fetch_assets(static_dir=STATIC_DIR):
+    """Télécharge les polices et le logo dans `static_dir` ; retourne les fichiers écrits."""
+    written = []
+    font_urls = _latin_font_urls(_download(FONT_CSS_URL).decode('utf-8'))
+    missing = [weight for weight in FONT_WEIGHTS if weight not in font_urls]
+    if missing:
+        raise RuntimeError(f"Graisses introuvables dans la feuille Google Fonts : {missing}")
+    for weight in FONT_WEIGHTS:
+        path = os.path.join(static_dir, font_file(weight))
+        _write(path, _download(font_urls[weight]))
+        written.append(path)
+    # Le logo est réenregistré en PNG quel que soit le format servi par le site d'origine
+    buffer = BytesIO()
+    Image.open(BytesIO(_download(LOGO_URL))).save(buffer, format='PNG')
+    path = os.path.join(static_dir, LOGO_FILE)
+    _write(path, buffer.getvalue())
+    written.append(path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ressources statiques locales du dashboard.")
+    parser.add_argument('command', choices=['fetch', 'status'])
+    parser.add_argument('--static-dir', default=STATIC_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'fetch':
+        for path in fetch_assets(args.static_dir):
+            print(f"{path} ({os.path.getsize(path) / 1024:.1f} Ko)")
+        return
+    names = [font_file(weight) for weight in FONT_WEIGHTS] + [LOGO_FILE]
+    for name in names:
+        fallback = 'absent (repli sur l\'URL d\'origine)' if REMOTE_FALLBACK else 'absent (repli sans réseau)'
+        print(f"{name:<28} {asset_url(name, args.static_dir) or fallback}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark du graphique animé des conventions.
+
+Compare l'implémentation d'origine (101 étapes construites par `px.bar`
+avec `animation_frame`) aux modes de `charts.create_animated_summary_chart` :
+étapes interpolées par NumPy ('frames') et interpolation par le navigateur
+('tween'). Mesure le temps de construction et la taille de la figure
+sérialisée en JSON, c'est-à-dire ce qui est envoyé au navigateur.
+
+Usage :
+    python -m benchmarks.bench_animated_chart
+    python -m benchmarks.bench_animated_chart --repeat 10 --frames 20 50
+"""
+import argparse
+import time
+
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+from charts import create_animated_summary_chart
+
+
+DEFAULT_FRAMES = [30, 101]
+
+
+def legacy_animated_chart(nb_signe, nb_non_signe):
+    """Construction d'origine du graphique animé, conservée comme référence."""
+    animation_steps = []
+    for step in range(101):
+        progress = step / 100.0
+        animation_steps.append({'Statut': '✅ Signée', 'Nombre': nb_signe * progress, 'Étape': step})
+        animation_steps.append({'Statut': '❌ Non Signée', 'Nombre': nb_non_signe * progress, 'Étape': step})
+    anim_df = pd.DataFrame(animation_steps)
+    fig = px.bar(
+        anim_df,
+        x='Statut', y='Nombre', color='Statut',
+        animation_frame='Étape',
+        color_discrete_map={'✅ Signée': '#28a745', '❌ Non Signée': '#dc3545'},
+        labels={'Nombre': 'Nombre de Structures', 'Statut': 'Statut de la Convention'},
+        text='Nombre'
+    )
+    fig.update_yaxes(range=[0, max(1, nb_signe, nb_non_signe) * 1.15])
+    fig.update_traces(texttemplate='%{y:.0f}', textposition='outside')
+    fig.update_layout(
+        title_text="Répartition Animée des Conventions Signées vs Non Signées",
+        showlegend=False,
+        updatemenus=[{
+            'type': 'buttons',
+            'buttons': [
+                {'label': '▶️ Rejouer', 'method': 'animate', 'args': [None, {'frame': {'duration': 20, 'redraw': True}, 'fromcurrent': True, 'transition': {'duration': 5}}]},
+            ],
+            'direction': 'left', 'pad': {'r': 10, 't': 87}, 'showactive': False,
+            'x': 0.1, 'xanchor': 'right', 'y': 0, 'yanchor': 'top'
+        }]
+    )
+    return fig
+
+
+def measure(build, repeat):
+    """Meilleur temps de construction (s) et taille JSON (octets) de la figure."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig = build()
+        best = min(best, time.perf_counter() - start)
+    return best, len(pio.to_json(fig))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--signe', type=int, default=1_250)
+    parser.add_argument('--non-signe', type=int, default=3_480)
+    parser.add_argument('--frames', type=int, nargs='+', default=DEFAULT_FRAMES)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [('origine (101 étapes px)', lambda: legacy_animated_chart(args.signe, args.non_signe))]
+    cases += [
+        (f"frames ({n} étapes)", lambda n=n: create_animated_summary_chart(args.signe, args.non_signe, mode='frames', n_frames=n))
+        for n in args.frames
+    ]
+    cases.append(('tween (navigateur)', lambda: create_animated_summary_chart(args.signe, args.non_signe)))
+
+    base_seconds, base_bytes = measure(cases[0][1], args.repeat)
+    print(f"{'Mode':<26} {'Construction (ms)':>18} {'JSON (octets)':>14} {'gain temps':>11} {'gain taille':>12}")
+    for label, build in cases:
+        seconds, size = (base_seconds, base_bytes) if build is cases[0][1] else measure(build, args.repeat)
+        print(f"{label:<26} {seconds * 1000:>18.1f} {size:>14,} {base_seconds / seconds:>10.1f}x {base_bytes / size:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Benchmark de bout en bout du dashboard sur données synthétiques.
+
+Pour chaque taille, un CSV synthétique au schéma de l'extrait réel (voir
+`synthetic.py`) est écrit dans un répertoire temporaire, puis l'application
+est exécutée sans navigateur par `AppTest`, dans un processus séparé (cache
+et mémoire de pointe propres à chaque taille) :
+- démarrage à froid (ingestion du CSV, cache Parquet, index) ;
+- rerun à chaud ;
+- ouverture de chaque section d'analyse ;
+- recherche dans l'explorateur de données brutes.
+
+Le temps de chaque étape du script (chargement, indicateurs, section,
+synthèse, explorateur...) vient du profileur de `profiling.py`. La mémoire
+résidente de pointe est relevée après chaque exécution ; elle inclut les
+éléments qu'`AppTest` conserve d'une exécution à l'autre.
+
+`--output` enregistre les mesures en JSON ; `--baseline` compare à un
+enregistrement précédent et termine en erreur si une exécution ralentit
+au-delà de `--tolerance`.
+
+Usage :
+    python -m benchmarks.bench_app --sizes 1000 100000
+    python -m benchmarks.bench_app --output bench_app.json
+    python -m benchmarks.bench_app --sizes 1000 100000 --baseline bench_app.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import write_synthetic_csv
+from dataset import DATA_FILE
+from ingestion import peak_rss_mb
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, 'MSAS_app.py')
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000, 10_000_000]
+SEARCH_QUERY = 'poste de sante'
+# En dessous de ce ralentissement absolu (s), un écart n'est pas une régression
+MIN_REGRESSION_SECONDS = 0.25
+
+
+def _last_profile(log_path):
+    with open(log_path, encoding='utf-8') as log:
+        return json.loads(log.readlines()[-1])
+
+
+def run_worker(workdir, output, timeout):
+    """Exécute l'application sur le CSV de `workdir` et écrit les mesures dans `output`."""
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(workdir)
+    log_path = os.environ['MSAS_PROFILE_LOG']
+    runs = []
+
+    def measure(name, action):
+        start = time.perf_counter()
+        at = action()
+        seconds = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(f"{name} : {[exception.message for exception in at.exception]}")
+        profile = _last_profile(log_path)
+        runs.append({
+            'name': name,
+            'seconds': round(seconds, 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'steps': {span['name']: span['seconds'] for span in profile['spans']},
+            'bytes': sum(span['bytes'] for span in profile['spans']),
+        })
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    measure('démarrage à froid', at.run)
+    measure('rerun à chaud', at.run)
+    for label in at.radio(key='section').options:
+        measure(f"section {label}", at.radio(key='section').set_value(label).run)
+    measure('recherche', at.text_input(key='search').input(SEARCH_QUERY).run)
+
+    with open(output, 'w', encoding='utf-8') as target:
+        json.dump(runs, target, ensure_ascii=False)
+
+
+def bench_size(n_rows, timeout, keep=False):
+    """Génère le CSV de `n_rows` lignes et mesure l'application dans un processus séparé."""
+    workdir = tempfile.mkdtemp(prefix=f'msas_bench_{n_rows}_')
+    try:
+        csv_path = os.path.join(workdir, DATA_FILE)
+        start = time.perf_counter()
+        write_synthetic_csv(csv_path, n_rows)
+        generation = time.perf_counter() - start
+        output = os.path.join(workdir, 'runs.json')
+        env = {
+            **os.environ,
+            'PYTHONPATH': os.pathsep.join(filter(None, [REPO_DIR, os.environ.get('PYTHONPATH')])),
+            'MSAS_CACHE_DIR': os.path.join(workdir, '.msas_cache'),
+            'MSAS_PROFILE': '1',
+            'MSAS_PROFILE_LOG': os.path.join(workdir, 'profile.jsonl'),
+        }
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_app', '--worker', workdir, output, '--timeout', str(timeout)],
+            cwd=REPO_DIR, env=env, check=True,
+        )
+        with open(output, encoding='utf-8') as source:
+            runs = json.load(source)
+        return {
+            'rows': n_rows,
+            'csv_mb': round(os.path.getsize(csv_path) / 1024 ** 2, 2),
+            'generation_seconds': round(generation, 2),
+            'runs': runs,
+        }
+    finally:
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def own_step_seconds(run):
+    """Temps de l'étape propre à l'exécution : la section ouverte, l'explorateur, sinon le chargement."""
+    steps = run['steps']
+    if run['name'] == 'recherche':
+        return steps.get('explorateur')
+    if run['name'].startswith('section '):
+        return next((seconds for name, seconds in steps.items() if name.startswith('section ')), None)
+    return steps.get('chargement')
+
+
+def print_result(result):
+    print(f"\n{result['rows']:,} lignes (CSV {result['csv_mb']:,.1f} Mo, généré en {result['generation_seconds']:.1f} s)")
+    print(f"  {'exécution':<48}{'total':>10}{'étape':>10}{'RSS max':>10}{'envoyé':>10}")
+    for run in result['runs']:
+        step = own_step_seconds(run)
+        print(f"  {run['name']:<48}{run['seconds']:>9.3f}s{step or 0:>9.3f}s"
+              f"{run['peak_rss_mb'] or 0:>7.0f} Mo{run['bytes'] / 1024:>7.0f} Ko")
+
+
+def compare(results, baseline, tolerance):
+    """Exécutions plus lentes que la référence au-delà de `tolerance` (liste de messages)."""
+    reference = {(result['rows'], run['name']): run['seconds'] for result in baseline for run in result['runs']}
+    regressions = []
+    for result in results:
+        for run in result['runs']:
+            previous = reference.get((result['rows'], run['name']))
+            if previous is None:
+                continue
+            if run['seconds'] > previous * (1 + tolerance) and run['seconds'] - previous > MIN_REGRESSION_SECONDS:
+                regressions.append(f"{result['rows']:,} lignes, {run['name']} : "
+                                   f"{previous:.3f}s -> {run['seconds']:.3f}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--timeout', type=float, default=3600, help="Durée maximale d'une exécution (s)")
+    parser.add_argument('--output', help="Fichier JSON où enregistrer les mesures")
+    parser.add_argument('--baseline', help="Mesures de référence (JSON produit par --output)")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Ralentissement toléré (0.25 = +25 %%)")
+    parser.add_argument('--keep', action='store_true', help="Conserve les répertoires temporaires")
+    parser.add_argument('--worker', nargs=2, metavar=('WORKDIR', 'OUTPUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker, timeout=args.timeout)
+        return
+
+    results = []
+    for n_rows in args.sizes:
+        result = bench_size(n_rows, args.timeout, args.keep)
+        print_result(result)
+        results.append(result)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as target:
+            json.dump(results, target, ensure_ascii=False, indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as source:
+            regressions = compare(results, json.load(source), args.tolerance)
+        for message in regressions:
+            print(f"RÉGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"\nAucune régression au-delà de {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark de la taille des figures de hiérarchie et de distribution.
+
+Sur un jeu synthétique, compare les figures construites par Plotly Express
+à partir des lignes (version précédente de `charts.py`, conservée ici comme
+référence) à celles de `charts.py`, qui reçoivent des résumés calculés côté
+serveur (`chart_stats.py`) : temps de construction et taille JSON de la
+figure, c'est-à-dire du message envoyé au navigateur.
+
+Les violons et box plots par district sont également mesurés sur les lignes
+(une valeur par structure), le cas où la taille envoyée dépend du nombre de
+structures.
+
+Usage :
+    python -m benchmarks.bench_charts
+    python -m benchmarks.bench_charts --sizes 10000 1000000
+"""
+import argparse
+import time
+
+import plotly.express as px
+
+import charts
+from aggregates import COUNT_COL, build_cube, rollup
+from benchmarks.synthetic import synthetic_dataset
+from dataset import prepare_data
+
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def legacy_treemap(rows):
+    return px.treemap(rows.astype({'Région': str, 'District Sanitaire': str}),
+                      path=[px.Constant("Sénégal"), 'Région', 'District Sanitaire'],
+                      color='Région', color_discrete_sequence=px.colors.qualitative.Alphabet)
+
+
+def legacy_sunburst(rows):
+    return px.sunburst(rows.astype({'Région': str, 'Type': str}), path=['Région', 'Type'], color='Région')
+
+
+def legacy_violin(rows, value):
+    return px.violin(rows, x='Région', y=value, color='Région', box=True, points="all")
+
+
+def legacy_box(rows, value, points="all"):
+    return px.box(rows, x='Région', y=value, color='Région', points=points)
+
+
+def legacy_histogram(rows):
+    return px.histogram(rows, x='Valeurs', nbins=30)
+
+
+def figure_cases(rows):
+    """(nom, figure de référence, figure de charts.py) : fonctions sans argument."""
+    cube = build_cube(rows)
+    districts = rollup(cube, ['Région', 'District Sanitaire'])
+    region_types = rollup(cube, ['Région', 'Type']).rename(columns={COUNT_COL: 'Nombre'})
+    rows = rows.assign(Région=rows['Région'].astype(str))
+    share = 'Part Conventions Signées'
+    return [
+        ('treemap', lambda: legacy_treemap(rows), lambda: charts.create_region_treemap_chart(districts, COUNT_COL)),
+        ('sunburst', lambda: legacy_sunburst(rows), lambda: charts.create_region_type_sunburst_chart(region_types)),
+        ('violon (lignes)', lambda: legacy_violin(rows, share),
+         lambda: charts._distribution_chart(rows, 'Région', share, '', violin=True)),
+        ('box (lignes)', lambda: legacy_box(rows, share),
+         lambda: charts._distribution_chart(rows, 'Région', share, '')),
+        ('box parts signées', lambda: legacy_box(rows, share, points='outliers'),
+         lambda: charts.create_signed_share_box_chart(rows)),
+        ('histogramme', lambda: legacy_histogram(rows), lambda: charts.create_values_histogram_chart(rows)),
+    ]
+
+
+def measure(build):
+    start = time.perf_counter()
+    figure = build()
+    seconds = time.perf_counter() - start
+    return seconds, len(figure.to_json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    print(f"{'Lignes':>10} {'figure':<20}{'px (s)':>9}{'px (Ko)':>11}{'résumé (s)':>12}{'résumé (Ko)':>13}")
+    for size in args.sizes:
+        rows = prepare_data(synthetic_dataset(size))
+        for name, legacy, current in figure_cases(rows):
+            legacy_seconds, legacy_bytes = measure(legacy)
+            seconds, size_bytes = measure(current)
+            print(f"{size:>10,} {name:<20}{legacy_seconds:>9.2f}{legacy_bytes / 1024:>11,.0f}"
+                  f"{seconds:>12.2f}{size_bytes / 1024:>13,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark de la déduplication des structures (`dedup.structure_ids`).
+
+Un jeu synthétique simule plusieurs missions : une part `--noise` des
+structures est répétée avec une orthographe altérée (espaces, casse,
+accents, article omis, lettre manquante), comme dans un second extrait.
+Pour chaque taille sont affichés le nombre de structures comptées sans
+déduplication (noms bruts distincts par bloc), après déduplication et
+attendu, les orthographes fusionnées, les fusions erronées, la part des
+copies rattachées à leur structure d'origine par type d'altération, et la
+durée de chaque étape.
+
+La comparaison naïve de tous les noms deux à deux (`difflib`, version de
+référence conservée ici) est mesurée sur les `NAIVE_ROWS` premières lignes puis
+extrapolée au nombre de paires de la taille demandée.
+
+Usage :
+    python -m benchmarks.bench_dedup
+    python -m benchmarks.bench_dedup --sizes 100000 1000000 --noise 0.05
+"""
+import argparse
+import difflib
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_dataset
+from classification import NOM_STRUCTURE_COL
+from dataset import prepare_data
+from dedup import BLOCK_COLUMNS, SIMILARITY_THRESHOLD, distinctive_names, normalize_names, structure_ids
+
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+DEFAULT_NOISE = 0.05
+NAIVE_ROWS = 2_000
+
+
+# Localité et numéro en fin de nom synthétique ('Poste de santé de Khor 12' -> 'Khor 12')
+LOCALITY = r'(\S+ \S+)$'
+
+
+def _drop_letter(name, rng):
+    # Lettre manquante dans la localité (avant-dernier mot)
+    words = name.split(' ')
+    locality = words[-2]
+    if len(locality) > 3:
+        position = rng.integers(1, len(locality) - 1)
+        words[-2] = locality[:position] + locality[position + 1:]
+    return ' '.join(words)
+
+
+def _toggle_article(names):
+    # 'de' retiré devant la localité s'il y figure, ajouté sinon
+    with_article = names.str.contains(r' de \S+ \S+$')
+    return names.str.replace(' de ' + LOCALITY, r' \1', regex=True).where(
+        with_article, names.str.replace(' ' + LOCALITY, r' de \1', regex=True))
+
+
+# Altérations observées dans l'extrait réel ; le début du nom, qui détermine
+# le type de la structure, n'est pas modifié.
+ALTERATIONS = {
+    'espaces': lambda names, rng: names.str.replace(' ' + LOCALITY, r'  \1 ', regex=True),
+    'casse': lambda names, rng: names.str.upper(),
+    'accents': lambda names, rng: names.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii'),
+    'article': lambda names, rng: _toggle_article(names),
+    'faute': lambda names, rng: names.map(lambda name: _drop_letter(name, rng)),
+}
+
+
+def noisy_dataset(n_rows, noise, seed=0):
+    """
+    `n_rows` lignes préparées dont une part `noise` sont des copies altérées
+    d'autres lignes.
+
+    Returns:
+        tuple: (données, position de la ligne d'origine de chaque copie,
+        altération de chaque copie).
+    """
+    rng = np.random.default_rng(seed)
+    n_copies = int(n_rows * noise)
+    data = synthetic_dataset(n_rows - n_copies, seed)
+    sources = rng.choice(len(data), size=n_copies, replace=False)
+    kinds = rng.choice(list(ALTERATIONS), size=n_copies)
+    copies = data.iloc[sources].reset_index(drop=True)
+    for kind, alter in ALTERATIONS.items():
+        rows = np.flatnonzero(kinds == kind)
+        names = copies[NOM_STRUCTURE_COL].iloc[rows]
+        copies.loc[rows, NOM_STRUCTURE_COL] = alter(names, rng).to_numpy()
+    data = pd.concat([data, copies], ignore_index=True)
+    return prepare_data(data), sources, kinds
+
+
+def expected_structures(data, n_sources):
+    """Structures attendues : noms d'origine normalisés par bloc, les copies reprenant leur ligne d'origine."""
+    originals = data.iloc[:n_sources]
+    cores = distinctive_names(normalize_names(originals[NOM_STRUCTURE_COL])).to_numpy(zero_copy_only=False)
+    return originals[BLOCK_COLUMNS].assign(core=cores).drop_duplicates().shape[0]
+
+
+def naive_pairs_per_second(data, threshold):
+    """Comparaison naïve (référence) : toutes les paires de noms distincts, ratio `difflib`."""
+    names = pd.unique(data[NOM_STRUCTURE_COL].iloc[:NAIVE_ROWS].str.lower())
+    start = time.perf_counter()
+    pairs = 0
+    for left, right in itertools.combinations(names, 2):
+        difflib.SequenceMatcher(None, left, right).ratio() >= threshold
+        pairs += 1
+    return pairs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--noise', type=float, default=DEFAULT_NOISE)
+    parser.add_argument('--threshold', type=float, default=SIMILARITY_THRESHOLD)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        data, sources, kinds = noisy_dataset(size, args.noise)
+        n_sources = len(data) - len(sources)
+        start = time.perf_counter()
+        ids, report, timings = structure_ids(data, args.threshold)
+        seconds = time.perf_counter() - start
+        ids = ids.to_numpy()
+
+        raw = data[BLOCK_COLUMNS + [NOM_STRUCTURE_COL]].drop_duplicates().shape[0]
+        expected = expected_structures(data, n_sources)
+        found = len(np.unique(ids))
+        linked = ids[n_sources:] == ids[sources]
+        # Deux structures fusionnées à tort : une structure de moins qu'attendu parmi les lignes d'origine
+        original_ids = len(np.unique(ids[:n_sources]))
+        print(f"\n{size:,} lignes ({len(sources):,} copies altérées), seuil {args.threshold}")
+        print(f"  structures : {raw:,} sans déduplication, {found:,} après, {expected:,} attendues "
+              f"({expected - original_ids:,} fusions erronées)")
+        print(f"  orthographes fusionnées : {len(report):,}")
+        print('  copies rattachées : ' + ', '.join(
+            f"{kind} {linked[kinds == kind].mean() * 100:.0f} %" for kind in ALTERATIONS))
+        print(f"  durée : {seconds:.2f} s (" + ', '.join(
+            f"{step} {step_seconds:.2f} s" for step, step_seconds in timings.items()) + ')')
+
+        unique_names = data[NOM_STRUCTURE_COL].nunique()
+        naive_seconds = unique_names * (unique_names - 1) / 2 / naive_pairs_per_second(data, args.threshold)
+        print(f"  comparaison naïve de {unique_names:,} noms deux à deux : ~{naive_seconds / 3600:,.1f} h (estimée)")
+
+
+if __name__ == '__main__':
+    main()
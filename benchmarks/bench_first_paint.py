@@ -0,0 +1,165 @@
+"""
+Benchmark du premier affichage hors ligne.
+
+Deux mesures :
+- `requests` (sans navigateur) exécute l'application avec `AppTest`, ouvre
+  chaque section et relève les URL externes (http/https) présentes dans les
+  éléments rendus : CSS, iframes, images. Hors ligne, chacune de ces URL est
+  une requête qui bloque jusqu'à son expiration.
+- `paint` (nécessite Playwright et Chromium) lance `streamlit run` en local,
+  fait attendre `--stall` secondes toute requête vers un autre hôte, comme
+  dans un bureau régional sans accès Internet, puis relève le premier
+  affichage avec contenu (First Contentful Paint) et le moment où le titre
+  du dashboard est visible.
+
+Pour comparer avec et sans les ressources locales, lancer la mesure sur
+deux copies de l'application (`--app`), par exemple une extraction de la
+version précédente.
+Sans les fichiers de `static/` (`python -m assets fetch`), l'application
+retombe sur une police système sans logo ; `MSAS_REMOTE_ASSETS=1` mesure le
+repli sur les URL d'origine.
+
+Usage :
+    python -m benchmarks.bench_first_paint requests
+    python -m benchmarks.bench_first_paint paint --runs 5 --stall 20
+    python -m benchmarks.bench_first_paint paint --app /tmp/ancien/MSAS_app.py
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+
+DEFAULT_APP = 'MSAS_app.py'
+EXTERNAL_URL = re.compile(r'https?://[^\s"\'()<>\\]+')
+LOCAL_HOSTS = ('localhost', '127.0.0.1')
+READY_SELECTOR = 'text=Dashboard DPRS / Division Partenariat'
+
+
+def external_urls(app_path, timeout=300):
+    """URL externes des éléments rendus, pour chaque section du dashboard."""
+    app_dir = os.path.dirname(os.path.abspath(app_path))
+    previous_dir = os.getcwd()
+    os.chdir(app_dir)
+    try:
+        at = AppTest.from_file(os.path.basename(app_path), default_timeout=timeout)
+        at.run()
+        radios = [radio for radio in at.radio if radio.key == 'section']
+        sections = radios[0].options if radios else [None]
+        found = {}
+        for section in sections:
+            if section is not None:
+                at.radio(key='section').set_value(section).run()
+            for node in [at.main, at.sidebar]:
+                # Le proto de chaque élément contient le CSS, le HTML des iframes et les URL d'images
+                for url in EXTERNAL_URL.findall(str([element.proto for element in _elements(node)])):
+                    found.setdefault(url, section)
+        return found
+    finally:
+        os.chdir(previous_dir)
+
+
+def _elements(node):
+    children = getattr(node, 'children', None)
+    if not children:
+        yield node
+        return
+    for child in children.values():
+        yield from _elements(child)
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def _start_server(app_path, port):
+    command = [sys.executable, '-m', 'streamlit', 'run', os.path.basename(app_path),
+               '--server.headless', 'true', '--server.port', str(port),
+               '--browser.gatherUsageStats', 'false']
+    server = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(app_path)),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Le serveur Streamlit n'a pas démarré")
+
+
+def first_paint(app_path, runs, stall):
+    """Temps (s) du FCP et de l'affichage du titre, page neuve à chaque mesure."""
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        raise SystemExit("La mesure 'paint' nécessite Playwright : pip install playwright && playwright install chromium")
+
+    port = _free_port()
+    server = _start_server(app_path, port)
+    results = {'fcp': [], 'title': [], 'external_requests': []}
+    try:
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch()
+            for _ in range(runs):
+                context = browser.new_context()
+                external = []
+
+                def stall_external(route):
+                    # Réseau coupé : la requête reste sans réponse jusqu'à l'expiration
+                    external.append(route.request.url)
+                    time.sleep(stall)
+                    route.abort('timedout')
+
+                context.route(lambda url: not any(host in url for host in LOCAL_HOSTS), stall_external)
+                page = context.new_page()
+                start = time.perf_counter()
+                page.goto(f'http://127.0.0.1:{port}/', wait_until='commit')
+                page.wait_for_selector(READY_SELECTOR, timeout=(stall + 120) * 1000)
+                results['title'].append(time.perf_counter() - start)
+                fcp = page.evaluate(
+                    "() => (performance.getEntriesByName('first-contentful-paint')[0] || {}).startTime || null")
+                results['fcp'].append(fcp / 1000 if fcp is not None else float('nan'))
+                results['external_requests'].append(len(external))
+                context.close()
+            browser.close()
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('mode', choices=['requests', 'paint'])
+    parser.add_argument('--app', default=DEFAULT_APP)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--stall', type=float, default=20.0,
+                        help="Secondes d'attente des requêtes externes (simulation hors ligne)")
+    args = parser.parse_args()
+
+    if args.mode == 'requests':
+        found = external_urls(args.app)
+        print(f"{len(found)} URL externe(s) dans les éléments rendus")
+        for url, section in found.items():
+            print(f"  {url}  (section {section})")
+        return
+
+    results = first_paint(args.app, args.runs, args.stall)
+    print(f"{'mesure':<22}{'médiane':>10}{'max':>10}")
+    for name in ['fcp', 'title']:
+        print(f"{name:<22}{statistics.median(results[name]):>9.2f}s{max(results[name]):>9.2f}s")
+    print(f"{'requêtes externes':<22}{statistics.median(results['external_requests']):>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""
+Benchmark du titre animé (`dynamic_typing_header`).
+
+Compare le titre d'origine (boucle `setTimeout` infinie réécrivant
+`innerHTML` toutes les 40 à 70 ms) aux modes de `header.py` :
+- octets envoyés au navigateur (message Streamlit sérialisé) au premier
+  rendu puis à chaque rerun, où un message cacheable n'est plus qu'une
+  référence (seuil `global.minCachedMessageSize`) ;
+- réécritures du DOM sur la durée mesurée, calculées depuis la chronologie ;
+- avec `--browser` (Playwright et Chromium requis), temps CPU du moteur de
+  rendu (scripts, styles, mise en page) relevé par le protocole DevTools
+  pendant `--seconds` secondes.
+
+Usage :
+    python -m benchmarks.bench_header
+    python -m benchmarks.bench_header --browser --seconds 60
+"""
+import argparse
+import time
+
+from streamlit import config
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime.forward_msg_cache import create_reference_msg, populate_hash_if_needed
+
+from assets import FONT_STACK, font_face_css
+from header import DEFAULT_CYCLES, HEADER_HEIGHT, animated_header_html, static_header_html
+
+
+TITLE = "🏥 Dashboard d'Analyse Approfondie de la CSU Sénégal (Protection Contre le risque Financier - MNSA du Sénegal)"
+SUBTITLE = "DIRECTION DE LA PLANIFICATION, DE LA RECHERCHE ET DES STATISTIQUES (DPRS) / DIVISION PARTENARIAT"
+TYPING, DELETING, PAUSE = 70, 40, 1500
+DEFAULT_CACHE_THRESHOLD = 10_000  # valeur par défaut de global.minCachedMessageSize
+CPU_METRICS = ['TaskDuration', 'ScriptDuration', 'RecalcStyleDuration', 'LayoutDuration']
+
+
+def legacy_header_html(title, subtitle, title_color="#2F3C7E", cursor_color="#2F3C7E",
+                       typing_speed=TYPING, delete_speed=DELETING, pause_duration=PAUSE):
+    """Document d'origine du titre animé (polices locales), conservé comme référence."""
+    title_safe = title.replace("'", "\\'")
+    subtitle_safe = subtitle.replace("'", "\\'")
+
+    html_code = f"""
+    <html>
+    <head>
+    <style>
+        {font_face_css()}
+        body {{ font-family: {FONT_STACK}; background-color: transparent; }}
+        
+        .dynamic-title-container {{
+            min-height: 120px; /* Espace total réservé pour éviter les sauts de page */
+        }}
+        .dynamic-title {{
+            font-size: 2.2rem; font-weight: 700; color: {title_color};
+            border-bottom: 3px solid {title_color};
+            padding-bottom: 10px; margin-bottom: 0.5rem; min-height: 50px;
+        }}
+        .dynamic-subtitle {{
+            font-size: 1.1rem; color: #333333; min-height: 30px;
+        }}
+        .typing-cursor {{
+            display: inline-block; width: 10px; height: 1.7rem;
+            background-color: {cursor_color}; animation: blink 1s step-end infinite;
+            vertical-align: bottom;
+        }}
+        @keyframes blink {{
+            from, to {{ background-color: transparent; }}
+            50% {{ background-color: {cursor_color}; }}
+        }}
+    </style>
+    </head>
+    <body>
+        <div class="dynamic-title-container">
+            <div id="dynamic-title" class="dynamic-title"><span class="typing-cursor"></span></div>
+            <div id="dynamic-subtitle" class="dynamic-subtitle"></div>
+        </div>
+
+        <script>
+            const titleElement = document.getElementById('dynamic-title');
+            const subtitleElement = document.getElementById('dynamic-subtitle');
+            
+            const titleText = '{title_safe}';
+            const subtitleText = '{subtitle_safe}';
+            const typingSpeed = {typing_speed};
+            const deleteSpeed = {delete_speed};
+            const pause = {pause_duration};
+
+            // Fonction pour écrire le texte
+            function typeWriter(element, text, index, callback) {{
+                if (index < text.length) {{
+                    element.innerHTML = text.substring(0, index + 1) + '<span class="typing-cursor"></span>';
+                    setTimeout(() => typeWriter(element, text, index + 1, callback), typingSpeed);
+                }} else {{
+                    if (callback) setTimeout(callback, pause); // Pause avant d'exécuter la suite
+                }}
+            }}
+
+            // Fonction pour effacer le texte
+            function deleteWriter(element, callback) {{
+                let text = element.innerHTML.replace('<span class="typing-cursor"></span>', '');
+                let index = text.length;
+                if (index > 0) {{
+                    element.innerHTML = text.substring(0, index - 1) + '<span class="typing-cursor"></span>';
+                    setTimeout(() => deleteWriter(element, callback), deleteSpeed);
+                }} else {{
+                    if (callback) callback();
+                }}
+            }}
+
+            // La boucle infinie qui orchestre l'animation
+            function startAnimationCycle() {{
+                typeWriter(titleElement, titleText, 0, () => {{
+                    deleteWriter(titleElement, () => {{
+                        subtitleElement.innerHTML = '<span class="typing-cursor"></span>'; // Met le curseur sur la 2e ligne
+                        typeWriter(subtitleElement, subtitleText, 0, () => {{
+                            deleteWriter(subtitleElement, () => {{
+                                startAnimationCycle(); // Recommence le cycle
+                            }});
+                        }});
+                    }});
+                }});
+            }}
+
+            document.addEventListener('DOMContentLoaded', startAnimationCycle);
+        </script>
+    </body>
+    </html>
+    """
+    return html_code
+
+
+def _message_bytes(msg):
+    """Octets du message complet et de sa référence dans le cache de messages."""
+    populate_hash_if_needed(msg)
+    return msg.ByteSize(), create_reference_msg(msg).ByteSize()
+
+
+def rerun_bytes(sizes, threshold):
+    """Octets envoyés à un rerun : la référence seulement si le message atteint le seuil du cache."""
+    full, reference = sizes
+    return reference if full >= threshold else full
+
+
+def iframe_bytes(document):
+    msg = ForwardMsg()
+    msg.delta.new_element.iframe.srcdoc = document
+    msg.delta.new_element.iframe.height = HEADER_HEIGHT
+    return _message_bytes(msg)
+
+
+def markdown_bytes(body):
+    msg = ForwardMsg()
+    msg.delta.new_element.markdown.body = body
+    msg.delta.new_element.markdown.allow_html = True
+    return _message_bytes(msg)
+
+
+def legacy_dom_writes(seconds):
+    """Réécritures d'`innerHTML` de la boucle d'origine pendant `seconds` secondes."""
+    title, subtitle = len(TITLE), len(SUBTITLE)
+    cycle_writes = 2 * (title + subtitle) + 1
+    cycle_ms = (title + subtitle) * (TYPING + DELETING) + 2 * PAUSE
+    return cycle_writes * seconds * 1000 / cycle_ms
+
+
+def animated_dom_writes(seconds, cycles):
+    """Écritures de nœuds texte du mode animé : bornées par le nombre de cycles."""
+    title, subtitle = len(TITLE), len(SUBTITLE)
+    cycle_ms = (title + subtitle) * (TYPING + DELETING) + 2 * PAUSE
+    total_ms = cycles * cycle_ms + (title + subtitle) * TYPING
+    total_writes = cycles * 2 * (title + subtitle) + (title + subtitle)
+    return total_writes * min(1.0, seconds * 1000 / total_ms), total_ms / 1000
+
+
+def browser_cpu(documents, seconds):
+    """Temps CPU (s) du moteur de rendu pour chaque document, sur `seconds` secondes."""
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        raise SystemExit("L'option --browser nécessite Playwright : pip install playwright && playwright install chromium")
+
+    results = {}
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch()
+        for name, document in documents.items():
+            page = browser.new_page()
+            session = page.context.new_cdp_session(page)
+            session.send('Performance.enable')
+            page.set_content(document)
+            before = {m['name']: m['value'] for m in session.send('Performance.getMetrics')['metrics']}
+            time.sleep(seconds)
+            after = {m['name']: m['value'] for m in session.send('Performance.getMetrics')['metrics']}
+            results[name] = {metric: after[metric] - before[metric] for metric in CPU_METRICS}
+            page.close()
+        browser.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=60.0)
+    parser.add_argument('--cycles', type=int, default=DEFAULT_CYCLES)
+    parser.add_argument('--browser', action='store_true', help="Mesure le CPU dans Chromium (Playwright)")
+    args = parser.parse_args()
+    # Seuil du cache de messages lu dans .streamlit/config.toml
+    config.get_config_options(force_reparse=True)
+
+    documents = {
+        'origine': legacy_header_html(TITLE, SUBTITLE),
+        'animated': animated_header_html(TITLE, SUBTITLE, cycles=args.cycles),
+    }
+    payloads = {
+        'origine': iframe_bytes(documents['origine']),
+        'animated': iframe_bytes(documents['animated']),
+        'static': markdown_bytes(static_header_html(TITLE, SUBTITLE)),
+    }
+    writes, animated_seconds = animated_dom_writes(args.seconds, args.cycles)
+    dom_writes = {'origine': legacy_dom_writes(args.seconds), 'animated': writes, 'static': 0}
+
+    print(f"Titre animé : {args.cycles} cycle(s) = {animated_seconds:.0f} s d'animation, puis texte fixe")
+    threshold = config.get_option('global.minCachedMessageSize')
+    print(f"{'mode':<10}{'octets 1er rendu':>18}{'rerun (seuil 10 Ko)':>22}"
+          f"{f'rerun (seuil {threshold / 1000:g} Ko)':>22}{f'écritures DOM / {args.seconds:.0f} s':>26}")
+    for name, sizes in payloads.items():
+        print(f"{name:<10}{sizes[0]:>18,}{rerun_bytes(sizes, DEFAULT_CACHE_THRESHOLD):>22,}"
+              f"{rerun_bytes(sizes, threshold):>22,}{dom_writes[name]:>26,.0f}")
+
+    if args.browser:
+        print(f"\nCPU du moteur de rendu sur {args.seconds:.0f} s (secondes)")
+        print(f"{'mode':<10}" + ''.join(f"{metric:>22}" for metric in CPU_METRICS))
+        for name, metrics in browser_cpu(documents, args.seconds).items():
+            print(f"{name:<10}" + ''.join(f"{metrics[metric]:>22.3f}" for metric in CPU_METRICS))
+
+
+if __name__ == '__main__':
+    main()
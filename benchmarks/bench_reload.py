@@ -0,0 +1,102 @@
+"""
+Benchmark du rechargement à chaud (`data_reloader.DatasetReloader`).
+
+Sur un CSV synthétique, mesure ce que paie une requête après une mise à
+jour du fichier :
+- `vidage du cache` (référence) : le cache Streamlit est vidé, la requête
+  suivante reconstruit elle-même le jeu de données et ses dérivés ;
+- `rechargement` : le fichier est réécrit pendant que des requêtes simulées
+  (lecture de l'état courant puis filtrage du cube sur une région) sont
+  servies en continu ; la reconstruction a lieu dans le fil du rechargeur.
+
+Sont affichés la durée de la reconstruction, la latence des requêtes
+(médiane et maximum) pendant celle-ci et le nombre de requêtes qui ont vu
+l'ancien puis le nouvel état.
+
+Usage :
+    python -m benchmarks.bench_reload
+    python -m benchmarks.bench_reload --sizes 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from aggregates import build_cube, count_by, slice_cube
+from benchmarks.synthetic import write_synthetic_csv
+from data_reloader import DatasetReloader
+from dataset import load_versioned_dataset
+from filter_index import build_filter_index
+from search_index import build_search_index
+from shared_data import share_frame
+from stats_engine import compute_moments
+
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+REQUEST_INTERVAL = 0.05
+
+
+def build_shared_state(path, cache_dir):
+    # Même état que celui construit par le dashboard
+    data, data_version = load_versioned_dataset(path, cache_dir)
+    data = share_frame(data)
+    return {
+        'data': data,
+        'data_version': data_version,
+        'cube': build_cube(data),
+        'moments': compute_moments(data),
+        'filter_index': build_filter_index(data),
+        'search_index': build_search_index(data),
+    }
+
+
+def serve_request(state):
+    """Requête simulée : état courant, puis indicateurs d'une région."""
+    region = state['filter_index']['regions'][0]
+    return count_by(slice_cube(state['cube'], region), 'Type')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    print(f"{'Lignes':>10} {'mode':<18}{'reconstruction (s)':>20}{'requête médiane (ms)':>22}"
+          f"{'requête max (ms)':>18}{'anciennes/nouvelles':>21}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, 'conventions.csv')
+            cache_dir = os.path.join(workdir, 'cache')
+            write_synthetic_csv(path, size, seed=0)
+
+            # Référence : la première requête après le vidage du cache reconstruit tout
+            start = time.perf_counter()
+            serve_request(build_shared_state(path, cache_dir))
+            legacy_seconds = time.perf_counter() - start
+            print(f"{size:>10,} {'vidage du cache':<18}{legacy_seconds:>20.2f}{legacy_seconds * 1000:>22,.0f}"
+                  f"{legacy_seconds * 1000:>18,.0f}{'-':>21}")
+
+            reloader = DatasetReloader(path, lambda source: build_shared_state(source, cache_dir), delay=0.2).start()
+            initial = reloader.current()
+            write_synthetic_csv(path, size, seed=1)
+            latencies, versions = [], []
+            while reloader.current() is initial:
+                start = time.perf_counter()
+                state = reloader.current()
+                serve_request(state)
+                latencies.append(time.perf_counter() - start)
+                versions.append(state['version'])
+                time.sleep(REQUEST_INTERVAL)
+            versions.append(reloader.current()['version'])
+            reloader.stop()
+            latencies = np.array(latencies) * 1000
+            versions = np.array(versions)
+            print(f"{size:>10,} {'rechargement':<18}{reloader.current()['seconds']:>20.2f}"
+                  f"{np.median(latencies):>22,.1f}{latencies.max():>18,.1f}"
+                  f"{f'{(versions == 1).sum()}/{(versions == 2).sum()}':>21}")
+
+
+if __name__ == '__main__':
+    main()
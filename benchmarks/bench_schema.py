@@ -0,0 +1,79 @@
+"""
+Benchmark du schéma compact des données préparées.
+
+Compare, sur un jeu synthétique, l'ancien schéma (chaînes en objets Python,
+effectifs et parts en float64, districts visités en texte) au schéma compact
+appliqué par `dataset.prepare_data` (catégories, petits entiers, float32,
+entier nullable) : mémoire occupée et temps des regroupements du dashboard
+(cube d'agrégats, index des filtres, moments statistiques, effectifs
+Région × District).
+
+Usage :
+    python -m benchmarks.bench_schema
+    python -m benchmarks.bench_schema --sizes 100000 1000000 --repeat 5
+"""
+import argparse
+import time
+
+import numpy as np
+
+from aggregates import aggregate_chunk
+from benchmarks.synthetic import synthetic_dataset
+from classification import NOM_STRUCTURE_COL, classify_structure_types
+from dataset import prepare_data
+from filter_index import build_filter_index
+from stats_engine import compute_moments
+
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+
+
+def legacy_prepare(data):
+    """`prepare_data` avant le schéma compact, conservée comme référence."""
+    data['Type'] = classify_structure_types(data[NOM_STRUCTURE_COL])
+    data['Région'] = data['Région'].str.strip().str.upper()
+    data['Statut Convention'] = np.where(data['Nb Conventions Signées'] > 0, 'Signée', 'Non Signée')
+    return data
+
+
+GROUPBY_TASKS = {
+    'cube': aggregate_chunk,
+    'index filtres': build_filter_index,
+    'moments': compute_moments,
+    'effectifs district': lambda data: data.groupby(['Région', 'District Sanitaire'], observed=True).size(),
+}
+
+
+def best_time(func, data, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        raw = synthetic_dataset(size)
+        legacy = legacy_prepare(raw.copy())
+        compact = prepare_data(raw)
+        legacy_mb = legacy.memory_usage(deep=True).sum() / 1024 ** 2
+        compact_mb = compact.memory_usage(deep=True).sum() / 1024 ** 2
+        print(f"\n{size:,} lignes : {legacy_mb:,.1f} Mo -> {compact_mb:,.1f} Mo "
+              f"({(1 - compact_mb / legacy_mb) * 100:.0f} % économisés)")
+        print(f"  {'regroupement':<22}{'ancien (ms)':>12}{'compact (ms)':>14}{'gain':>8}")
+        for name, task in GROUPBY_TASKS.items():
+            legacy_time = best_time(task, legacy, args.repeat)
+            compact_time = best_time(task, compact, args.repeat)
+            print(f"  {name:<22}{legacy_time * 1000:>12.1f}{compact_time * 1000:>14.1f}"
+                  f"{legacy_time / compact_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark du score de performance à l'échelle des districts.
+
+Compare, sur un agrégat synthétique de districts, l'ancien calcul
+(`Series.rank(pct=True)` pondéré, refait pour chaque sélection du filtre
+Région) au mode `scoring.batch_scores`, qui classe en une passe NumPy les
+régions, les districts du pays et les districts de chaque région.
+
+Usage :
+    python -m benchmarks.bench_scoring
+    python -m benchmarks.bench_scoring --regions 14 100 --districts-per-region 80
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from aggregates import COUNT_COL, CUBE_MEASURES, rollup
+from scoring import batch_scores
+
+
+DEFAULT_REGIONS = [14, 100, 1_000]
+
+
+def synthetic_district_cube(n_regions, districts_per_region, seed=0):
+    """Agrégat Région × District aux effectifs et sommes aléatoires."""
+    rng = np.random.default_rng(seed)
+    n = n_regions * districts_per_region
+    counts = rng.integers(1, 60, size=n)
+    signed = rng.binomial(counts, 0.6)
+    cube = pd.DataFrame({
+        'Région': np.repeat([f"REGION-{i:04d}" for i in range(n_regions)], districts_per_region),
+        'District Sanitaire': [f"District-{i:06d}" for i in range(n)],
+        COUNT_COL: counts,
+    })
+    share = 100.0 / counts.sum()
+    measures = {
+        'Valeurs': counts * rng.uniform(0.5, 3.0, size=n),
+        'Nb Conventions Signées': signed.astype('float64'),
+        'Nb Conventions Non Signées': (counts - signed).astype('float64'),
+        'Part Structures Ciblées': counts * share,
+        'Part Conventions Signées': signed * share,
+        'Part Conventions Non Signées': (counts - signed) * share,
+    }
+    return cube.assign(**{col: measures[col] for col in CUBE_MEASURES})
+
+
+def legacy_score(totals, by):
+    """Calcul d'origine de l'onglet statistiques, appliqué à un niveau `by`."""
+    performance_df = pd.DataFrame({
+        **{col: totals[col] for col in by},
+        'Valeurs_sum': totals['Valeurs'],
+        'Nb_Conventions_Signees_sum': totals['Nb Conventions Signées'],
+        'Nb_Conventions_Non_Signees_sum': totals['Nb Conventions Non Signées'],
+        'Part_Conventions_Signees_mean': totals['Part Conventions Signées'] / totals[COUNT_COL],
+        'Nb_Structures_count': totals[COUNT_COL],
+    }).round(2)
+    total_conv = performance_df['Nb_Conventions_Signees_sum'] + performance_df['Nb_Conventions_Non_Signees_sum']
+    performance_df['Efficacite_Signature'] = (performance_df['Nb_Conventions_Signees_sum'] / total_conv * 100).fillna(0)
+    performance_df['Valeur_Moyenne_Structure'] = (performance_df['Valeurs_sum'] / performance_df['Nb_Structures_count']).fillna(0)
+    performance_df['Score_Global'] = (
+        performance_df['Efficacite_Signature'].rank(pct=True) * 0.4 +
+        performance_df['Valeur_Moyenne_Structure'].rank(pct=True) * 0.3 +
+        performance_df['Part_Conventions_Signees_mean'].rank(pct=True) * 0.3
+    ) * 100
+    return performance_df
+
+
+def legacy_batch(cube):
+    """Mêmes classements que `batch_scores`, sélection par sélection."""
+    districts = rollup(cube, ['Région', 'District Sanitaire'])
+    results = [legacy_score(rollup(cube, ['Région']), ['Région']),
+               legacy_score(districts, ['Région', 'District Sanitaire'])]
+    for region in districts['Région'].unique():
+        results.append(legacy_score(districts[districts['Région'] == region], ['Région', 'District Sanitaire']))
+    return pd.concat(results, ignore_index=True)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--regions', type=int, nargs='+', default=DEFAULT_REGIONS)
+    parser.add_argument('--districts-per-region', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'Régions':>9} {'Districts':>10} {'ancien (s)':>11} {'batch (s)':>10} {'gain':>7} {'écart max':>10}")
+    for n_regions in args.regions:
+        cube = synthetic_district_cube(n_regions, args.districts_per_region)
+        legacy, legacy_time = timed(legacy_batch, cube)
+        batch, batch_time = timed(batch_scores, cube)
+        # Les deux calculs produisent les classements dans le même ordre
+        gap = np.nanmax(np.abs(legacy['Score_Global'].to_numpy() - batch['Score_Global'].to_numpy()))
+        print(f"{n_regions:>9,} {len(cube):>10,} {legacy_time:>11.3f} {batch_time:>10.3f} "
+              f"{legacy_time / batch_time:>6.1f}x {gap:>10.2g}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark de la recherche de l'explorateur de données brutes.
+
+Compare l'ancienne recherche ligne à ligne (`.apply(...)` convertissant chaque
+ligne en chaînes) à l'index de `search_index.py` sur un jeu synthétique :
+temps de construction de l'index, puis temps par requête en sous-chaîne et
+en début de mot. L'ancienne recherche n'est mesurée que jusqu'à
+`--legacy-max` lignes, au-delà elle prend plusieurs minutes.
+
+Usage :
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --sizes 10000 100000 --queries khor "poste de sante"
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import synthetic_dataset
+from dataset import prepare_data
+from search_index import build_search_index, search_positions
+
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_QUERIES = ['khor', 'santé de', 'pikine', 'ndi']
+
+
+def legacy_search(data, query):
+    """Recherche d'origine de l'explorateur, conservée comme référence."""
+    return data[data.apply(lambda row: row.astype(str).str.contains(query, case=False).any(), axis=1)]
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--queries', nargs='+', default=DEFAULT_QUERIES)
+    parser.add_argument('--legacy-max', type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'Lignes':>12} {'Requête':<16} {'apply (s)':>10} {'index (ms)':>11} {'début (ms)':>11} "
+          f"{'gain':>9} {'trouvées':>10} {'apply':>10}")
+    for size in args.sizes:
+        data = prepare_data(synthetic_dataset(size))
+        index, build_time = timed(build_search_index, data)
+        print(f"{size:>12,} {'(construction)':<16} {'':>10} {build_time * 1000:>11.1f}")
+        for query in args.queries:
+            found, index_time = timed(search_positions, index, query)
+            _, prefix_time = timed(search_positions, index, query, prefix=True)
+            if size <= args.legacy_max:
+                legacy, legacy_time = timed(legacy_search, data, query)
+                legacy_cols = f"{legacy_time:>10.3f}"
+                gain = f"{legacy_time / index_time:>8.0f}x"
+                legacy_found = f"{len(legacy):>10,}"
+            else:
+                legacy_cols, gain, legacy_found = f"{'-':>10}", f"{'-':>9}", f"{'-':>10}"
+            # Les écarts de résultats viennent des accents : 'sante' trouve désormais 'santé'
+            print(f"{'':>12} {query:<16} {legacy_cols} {index_time * 1000:>11.1f} {prefix_time * 1000:>11.1f} "
+                  f"{gain} {len(found):>10,} {legacy_found}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark de la mémoire par session : copie par session ou jeu partagé.
+
+Simule `--sessions` sessions simultanées, chacune filtrée sur une région ou
+un district différent, sur un jeu synthétique :
+- `copie` : comportement de `st.cache_data`, qui remet à chaque appel une
+  copie dé-sérialisée du DataFrame (colonnes texte en objets Python), puis
+  une copie des lignes filtrées (`take`) ;
+- `partagé` : un seul jeu en chaînes Arrow (`shared_data.share_frame`) pour
+  le processus, les sessions ne détenant que des vues
+  (`filter_index.select_rows`), mesurées par `shared_data.owned_bytes`.
+
+Le temps affiché pour `copie` est celui de la dé-sérialisation payée à
+chaque rerun de chaque session.
+
+Usage :
+    python -m benchmarks.bench_sessions
+    python -m benchmarks.bench_sessions --sizes 100000 1000000 --sessions 50
+"""
+import argparse
+import pickle
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_dataset
+from dataset import prepare_data
+from filter_index import build_filter_index, select_rows
+from shared_data import buffer_ranges, owned_bytes, share_frame
+
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+DEFAULT_SESSIONS = 30
+
+
+def session_filters(index, n_sessions):
+    """Filtres des sessions simulées : toutes les régions puis leurs districts, à tour de rôle."""
+    filters = [(None, None)] + [(region, None) for region in index['regions']]
+    filters += [pair for pair in index['district_rows']]
+    return [filters[i % len(filters)] for i in range(n_sessions)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--sessions', type=int, default=DEFAULT_SESSIONS)
+    args = parser.parse_args()
+
+    print(f"{'Lignes':>12} {'mode':<9} {'jeu (Mo)':>10} {'sessions (Mo)':>14} {'total (Mo)':>11} "
+          f"{'par rerun (ms)':>15}")
+    for size in args.sizes:
+        data = prepare_data(synthetic_dataset(size))
+        index = build_filter_index(data)
+        filters = session_filters(index, args.sessions)
+
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        start = time.perf_counter()
+        copy = pickle.loads(payload)
+        copy_ms = (time.perf_counter() - start) * 1000
+        copy_mb = copy.memory_usage(deep=True).sum() / 1024 ** 2
+        # Chaque session détient sa copie du jeu et la copie de ses lignes filtrées
+        legacy_sessions = sum(copy_mb + select_rows(copy, index, *key).memory_usage(deep=True).sum() / 1024 ** 2
+                              if key != (None, None) else copy_mb for key in filters)
+        print(f"{size:>12,} {'copie':<9} {'-':>10} {legacy_sessions:>14,.1f} {legacy_sessions:>11,.1f} "
+              f"{copy_ms:>15,.1f}")
+
+        shared = share_frame(data)
+        shared_index = build_filter_index(shared)
+        ranges = buffer_ranges(shared)
+        shared_mb = shared.memory_usage(deep=True).sum() / 1024 ** 2
+        owned = sum(owned_bytes(select_rows(shared, shared_index, *key), ranges) for key in filters) / 1024 ** 2
+        print(f"{size:>12,} {'partagé':<9} {shared_mb:>10,.1f} {owned:>14,.2f} {shared_mb + owned:>11,.1f} "
+              f"{0:>15,.1f}")
+
+
+if __name__ == '__main__':
+    main()
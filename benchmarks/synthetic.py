@@ -0,0 +1,149 @@
+"""
+Générateur de données synthétiques reprenant le schéma de
+'Final_Full__type_colonnes_Cleaned.csv', pour mesurer le comportement du
+dashboard bien au-delà des 569 lignes de l'échantillon.
+"""
+import numpy as np
+import pandas as pd
+
+
+# Gabarits de noms observés dans l'extrait réel (casse et accents variables).
+NAME_TEMPLATES = np.array([
+    'Poste de santé de {}',
+    'Poste de Santé {}',
+    'poste de santé de {} ',
+    'Centre de Santé de {}',
+    'Centre de santé {}',
+    'Hopital régional de {}',
+    'Hôpital {}',
+    'EPS {}',
+    'EPS1 {}',
+    'Case de santé {}',
+], dtype=object)
+TEMPLATE_WEIGHTS = np.array([0.45, 0.2, 0.05, 0.08, 0.02, 0.02, 0.02, 0.02, 0.01, 0.13])
+
+LOCALITIES = np.array([
+    'Khor', 'Diamaguene', 'Ndioum', 'Ourossogui', 'Tivaouane', 'Touba', 'Fatick',
+    'Kolda', 'Sédhiou', 'Ziguinchor', 'Kaffrine', 'Linguère', 'Pikine', 'Guédiawaye',
+    'Rufisque', 'Mbour', 'Joal', 'Podor', 'Bakel', 'Kédougou',
+], dtype=object)
+
+
+def synthetic_structure_names(n_rows, seed=0):
+    """Génère `n_rows` noms de structures sanitaires plausibles."""
+    rng = np.random.default_rng(seed)
+    templates = rng.choice(NAME_TEMPLATES, size=n_rows, p=TEMPLATE_WEIGHTS)
+    localities = rng.choice(LOCALITIES, size=n_rows)
+    suffixes = rng.integers(0, max(1, n_rows // 50), size=n_rows).astype(str)
+    names = pd.Series(templates).str.replace('{}', '', regex=False) + pd.Series(localities) + ' ' + suffixes
+    return names
+
+
+# Régions et districts de l'extrait réel (12 régions, 65 districts), avec la
+# part des structures de chaque région observée dans l'échantillon.
+REGION_DISTRICTS = {
+    'DAKAR': ['Rufisque', 'Diamniadio', 'Sangualkame', 'Pikine', 'Keur Massar', 'Yembeul', 'Mbao',
+              'Dakar-Ouest', 'Dakar-Centre', 'Dakar-Nord', 'Dakar-Sud', 'Guediawaye'],
+    'DIOURBEL': ['Diourbel', 'Touba', 'Mbacké', 'Bambay'],
+    'FATICK': ['Fatick', 'Diofior', 'Ndiakhar', 'DIAKHAO', 'Gossas', 'PASSY', 'SOKONE'],
+    'KAFFRINE': ['Kaffrine', 'Malem Hodar', 'Birkilane', 'Koungheul'],
+    'KAOLACK': ['Kaolack', 'Ndoffane', 'Guinguinéo', 'Nioro du Rip'],
+    'KOLDA': ['Kolda', 'Médina Yoro Foula', 'Véllingara'],
+    'LOUGA': ['SAKAL', 'LOUGA', 'LINGUERE', 'Dahra', 'KOKI'],
+    'MATAM': ['Matam', 'Thilogne', 'KANEL', 'RANEROU'],
+    'SAINT-LOUIS': ['Saint-Louis', 'Richard Told', 'DAGANA', 'PODOR', 'PETE'],
+    'SEDHIOU': ['Sédhiou', 'GOUDOMP', 'Boukiling'],
+    'THIES': ['Thiés', 'Mbour', 'Tivaouane', 'Joal', 'Popenguine', 'Mbékhé', 'Khombole', 'Thiadiaye', 'Pout'],
+    'ZIGUINCHOR': ['Ziguinchor', 'OUSSOUYE', 'BIGNONA', 'DIOULOULOU', 'THIONCK ESSYL'],
+}
+REGION_WEIGHTS = {
+    'DAKAR': 122, 'DIOURBEL': 37, 'FATICK': 93, 'KAFFRINE': 28, 'KAOLACK': 50, 'KOLDA': 26,
+    'LOUGA': 19, 'MATAM': 44, 'SAINT-LOUIS': 31, 'SEDHIOU': 45, 'THIES': 37, 'ZIGUINCHOR': 36,
+}
+# Part des structures dont la convention est signée dans l'échantillon (512 / 568)
+SIGNED_RATE = 0.9
+# Valeur de 'NOMBRE DE DISTRICTS SANITAIRES VISITES' hors première ligne d'un district
+VISITED_PLACEHOLDER = '--'
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def _district_pairs():
+    regions, districts, weights = [], [], []
+    for region, region_districts in REGION_DISTRICTS.items():
+        for district in region_districts:
+            regions.append(region)
+            districts.append(district)
+            weights.append(REGION_WEIGHTS[region] / len(region_districts))
+    weights = np.array(weights)
+    return np.array(regions, dtype=object), np.array(districts, dtype=object), weights / weights.sum()
+
+
+def _district_choice(n_rows, seed):
+    """District (indice dans `_district_pairs`) de chaque ligne, regroupés comme dans l'extrait."""
+    rng = np.random.default_rng(seed)
+    _, _, weights = _district_pairs()
+    # Le CSV source liste les structures district par district
+    return np.sort(rng.choice(len(weights), size=n_rows, p=weights)).astype(np.int16)
+
+
+def _dataset_rows(choice, district_sizes, first_rows, seed):
+    """Lignes au format du CSV source pour les districts `choice` (une ligne par élément)."""
+    n_rows = len(choice)
+    rng = np.random.default_rng(seed)
+    regions, districts, _ = _district_pairs()
+    signed = (rng.random(n_rows) < SIGNED_RATE).astype('float64')
+    # Comme dans l'extrait, la part d'une structure est rapportée à son district
+    share = 100.0 / district_sizes[choice]
+    return pd.DataFrame({
+        'Région': regions[choice],
+        'District Sanitaire': districts[choice],
+        'NOMBRE DE DISTRICTS SANITAIRES VISITES': np.where(first_rows, '1', VISITED_PLACEHOLDER),
+        'NOM DES STRUCTURES SANITAIRES CIBLES': synthetic_structure_names(n_rows, seed).to_numpy(),
+        'Valeurs': np.ones(n_rows),
+        'Nb Conventions Signées': signed,
+        'Nb Conventions Non Signées': 1.0 - signed,
+        'Part Structures Ciblées': share,
+        'Part Conventions Signées': signed * share,
+        'Part Conventions Non Signées': (1.0 - signed) * share,
+    })
+
+
+def _first_rows(choice, previous=None):
+    # Première ligne de chaque district ; `previous` : district de la ligne précédant le morceau
+    first = np.r_[True, choice[1:] != choice[:-1]]
+    if previous is not None and len(choice):
+        first[0] = choice[0] != previous
+    return first
+
+
+def synthetic_dataset(n_rows, seed=0):
+    """
+    Génère `n_rows` lignes au format du CSV source (avant `prepare_data`).
+
+    Le schéma de l'extrait est conservé : 12 régions et 65 districts pondérés
+    comme dans l'échantillon, gabarits de noms, '1' sur la première ligne de
+    chaque district et '--' ailleurs dans 'NOMBRE DE DISTRICTS SANITAIRES
+    VISITES', parts rapportées à la taille du district.
+    """
+    choice = _district_choice(n_rows, seed)
+    district_sizes = np.bincount(choice, minlength=len(_district_pairs()[2])).astype('float64')
+    return _dataset_rows(choice, district_sizes, _first_rows(choice), seed)
+
+
+def write_synthetic_csv(path, n_rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Écrit `synthetic_dataset(n_rows)` en CSV par morceaux, sans le matérialiser
+    entièrement (10 M de lignes tiennent ainsi en mémoire bornée).
+
+    Les noms de structures dépendent du découpage ; le reste est identique à
+    `synthetic_dataset` pour la même graine.
+    """
+    choice = _district_choice(n_rows, seed)
+    district_sizes = np.bincount(choice, minlength=len(_district_pairs()[2])).astype('float64')
+    with open(path, 'w', encoding='utf-8', newline='') as target:
+        for index, start in enumerate(range(0, max(n_rows, 1), chunk_rows)):
+            part = choice[start:start + chunk_rows]
+            previous = choice[start - 1] if start else None
+            rows = _dataset_rows(part, district_sizes, _first_rows(part, previous=previous), seed + index)
+            rows.to_csv(target, index=False, header=(index == 0))
+    return path
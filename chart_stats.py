@@ -0,0 +1,132 @@
+"""
+Résumés calculés côté serveur pour les graphiques de distribution et de hiérarchie.
+
+Plotly Express reçoit habituellement les lignes elles-mêmes : il construit
+la hiérarchie d'un treemap ou d'un sunburst en Python, et un box plot ou un
+violon envoie toutes les valeurs au navigateur, qui calcule quartiles et
+densité. Ce module prépare à la place :
+- les nœuds d'une hiérarchie (identifiant, parent, effectif) ;
+- les quartiles et moustaches d'un box plot, et ses valeurs aberrantes ;
+- la densité (noyau gaussien) d'un violon, estimée sur une grille ;
+- les points affichés, échantillonnés au-delà de `MAX_CHART_POINTS`.
+
+La taille d'une figure dépend ainsi du nombre de groupes, plus du nombre
+de structures. Au-delà de `WEBGL_POINTS` points, les nuages de points
+passent en WebGL (`Scattergl`).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+
+MAX_CHART_POINTS = int(os.environ.get('MSAS_MAX_CHART_POINTS', 5000))
+WEBGL_POINTS = int(os.environ.get('MSAS_WEBGL_POINTS', 1000))
+KDE_GRID_SIZE = 64
+WHISKER_IQR = 1.5
+
+
+def _node_ids(labels, keys, root):
+    ids = pd.Series(root, index=labels.index) if root is not None else None
+    for key in keys:
+        ids = labels[key] if ids is None else ids + '/' + labels[key]
+    return ids if ids is not None else pd.Series('', index=labels.index)
+
+
+def hierarchy_nodes(frame, path, values, root=None):
+    """
+    Nœuds de la hiérarchie `path` (ex. ['Région', 'District Sanitaire']) pour
+    `go.Treemap` / `go.Sunburst` (`branchvalues='total'`), effectifs sommés à
+    chaque niveau ; `root` ajoute un nœud racine (ex. 'Sénégal').
+
+    Returns:
+        pd.DataFrame: colonnes 'id', 'label', 'parent', 'value' et 'group'
+        (la modalité du premier niveau, pour la couleur ; vide pour la racine).
+    """
+    levels = []
+    if root is not None:
+        levels.append(pd.DataFrame({'id': [root], 'label': [root], 'parent': [''],
+                                    'value': [frame[values].sum()], 'group': ['']}))
+    for depth in range(1, len(path) + 1):
+        keys = path[:depth]
+        totals = frame.groupby(keys, observed=True, sort=True)[values].sum().reset_index()
+        totals = totals[totals[values] > 0]
+        labels = totals[keys].astype(str)
+        levels.append(pd.DataFrame({
+            'id': _node_ids(labels, keys, root),
+            'label': labels[keys[-1]],
+            'parent': _node_ids(labels, keys[:-1], root),
+            'value': totals[values],
+            'group': labels[keys[0]],
+        }))
+    return pd.concat(levels, ignore_index=True)
+
+
+def box_stats(frame, by, value):
+    """
+    Quartiles (méthode linéaire), moustaches à 1,5 × l'écart interquartile
+    (bornées aux valeurs observées, comme Plotly) et effectif par groupe `by`.
+    """
+    grouped = frame.groupby(by, observed=True, sort=False)[value]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+    iqr = stats['q3'] - stats['q1']
+    low_limit = (stats['q1'] - WHISKER_IQR * iqr).rename('low_limit')
+    high_limit = (stats['q3'] + WHISKER_IQR * iqr).rename('high_limit')
+    limits = frame[[by, value]].join(low_limit, on=by).join(high_limit, on=by)
+    inside = limits[(limits[value] >= limits['low_limit']) & (limits[value] <= limits['high_limit'])]
+    inside_groups = inside.groupby(by, observed=True, sort=False)[value]
+    stats['lowerfence'] = inside_groups.min()
+    stats['upperfence'] = inside_groups.max()
+    stats['count'] = grouped.size()
+    return stats
+
+
+def outliers(frame, by, value, stats):
+    """Lignes de `frame` hors des moustaches de `box_stats`."""
+    fences = frame[by].map(stats['lowerfence']).astype(float), frame[by].map(stats['upperfence']).astype(float)
+    return frame[(frame[value] < fences[0]) | (frame[value] > fences[1])]
+
+
+def _bandwidth(values):
+    # Règle de Silverman, comme les violons de Plotly
+    std = values.std(ddof=1) if len(values) > 1 else 0.0
+    q1, q3 = np.percentile(values, [25, 75])
+    spread = min(std, (q3 - q1) / 1.349) or std
+    if not spread:
+        return max(abs(values.mean()), 1.0) * 0.1
+    return 1.059 * spread * len(values) ** -0.2
+
+
+def kde_curve(values, grid_size=KDE_GRID_SIZE):
+    """
+    Densité (noyau gaussien) de `values` sur une grille couvrant [min - 2h, max + 2h].
+
+    Les valeurs sont d'abord réparties sur la grille puis lissées par
+    convolution : le coût est linéaire en nombre de valeurs.
+    """
+    values = np.asarray(values, dtype='float64')
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return np.array([]), np.array([])
+    bandwidth = _bandwidth(values)
+    grid = np.linspace(values.min() - 2 * bandwidth, values.max() + 2 * bandwidth, grid_size)
+    step = grid[1] - grid[0]
+    counts, _ = np.histogram(values, bins=grid_size, range=(grid[0] - step / 2, grid[-1] + step / 2))
+    half_width = int(np.ceil(4 * bandwidth / step))
+    offsets = np.arange(-half_width, half_width + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    density = np.convolve(counts, kernel)[half_width:half_width + grid_size]
+    return grid, density / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+
+
+def sample_points(frame, max_points=MAX_CHART_POINTS, seed=0):
+    """Au plus `max_points` lignes de `frame` (échantillon aléatoire reproductible)."""
+    if len(frame) <= max_points:
+        return frame
+    return frame.sample(n=max_points, random_state=seed).sort_index()
+
+
+def use_webgl(n_points):
+    """Vrai si un nuage de `n_points` points doit être rendu en WebGL."""
+    return n_points > WEBGL_POINTS
@@ -0,0 +1,355 @@
+"""
+Construction des graphiques Plotly du dashboard.
+
+Chaque fonction reçoit des données déjà agrégées (ou les lignes filtrées
+lorsque le graphique en a besoin) et retourne une figure, sans appel à
+Streamlit : les figures peuvent ainsi être mémorisées, mises en cache ou
+produites hors de l'application.
+"""
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from chart_stats import (MAX_CHART_POINTS, box_stats, hierarchy_nodes, kde_curve, outliers, sample_points,
+                         use_webgl)
+
+
+STATUT_LABELS = ['✅ Signée', '❌ Non Signée']
+STATUT_COLORS = ['#28a745', '#dc3545']
+
+
+def _group_colors(groups, palette):
+    # Une couleur par modalité, dans l'ordre d'apparition, comme `color=` de Plotly Express
+    return {group: palette[i % len(palette)] for i, group in enumerate(dict.fromkeys(groups))}
+
+
+def _hierarchy_trace(trace_type, frame, path, values, palette, root=None):
+    # Hiérarchie agrégée côté serveur : un nœud par modalité, jamais une ligne par structure
+    nodes = hierarchy_nodes(frame, path, values, root)
+    colors = _group_colors(nodes.loc[nodes['group'] != '', 'group'], palette)
+    return trace_type(
+        ids=nodes['id'], labels=nodes['label'], parents=nodes['parent'], values=nodes['value'],
+        branchvalues='total', marker=dict(colors=nodes['group'].map(colors).fillna('').tolist()),
+        hovertemplate='%{label}<br>%{value}<extra></extra>',
+    )
+
+
+def _points_trace(x, y, color, name, n_total):
+    # Points affichés (déjà échantillonnés) ; WebGL au-delà de WEBGL_POINTS
+    trace_type = go.Scattergl if use_webgl(len(y)) else go.Scatter
+    return trace_type(x=x, y=y, mode='markers', name=name,
+                      marker=dict(color=color, size=4, opacity=0.6),
+                      hovertemplate=f'{name}<br>%{{y}}<extra>{len(y)} / {n_total} points</extra>')
+
+
+def _distribution_chart(frame, by, value, title, violin=False, points='all', max_points=MAX_CHART_POINTS):
+    """
+    Box plot (ou violon) de `value` par `by`.
+
+    Jusqu'à `max_points` lignes, les valeurs sont envoyées telles quelles et
+    le navigateur calcule quartiles et densité. Au-delà, seuls des résumés
+    calculés côté serveur le sont : quartiles et moustaches, densité pour le
+    violon, points échantillonnés. Les groupes sont placés en abscisse
+    numérique (0, 1, ...) et étiquetés par leur nom.
+    """
+    stats = box_stats(frame, by, value)
+    groups = [str(group) for group in stats.index]
+    colors = _group_colors(groups, px.colors.qualitative.Plotly)
+    summarize = len(frame) > max_points
+    values_by_group = dict(list(frame.groupby(by, observed=True, sort=False)[value]))
+    if summarize:
+        shown = frame[[by, value]] if points == 'all' else outliers(frame[[by, value]], by, value, stats)
+        shown_by_group = dict(list(sample_points(shown, max_points).groupby(by, observed=True, sort=False)[value]))
+    rng = np.random.default_rng(0)
+
+    fig = go.Figure()
+    for position, (group, row) in enumerate(zip(groups, stats.itertuples())):
+        color = colors[group]
+        values = values_by_group[row.Index].to_numpy()
+        if not summarize:
+            positions = np.full(len(values), position)
+            if violin:
+                fig.add_trace(go.Violin(x=positions, y=values, name=group, line_color=color, box_visible=True,
+                                        points=points, width=0.8))
+            else:
+                fig.add_trace(go.Box(x=positions, y=values, name=group, marker_color=color, boxpoints=points))
+            continue
+        if violin:
+            grid, density = kde_curve(values)
+            # Groupe sans valeur renseignée : pas de densité, seule la boîte est tracée
+            if len(density) and density.max() > 0:
+                half = 0.4 * density / density.max()
+                fig.add_trace(go.Scatter(
+                    x=np.round(np.r_[position - half, (position + half)[::-1]], 3),
+                    y=np.round(np.r_[grid, grid[::-1]], 3),
+                    fill='toself', mode='lines', line=dict(color=color, width=1), name=group, hoverinfo='skip'))
+        fig.add_trace(go.Box(
+            x=[position], q1=[row.q1], median=[row.median], q3=[row.q3],
+            lowerfence=[row.lowerfence], upperfence=[row.upperfence], name=group,
+            width=0.15 if violin else 0.6, marker_color=color, boxpoints=False))
+        sample = shown_by_group.get(row.Index)
+        if sample is not None and len(sample):
+            jitter = rng.uniform(-0.1, 0.1, len(sample)) if points == 'all' else np.zeros(len(sample))
+            fig.add_trace(_points_trace(position + jitter, sample.to_numpy(), color, group, row.count))
+    fig.update_layout(
+        title=title, showlegend=False, yaxis_title=value,
+        xaxis=dict(tickmode='array', tickvals=list(range(len(groups))), ticktext=groups, tickangle=-45,
+                   title=by),
+    )
+    return fig
+
+
+def create_type_pie_chart(type_counts_df):
+    fig_pie = px.pie(
+        type_counts_df, names='Type', values='Nombre', hole=0.4,
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        title="Proportion des Types de Structures"
+    )
+    fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+    return fig_pie
+
+
+def create_region_treemap_chart(district_totals, values_col):
+    fig_treemap = go.Figure(_hierarchy_trace(
+        go.Treemap, district_totals, ['Région', 'District Sanitaire'], values_col,
+        px.colors.qualitative.Alphabet, root="Sénégal"))
+    fig_treemap.update_layout(title="Explorez la hiérarchie des structures", margin = dict(t=50, l=25, r=25, b=25))
+    return fig_treemap
+
+
+def create_density_bubble_chart(region_agg):
+    fig_bubble = px.scatter(
+        region_agg,
+        x="Nb_Districts",
+        y="Nb_Structures",
+        size="Structures_par_District",
+        color="Région",
+        hover_name="Région",
+        size_max=60,
+        title="Densité des Structures : Nb Structures vs. Nb Districts par Région"
+    )
+    fig_bubble.update_layout(
+        xaxis_title="Nombre de Districts Sanitaires",
+        yaxis_title="Nombre Total de Structures",
+        legend_title="Régions"
+    )
+    return fig_bubble
+
+
+def create_district_violin_chart(district_analysis):
+    return _distribution_chart(district_analysis, 'Région', 'Nb_Structures',
+                               'Dispersion et Densité du Nb de Structures par District', violin=True)
+
+
+def create_district_box_chart(district_analysis):
+    return _distribution_chart(district_analysis, 'Région', 'Nb_Structures',
+                               'Dispersion du Nombre de Structures par District')
+
+
+def create_type_stacked_bar_chart(region_type_counts):
+    fig_stacked_bar = px.bar(
+        region_type_counts,
+        x='Région',
+        y='Nombre',
+        color='Type',
+        title='Mix des Types de Structures par Région',
+        labels={'Nombre': 'Nombre de Structures', 'Région': 'Région'},
+        barmode='stack',
+        text_auto=True
+    )
+    fig_stacked_bar.update_layout(xaxis={'categoryorder':'total descending'})
+    return fig_stacked_bar
+
+
+def create_region_type_heatmap_chart(region_type_pivot, x_label, color_scale, title):
+    return px.imshow(
+        region_type_pivot, labels=dict(x=x_label, y="Région", color="Nombre"),
+        aspect="auto", text_auto=True, color_continuous_scale=color_scale,
+        title=title
+    )
+
+
+def create_region_type_sunburst_chart(region_type_counts):
+    fig_sunburst = go.Figure(_hierarchy_trace(
+        go.Sunburst, region_type_counts, ['Région', 'Type'], 'Nombre', px.colors.qualitative.Plotly))
+    fig_sunburst.update_layout(title='Explorez la Répartition Région -> Type')
+    return fig_sunburst
+
+
+def create_region_bar_chart(region_counts_df):
+    return px.bar(
+        region_counts_df.sort_values('Nombre'),
+        x='Nombre', y='Région', orientation='h',
+        labels={'Région': 'Région', 'Nombre': 'Nombre de Structures'},
+        color='Nombre', color_continuous_scale='Viridis',
+        height=500, text_auto=True
+    )
+
+
+def create_signature_rate_chart(region_perf):
+    fig_taux = px.bar(
+        region_perf.sort_values('Taux_Signature'),
+        x='Taux_Signature', y='Région', orientation='h',
+        title='Taux de Signature des Conventions par Région (%)',
+        labels={'Taux_Signature': 'Taux de Signature (%)', 'Région': 'Région'},
+        color='Taux_Signature',
+        color_continuous_scale='RdYlGn',
+    )
+    # Libellé formaté depuis x, tableau numérique : une figure reconstruite depuis son
+    # JSON (voir figure_cache.py) convertit les tableaux `text` en chaînes
+    fig_taux.update_traces(texttemplate='%{x:.1f}%', textposition='inside')
+    fig_taux.update_layout(height=400)
+    return fig_taux
+
+
+def create_correlation_chart(correlation_matrix):
+    fig_corr = px.imshow(
+        correlation_matrix,
+        labels=dict(color="Corrélation"),
+        x=correlation_matrix.columns,
+        y=correlation_matrix.columns,
+        color_continuous_scale='RdBu_r',
+        aspect="auto",
+        title="Matrice de Corrélation entre Variables Quantitatives",
+        text_auto='.2f'
+    )
+    fig_corr.update_layout(height=500)
+    return fig_corr
+
+
+def create_values_histogram_chart(rows, mean=None, median=None, nbins=30):
+    # Moyenne et médiane peuvent venir d'accumulateurs déjà calculés (voir stats_engine.py)
+    mean = rows['Valeurs'].mean() if mean is None else mean
+    median = rows['Valeurs'].median() if median is None else median
+    # Classes calculées côté serveur : la figure contient `nbins` barres, pas une valeur par structure
+    values = rows['Valeurs'].to_numpy(dtype='float64')
+    counts, edges = np.histogram(values[np.isfinite(values)], bins=nbins)
+    fig_hist = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), marker_color='#1f77b4',
+        hovertemplate='%{x}<br>Fréquence : %{y}<extra></extra>'
+    ))
+    fig_hist.update_layout(title='Distribution des Valeurs des Conventions', bargap=0,
+                           xaxis_title='Valeur des Conventions', yaxis_title='Fréquence')
+    fig_hist.add_vline(x=mean, line_dash="dash",
+                      line_color="red", annotation_text=f"Moyenne: {mean:.0f}")
+    fig_hist.add_vline(x=median, line_dash="dash",
+                      line_color="green", annotation_text=f"Médiane: {median:.0f}")
+    return fig_hist
+
+
+def create_performance_scatter_chart(performance_df):
+    return px.scatter(
+        performance_df,
+        x='Valeur_Moyenne_Structure',
+        y='Efficacite_Signature',
+        size='Nb_Structures_count',
+        color='Score_Global',
+        hover_name='Région',
+        title='Performance: Efficacité de Signature vs Valeur Moyenne par Structure',
+        labels={'Valeur_Moyenne_Structure': 'Valeur Moyenne par Structure',
+               'Efficacite_Signature': 'Efficacité de Signature (%)'},
+        color_continuous_scale='Viridis'
+    )
+
+
+def create_signed_share_box_chart(rows):
+    # Une ligne par structure : seuls les quartiles et les valeurs aberrantes (échantillonnées) sont envoyés
+    return _distribution_chart(rows, 'Région', 'Part Conventions Signées',
+                               'Dispersion des Parts de Conventions Signées par Région', points='outliers')
+
+
+def create_cv_chart(cv_filtered):
+    return px.bar(
+        cv_filtered, x='CV (%)', y='Région', color='Variable',
+        title='Coefficients de Variation par Région (Stabilité)',
+        orientation='h', barmode='group'
+    )
+
+
+def create_signature_progression_chart(progress, by='Région'):
+    fig_progress = px.bar(
+        progress.sort_values('Δ Signées'),
+        x='Δ Signées', y=by, orientation='h',
+        title='Évolution du Nombre de Structures Signées entre les Deux Instantanés',
+        labels={'Δ Signées': 'Structures signées (écart)'},
+        color='Δ Taux (pts)', color_continuous_scale='RdYlGn', color_continuous_midpoint=0,
+        text_auto=True
+    )
+    fig_progress.update_layout(height=max(400, 22 * len(progress)))
+    return fig_progress
+
+
+def create_signature_timeline_chart(timeline):
+    return px.line(
+        timeline, x='Date', y='Taux Signature (%)', color='Région', markers=True,
+        title='Taux de Signature des Conventions par Instantané',
+        hover_data=['Instantané', 'Signée', 'Non Signée']
+    )
+
+
+def create_animated_summary_chart(nb_signe, nb_non_signe, mode='tween', n_frames=30, duration=2000):
+    """
+    Crée un graphique à barres animé qui montre la transition des décomptes
+    des conventions signées vs non signées.
+
+    Args:
+        nb_signe (int): Nombre de structures avec convention signée.
+        nb_non_signe (int): Nombre de structures sans convention signée.
+        mode (str): 'tween' (défaut) n'envoie que les valeurs finales et laisse
+            le navigateur interpoler les barres ; 'frames' envoie `n_frames`
+            étapes interpolées côté serveur.
+        n_frames (int): Nombre d'étapes en mode 'frames'.
+        duration (int): Durée totale de l'animation en millisecondes.
+    """
+    total = nb_signe + nb_non_signe
+    if total == 0:
+        # Affiche un message si aucune donnée n'est disponible
+        fig = go.Figure()
+        fig.update_layout(
+            title="Aucune donnée à afficher pour les filtres actuels",
+            xaxis = {"visible": False},
+            yaxis = {"visible": False},
+            annotations=[{
+                "text": "Veuillez changer votre sélection de filtres.",
+                "xref": "paper", "yref": "paper", "showarrow": False, "font": {"size": 16}
+            }]
+        )
+        return fig
+
+    finals = np.array([nb_signe, nb_non_signe], dtype=float)
+    if mode == 'frames':
+        # Étapes de 0% à 100%, interpolées en une seule opération NumPy
+        heights = np.outer(np.linspace(0.0, 1.0, max(2, n_frames)), finals)
+        frames = [go.Frame(name=str(step), data=[{'y': row}]) for step, row in enumerate(heights)]
+        frame_options = {'duration': duration / len(frames), 'redraw': False}
+        transition_options = {'duration': 0}
+    else:
+        # Deux états seulement : le navigateur interpole entre 0 et les valeurs finales
+        frames = [go.Frame(name='debut', data=[{'y': [0, 0]}]), go.Frame(name='fin', data=[{'y': finals}])]
+        frame_options = [{'duration': 0, 'redraw': False}, {'duration': duration, 'redraw': False}]
+        transition_options = [{'duration': 0}, {'duration': duration, 'easing': 'cubic-in-out'}]
+
+    fig = go.Figure(
+        data=[go.Bar(
+            x=STATUT_LABELS, y=finals, marker_color=STATUT_COLORS,
+            texttemplate='%{y:.0f}', textposition='outside'
+        )],
+        frames=frames
+    )
+
+    # Personnalisation de l'animation et du style
+    fig.update_yaxes(title_text='Nombre de Structures', range=[0, max(1, nb_signe, nb_non_signe) * 1.15])
+    fig.update_xaxes(title_text='Statut de la Convention')
+    fig.update_layout(
+        title_text="Répartition Animée des Conventions Signées vs Non Signées",
+        showlegend=False,
+        updatemenus=[{
+            'type': 'buttons',
+            'buttons': [
+                {'label': '▶️ Rejouer', 'method': 'animate', 'args': [[frame.name for frame in frames], {'frame': frame_options, 'mode': 'immediate', 'transition': transition_options}]},
+            ],
+            'direction': 'left', 'pad': {'r': 10, 't': 87}, 'showactive': False,
+            'x': 0.1, 'xanchor': 'right', 'y': 0, 'yanchor': 'top'
+        }]
+    )
+    return fig
@@ -0,0 +1,100 @@
+"""
+Classification vectorisée des structures sanitaires par type.
+
+Le type d'une structure est déduit de son nom (colonne
+'NOM DES STRUCTURES SANITAIRES CIBLES') à l'aide de règles ordonnées :
+la première règle dont le motif apparaît dans le nom l'emporte.
+La colonne est convertie une seule fois en chaînes Arrow, puis chaque règle
+est évaluée par un noyau Arrow (RE2, insensible à la casse) sur toute la
+colonne, sans boucle Python. Les motifs sont insensibles aux accents : chaque
+voyelle (ou 'c') du motif accepte ses variantes accentuées, ce qui évite de
+normaliser le texte ligne par ligne.
+"""
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+NOM_STRUCTURE_COL = 'NOM DES STRUCTURES SANITAIRES CIBLES'
+
+# Règles (motif, type) évaluées dans l'ordre. Les motifs sont du texte littéral,
+# comparé sans tenir compte de la casse ni des accents : 'hôpital' et 'hopital'
+# sont équivalents.
+TYPE_RULES = [
+    ('hopital', 'Hôpital'),
+    ('centre de santé', 'Centre de Santé'),
+    ('poste de santé', 'Poste de Santé'),
+    ('eps', 'EPS'),
+]
+DEFAULT_TYPE = 'Autre'
+
+# Variantes accentuées acceptées pour chaque lettre de base.
+ACCENT_VARIANTS = {
+    'a': 'aàâä', 'c': 'cç', 'e': 'eéèêë', 'i': 'iîï',
+    'o': 'oôö', 'u': 'uùûü', 'y': 'yÿ',
+}
+
+
+def fold_text(text):
+    """Met un texte en minuscules et retire ses accents ('Hôpital' -> 'hopital')."""
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def fold_strings(strings):
+    """Équivalent vectorisé de `fold_text` sur un tableau Arrow de chaînes (décomposition NFKD, diacritiques retirés)."""
+    decomposed = pc.utf8_normalize(strings, 'NFKD')
+    return pc.utf8_lower(pc.replace_substring_regex(decomposed, r'\p{Mn}', ''))
+
+
+def accent_insensitive_pattern(text):
+    """Construit l'expression régulière d'un motif littéral, insensible aux accents."""
+    return ''.join(
+        f'[{ACCENT_VARIANTS[c]}]' if c in ACCENT_VARIANTS else re.escape(c)
+        for c in fold_text(text)
+    )
+
+
+def as_arrow_strings(values):
+    """Retourne les valeurs d'une Series sous forme de tableau Arrow de chaînes, sans copie si possible."""
+    try:
+        return pa.array(values, type=pa.string(), from_pandas=True)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # Colonne hétérogène (nombres, etc.) : même règle que l'ancien str(x)
+        return pa.array(values.astype(str), type=pa.string())
+
+
+def classify_structure_types(names, rules=None, default=DEFAULT_TYPE):
+    """
+    Attribue un type à chaque nom de structure.
+
+    Args:
+        names (pd.Series): Les noms des structures sanitaires.
+        rules (list): Liste ordonnée de couples (motif, type). Par défaut `TYPE_RULES`.
+        default (str): Type attribué lorsqu'aucune règle ne correspond.
+
+    Returns:
+        pd.Series: Une Series catégorielle alignée sur `names`, dont les
+        catégories suivent l'ordre des règles.
+    """
+    rules = TYPE_RULES if rules is None else rules
+    labels = list(dict.fromkeys([label for _, label in rules] + [default]))
+    label_codes = {label: i for i, label in enumerate(labels)}
+
+    codes = np.full(len(names), label_codes[default], dtype=np.int8)
+    if rules:
+        strings = as_arrow_strings(names)
+        conditions = [
+            pc.fill_null(pc.match_substring_regex(strings, accent_insensitive_pattern(pattern), ignore_case=True), False)
+            .to_numpy(zero_copy_only=False)
+            for pattern, _ in rules
+        ]
+        choices = [label_codes[label] for _, label in rules]
+        codes = np.select(conditions, choices, default=label_codes[default]).astype(np.int8)
+
+    types = pd.Categorical.from_codes(codes, categories=labels)
+    return pd.Series(types, index=names.index, name='Type')
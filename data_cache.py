@@ -0,0 +1,124 @@
+"""
+Cache colonnaire (Parquet) du jeu de données préparé.
+
+Le cache est indexé par l'empreinte du fichier source : taille, date de
+modification et hachage du contenu. Un manifeste JSON conserve cette
+empreinte avec l'encodage détecté lors de la lecture, de sorte qu'un
+redémarrage (ou une nouvelle instance) relit directement le Parquet et que
+seul un fichier source modifié déclenche une nouvelle ingestion.
+"""
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+
+CACHE_DIR = os.environ.get('MSAS_CACHE_DIR', '.msas_cache')
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def _content_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _manifest_path(source_path, cache_dir):
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(cache_dir, f"{stem}.manifest.json")
+
+
+def _write_atomic(path, write):
+    """Écrit un fichier via un fichier temporaire puis un renommage atomique."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _save_manifest(source_path, manifest, cache_dir):
+    def write(path):
+        with open(path, 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+    _write_atomic(_manifest_path(source_path, cache_dir), write)
+
+
+def read_manifest(source_path, cache_dir=CACHE_DIR):
+    """Retourne le manifeste du cache pour `source_path`, ou {} s'il n'existe pas."""
+    try:
+        with open(_manifest_path(source_path, cache_dir), encoding='utf-8') as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def source_fingerprint(source_path, manifest=None):
+    """
+    Calcule l'empreinte (taille, mtime, hachage) du fichier source.
+
+    Le hachage du contenu n'est recalculé que si la taille ou la date de
+    modification diffèrent de celles enregistrées dans `manifest`.
+    """
+    stat = os.stat(source_path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    manifest = manifest or {}
+    if manifest.get('size') == fingerprint['size'] and manifest.get('mtime_ns') == fingerprint['mtime_ns']:
+        fingerprint['hash'] = manifest.get('hash')
+    else:
+        fingerprint['hash'] = _content_hash(source_path)
+    return fingerprint
+
+
+def load_cached_frame(source_path, build, version, cache_dir=CACHE_DIR):
+    """
+    Charge le DataFrame préparé depuis le cache, ou le reconstruit.
+
+    Args:
+        source_path (str): Le fichier CSV source.
+        build (callable): Fonction `build(encoding) -> (DataFrame, encodage_utilisé)`
+            appelée en cas d'absence ou d'invalidité du cache ; `encoding` est
+            l'encodage détecté lors de la précédente ingestion (ou None).
+        version (str): Version de la préparation ; la changer invalide le cache.
+        cache_dir (str): Répertoire du cache.
+
+    Returns:
+        tuple: (DataFrame, manifeste du cache).
+    """
+    manifest = read_manifest(source_path, cache_dir)
+    fingerprint = source_fingerprint(source_path, manifest)
+    parquet_path = os.path.join(cache_dir, manifest.get('parquet', ''))
+
+    if (manifest.get('hash') == fingerprint['hash'] and manifest.get('version') == version
+            and os.path.isfile(parquet_path)):
+        if manifest.get('mtime_ns') != fingerprint['mtime_ns']:
+            # Fichier touché mais contenu identique : on rafraîchit simplement le manifeste.
+            manifest.update(fingerprint)
+            _save_manifest(source_path, manifest, cache_dir)
+        return pd.read_parquet(parquet_path), manifest
+
+    data, encoding = build(manifest.get('encoding'))
+    if source_fingerprint(source_path, fingerprint)['hash'] != fingerprint['hash']:
+        # Source modifié pendant la lecture : le contenu lu n'a pas d'empreinte sûre, rien n'est mis en cache
+        return data, dict(fingerprint, source=os.path.abspath(source_path), version=version, stale=True)
+
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    parquet_name = f"{stem}-{fingerprint['hash']}.parquet"
+    previous = manifest.get('parquet')
+    manifest = dict(fingerprint, source=os.path.abspath(source_path), encoding=encoding,
+                    version=version, parquet=parquet_name, created=time.time(), rows=len(data))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_atomic(os.path.join(cache_dir, parquet_name), lambda path: data.to_parquet(path, index=False))
+        _save_manifest(source_path, manifest, cache_dir)
+    except OSError:
+        # Répertoire en lecture seule : le cache est simplement ignoré.
+        return data, manifest
+    if previous and previous != parquet_name:
+        try:
+            os.remove(os.path.join(cache_dir, previous))
+        except OSError:
+            pass
+    return data, manifest
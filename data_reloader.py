@@ -0,0 +1,143 @@
+"""
+Rechargement à chaud du jeu de données.
+
+Un `DatasetReloader` détient l'état partagé par toutes les sessions : le
+jeu de données préparé et ses dérivés (cube, moments, index), réunis dans un
+dictionnaire en lecture seule avec un numéro de version. Un observateur
+watchdog surveille le répertoire du CSV source ; à chaque modification, un
+fil de travail attend que les écritures cessent (`RELOAD_DELAY`), reconstruit
+un nouvel état puis le substitue à l'ancien en une seule affectation.
+
+Aucune requête n'attend donc l'ingestion, hormis le tout premier chargement :
+pendant la reconstruction, les sessions continuent d'utiliser l'état courant.
+Chaque rerun lit l'état une seule fois (`current`) et n'utilise que lui, si
+bien qu'une session en cours garde un instantané cohérent même si l'état est
+remplacé entre-temps. Une reconstruction en échec (fichier en cours de
+copie, CSV invalide) conserve l'état courant et son erreur est conservée
+dans `last_error`.
+"""
+import os
+import threading
+import time
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+
+RELOAD_DELAY = float(os.environ.get('MSAS_RELOAD_DELAY', 2.0))
+CHANGE_EVENTS = {'created', 'modified', 'moved', 'closed'}
+
+
+class _SourceChanged(FileSystemEventHandler):
+    """Signale au rechargeur toute création, modification ou renommage du fichier source."""
+
+    def __init__(self, path, notify):
+        self._path = os.path.abspath(path)
+        self._notify = notify
+
+    def on_any_event(self, event):
+        # Les lectures du CSV (dont la nôtre) produisent 'opened' / 'closed_no_write' : ignorées
+        if event.event_type not in CHANGE_EVENTS:
+            return
+        paths = {event.src_path, getattr(event, 'dest_path', '')}
+        if self._path in {os.path.abspath(path) for path in paths if path}:
+            self._notify()
+
+
+class DatasetReloader:
+    """
+    État partagé du dashboard, reconstruit en arrière-plan quand le CSV change.
+
+    Args:
+        path (str): Le fichier CSV source.
+        build (callable): `build(path) -> dict` construit l'état (jeu de
+            données et dérivés), dont 'data_version', la version des données
+            effectivement lues (voir `dataset.load_versioned_dataset`) ; le
+            rechargeur y ajoute 'version' (numéro incrémenté à chaque
+            substitution), 'loaded_at' et 'seconds'.
+        delay (float): Durée sans nouvel événement, en secondes, avant de reconstruire.
+    """
+
+    def __init__(self, path, build, delay=RELOAD_DELAY):
+        self.path = path
+        self.delay = delay
+        self.last_error = None
+        self.reloads = 0
+        self._build = build
+        self._requested = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._observer = None
+        self._worker = None
+        self._current = dict(self._load(), version=1)
+
+    def _load(self):
+        start = time.perf_counter()
+        state = self._build(self.path)
+        state.update(loaded_at=time.time(), seconds=time.perf_counter() - start)
+        return state
+
+    def current(self):
+        """État courant (à lire une fois par rerun et à ne pas modifier)."""
+        return self._current
+
+    def start(self):
+        """Démarre l'observateur du répertoire source et le fil de reconstruction ; retourne le rechargeur."""
+        self._worker = threading.Thread(target=self._run, name='msas-reloader', daemon=True)
+        self._worker.start()
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.schedule(_SourceChanged(self.path, self.request),
+                                os.path.dirname(os.path.abspath(self.path)), recursive=False)
+        self._observer.start()
+        return self
+
+    def stop(self):
+        """Arrête l'observateur et le fil de reconstruction."""
+        self._stopped.set()
+        self._requested.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._worker is not None:
+            self._worker.join()
+
+    def request(self):
+        """Demande une reconstruction (appelé par l'observateur, ou manuellement)."""
+        self._requested.set()
+
+    def _run(self):
+        while True:
+            self._requested.wait()
+            # Un fichier copié ou réécrit produit une rafale d'événements : on
+            # attend `delay` secondes sans nouvel événement avant de reconstruire
+            while not self._stopped.is_set():
+                self._requested.clear()
+                if not self._requested.wait(self.delay):
+                    break
+            if self._stopped.is_set():
+                return
+            self.reload()
+
+    def reload(self):
+        """
+        Reconstruit l'état et le substitue au courant si les données ont changé.
+
+        Returns:
+            bool: Vrai si un nouvel état a été substitué.
+        """
+        # Une seule reconstruction à la fois ; les lecteurs (`current`) ne prennent pas le verrou
+        with self._lock:
+            try:
+                state = self._load()
+            except Exception as error:  # CSV en cours d'écriture ou invalide : l'état courant est conservé
+                self.last_error = f"{type(error).__name__}: {error}"
+                return False
+            self.last_error = None
+            if state['data_version'] == self._current['data_version']:
+                return False
+            state['version'] = self._current['version'] + 1
+            # Substitution en une affectation : un rerun voit l'ancien état ou le nouveau, jamais un mélange
+            self._current = state
+            self.reloads += 1
+        return True
@@ -0,0 +1,240 @@
+"""
+Lecture et préparation du jeu de données des conventions MSAS.
+
+`prepare_data` regroupe la création des colonnes dérivées ; `load_dataset`
+l'appelle à travers le cache Parquet de `data_cache` afin de ne relire le
+CSV que lorsque son contenu change, puis fusionne les lignes d'une même
+structure (`deduplicate_structures`, voir dedup.py) et recalcule les parts
+par district sur les lignes conservées (`recompute_shares`).
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from classification import NOM_STRUCTURE_COL, classify_structure_types
+from data_cache import CACHE_DIR, load_cached_frame, read_manifest, source_fingerprint
+from dedup import STRUCTURE_ID_COL, drop_duplicate_structures, structure_ids
+
+
+DATA_FILE = 'Final_Full__type_colonnes_Cleaned.csv'
+ENCODINGS = ('utf-8', 'latin1')
+
+# Types explicites des colonnes du CSV : le schéma reste identique quel que soit
+# le morceau lu (lecture en flux) et les '--' restent des chaînes.
+SOURCE_DTYPES = {
+    'Région': str,
+    'District Sanitaire': str,
+    'NOMBRE DE DISTRICTS SANITAIRES VISITES': str,  # '--' hors première ligne du district
+    NOM_STRUCTURE_COL: str,
+    'Valeurs': 'float64',
+    'Nb Conventions Signées': 'float64',
+    'Nb Conventions Non Signées': 'float64',
+    'Part Structures Ciblées': 'float64',
+    'Part Conventions Signées': 'float64',
+    'Part Conventions Non Signées': 'float64',
+}
+
+VISITED_COL = 'NOMBRE DE DISTRICTS SANITAIRES VISITES'
+
+# Schéma compact des données préparées : catégories pour la hiérarchie et le
+# statut, petits entiers nullables pour les effectifs et le nombre de districts
+# visités (une valeur manquante reste manquante), float32 pour les parts (en %).
+CATEGORY_COLUMNS = ['Région', 'District Sanitaire', 'Type', 'Statut Convention']
+COUNT_DTYPES = {
+    'Valeurs': 'Int32',
+    'Nb Conventions Signées': 'Int16',
+    'Nb Conventions Non Signées': 'Int16',
+}
+# Types plus larges essayés, dans l'ordre, quand les effectifs dépassent celui de `COUNT_DTYPES`
+WIDER_COUNT_DTYPES = ['Int16', 'Int32', 'Int64']
+SHARE_DTYPES = {
+    'Part Structures Ciblées': 'float32',
+    'Part Conventions Signées': 'float32',
+    'Part Conventions Non Signées': 'float32',
+}
+VISITED_DTYPE = 'Int8'
+
+# Parts (en %) du district : effectif de la ligne rapporté au total 'Valeurs' de son district
+DISTRICT_COLUMNS = ['Région', 'District Sanitaire']
+SHARE_SOURCES = {
+    'Part Structures Ciblées': 'Valeurs',
+    'Part Conventions Signées': 'Nb Conventions Signées',
+    'Part Conventions Non Signées': 'Nb Conventions Non Signées',
+}
+
+# À incrémenter à chaque modification de `prepare_data` pour invalider le cache.
+PREPARATION_VERSION = '6'
+
+
+def candidate_encodings(encoding=None):
+    """Encodages à essayer, en commençant par celui détecté précédemment."""
+    candidates = [encoding] if encoding else []
+    return candidates + [candidate for candidate in ENCODINGS if candidate != encoding]
+
+
+def read_source_csv(path=DATA_FILE, encoding=None):
+    """
+    Lit le CSV source en essayant d'abord l'encodage connu.
+
+    Returns:
+        tuple: (DataFrame brut, encodage effectivement utilisé).
+    """
+    candidates = candidate_encodings(encoding)
+    for candidate in candidates[:-1]:
+        try:
+            return pd.read_csv(path, encoding=candidate, dtype=SOURCE_DTYPES), candidate
+        except UnicodeDecodeError:
+            continue
+    return pd.read_csv(path, encoding=candidates[-1], dtype=SOURCE_DTYPES), candidates[-1]
+
+
+def _as_counts(values, dtype):
+    """
+    Effectifs en entier nullable `dtype`, les valeurs manquantes restant manquantes.
+
+    Des effectifs hors de l'étendue de `dtype` prennent le premier type de
+    `WIDER_COUNT_DTYPES` qui les contient. Une colonne contenant une valeur
+    non entière (ou infinie) reste en float64, avec un avertissement : les
+    données sont chargées telles quelles plutôt que rejetées.
+    """
+    present = values.dropna()
+    invalid = ~np.isfinite(present) | (present != np.round(present))
+    if invalid.any():
+        warnings.warn(
+            f"Colonne '{values.name}' : {int(invalid.sum())} valeur(s) non entière(s) "
+            f"(ex. {present[invalid].iloc[0]!r}, ligne {present.index[invalid][0]}) ; "
+            f"la colonne est conservée en nombres décimaux.", stacklevel=3)
+        return values.astype('float64')
+    candidates = [dtype] + WIDER_COUNT_DTYPES[WIDER_COUNT_DTYPES.index(dtype) + 1:]
+    for candidate in candidates:
+        limits = np.iinfo(candidate.lower())
+        if present.empty or (limits.min <= present.min() and present.max() <= limits.max):
+            return values.astype(candidate)
+    warnings.warn(f"Colonne '{values.name}' : effectifs hors de l'étendue de {candidates[-1]} ; "
+                  f"la colonne est conservée en nombres décimaux.", stacklevel=3)
+    return values.astype('float64')
+
+
+def visited_districts(data):
+    """
+    Nombre de districts visités en entier nullable : le CSV ne le renseigne
+    que sur la première ligne de chaque district ('--' ensuite), la valeur
+    est donc reportée sur les lignes suivantes du même district.
+    """
+    visited = pd.to_numeric(data[VISITED_COL], errors='coerce').astype(VISITED_DTYPE)
+    return visited.groupby([data['Région'], data['District Sanitaire']], observed=True, sort=False).ffill()
+
+
+def continue_visited(data, previous):
+    """
+    Lecture par morceaux : reporte sur les premières lignes de `data` la valeur
+    du district en cours à la fin du morceau précédent.
+
+    Args:
+        previous (tuple): (région, district, nombre de districts visités) de la
+            dernière ligne du morceau précédent.
+    """
+    region, district, visited = previous
+    same = ((data['Région'] == region) & (data['District Sanitaire'] == district)).to_numpy()
+    leading = np.logical_and.accumulate(same) & data[VISITED_COL].isna().to_numpy()
+    if leading.any() and not pd.isna(visited):
+        data.loc[leading, VISITED_COL] = visited
+    return data
+
+
+def compact_counts(data):
+    """Convertit en place les colonnes d'effectifs présentes (voir `COUNT_DTYPES`, `_as_counts`)."""
+    for col, dtype in COUNT_DTYPES.items():
+        if col in data.columns:
+            data[col] = _as_counts(data[col], dtype)
+    return data
+
+
+def compact_schema(data):
+    """Applique le schéma compact (voir `CATEGORY_COLUMNS`, `COUNT_DTYPES`, `SHARE_DTYPES`) en place."""
+    data[VISITED_COL] = visited_districts(data)
+    compact_counts(data)
+    for col, dtype in SHARE_DTYPES.items():
+        data[col] = data[col].astype(dtype)
+    for col in CATEGORY_COLUMNS:
+        data[col] = data[col].astype('category')
+    return data
+
+
+def identify_structures(data):
+    """Ajoute le type et normalise la région : les colonnes qui délimitent les blocs de la déduplication."""
+    data['Type'] = classify_structure_types(data[NOM_STRUCTURE_COL])
+    data['Région'] = data['Région'].str.strip().str.upper()
+    return data
+
+
+def prepare_data(data):
+    """Ajoute les colonnes dérivées (Type, Statut Convention), normalise les régions et compacte le schéma."""
+    identify_structures(data)
+    data['Statut Convention'] = np.where(data['Nb Conventions Signées'] > 0, 'Signée', 'Non Signée')
+    return compact_schema(data)
+
+
+def district_totals(data):
+    """Total 'Valeurs' de chaque district (index Région × District)."""
+    return data.groupby(DISTRICT_COLUMNS, observed=True, sort=False)['Valeurs'].sum()
+
+
+def recompute_shares(data, totals=None):
+    """
+    Recalcule en place les parts par district (voir `SHARE_SOURCES`).
+
+    Les parts du CSV sont calculées sur toutes ses lignes : une fois les
+    doublons d'une structure écartés, celles des lignes restantes ne somment
+    plus à 100 % dans leur district. Un district de total nul a des parts
+    nulles ; un effectif manquant donne une part manquante.
+
+    Args:
+        totals (pd.Series): Totaux par district (voir `district_totals`), par
+            défaut ceux de `data` ; la lecture en flux les calcule en première
+            passe sur tout le fichier.
+    """
+    totals = district_totals(data) if totals is None else totals
+    row_totals = totals.reindex(pd.MultiIndex.from_frame(data[DISTRICT_COLUMNS]))
+    row_totals = row_totals.to_numpy(dtype='float64', na_value=np.nan)
+    for col, source in SHARE_SOURCES.items():
+        counts = data[source].to_numpy(dtype='float64', na_value=np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shares = np.where(row_totals > 0, counts / row_totals * 100, 0.0)
+        data[col] = shares.astype(data[col].dtype)
+    return data
+
+
+def deduplicate_structures(data):
+    """
+    Ajoute l'identifiant canonique de chaque structure ('ID Structure'), ne
+    garde que sa dernière ligne et recalcule les parts par district.
+    """
+    data[STRUCTURE_ID_COL] = structure_ids(data)[0]
+    return recompute_shares(drop_duplicate_structures(data))
+
+
+def load_versioned_dataset(path=DATA_FILE, cache_dir=CACHE_DIR):
+    """
+    Retourne le jeu de données préparé et sa version (voir `dataset_version`),
+    tirée de l'empreinte du source effectivement lu : un fichier modifié
+    pendant la lecture ne donne pas sa version aux anciennes données.
+    """
+    def build(encoding):
+        data, used_encoding = read_source_csv(path, encoding)
+        return deduplicate_structures(prepare_data(data)), used_encoding
+
+    data, manifest = load_cached_frame(path, build, PREPARATION_VERSION, cache_dir)
+    return data, f"{manifest['hash']}-{PREPARATION_VERSION}"
+
+
+def load_dataset(path=DATA_FILE, cache_dir=CACHE_DIR):
+    """Retourne le jeu de données préparé et dédupliqué, depuis le cache Parquet si le source n'a pas changé."""
+    return load_versioned_dataset(path, cache_dir)[0]
+
+
+def dataset_version(path=DATA_FILE, cache_dir=CACHE_DIR):
+    """Identifiant de version des données préparées : hachage du source + version de préparation."""
+    fingerprint = source_fingerprint(path, read_manifest(path, cache_dir))
+    return f"{fingerprint['hash']}-{PREPARATION_VERSION}"
@@ -0,0 +1,261 @@
+"""
+Déduplication des structures sanitaires à l'ingestion.
+
+Les noms de 'NOM DES STRUCTURES SANITAIRES CIBLES' varient d'un extrait à
+l'autre (espaces en fin de nom, casse, accents, 'de' omis, fautes de frappe) :
+une même structure compte alors plusieurs fois dans les indicateurs.
+Comparer tous les noms deux à deux est quadratique ; ici :
+- les noms sont normalisés (minuscules, sans accents ni ponctuation) puis
+  réduits à leur partie distinctive, sans les mots génériques du type
+  ('poste', 'santé', 'de'...) ;
+- les candidats sont regroupés en blocs (Région, District, Type) et, dans
+  un bloc, par numéros contenus dans le nom ('Khor 1' n'est jamais comparé
+  à 'Khor 2', ni 'Mboro I' à 'Mboro II') ;
+- dans chaque bloc, les noms distincts sont décomposés en trigrammes de
+  caractères et seules les paires partageant un trigramme sont scorées
+  (coefficient de Dice), par une jointure vectorisée sur les trigrammes ;
+- les paires au-dessus de `SIMILARITY_THRESHOLD` sont reliées et chaque
+  composante connexe devient une structure canonique ('ID Structure').
+
+`structure_ids` retourne les identifiants, le rapport des fusions et la
+durée de chaque étape ; `drop_duplicate_structures` ne garde que la dernière
+ligne de chaque structure (l'extrait le plus récent).
+
+Usage :
+    python -m dedup [fichier.csv] --threshold 0.85
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from classification import NOM_STRUCTURE_COL, fold_strings
+
+
+SIMILARITY_THRESHOLD = float(os.environ.get('MSAS_DEDUP_THRESHOLD', 0.85))
+BLOCK_COLUMNS = ['Région', 'District Sanitaire', 'Type']
+STRUCTURE_ID_COL = 'ID Structure'
+CANONICAL_COL = 'Nom Canonique'
+REPORT_COLUMNS = [STRUCTURE_ID_COL, *BLOCK_COLUMNS, CANONICAL_COL, NOM_STRUCTURE_COL, 'Lignes', 'Similarité']
+
+# Mots qui désignent le type ou relient les mots du nom : le type fait déjà
+# partie du bloc, ils ne distinguent donc pas deux structures.
+GENERIC_WORDS = ['poste', 'centre', 'case', 'sante', 'hopital', 'regional', 'eps\\d*',
+                 'de', 'du', 'des', 'la', 'le', 'les', 'd', 'l']
+GENERIC_PATTERN = r'\b(?:' + '|'.join(GENERIC_WORDS) + r')\b'
+# Mot contenant un caractère qui n'est ni chiffre ni chiffre romain
+NUMBER_FREE_WORD = r'\S*[^0-9ivx\s]\S*'
+CHAR_BITS = 21  # un point de code Unicode tient sur 21 bits
+
+
+def _collapse(strings, pattern):
+    return pc.utf8_trim(pc.replace_substring_regex(strings, pattern, ' '), ' ')
+
+
+def normalize_names(names):
+    """Noms en minuscules, sans accents, ponctuation ni espaces superflus (tableau Arrow)."""
+    strings = pa.array(names, type=pa.string(), from_pandas=True)
+    return _collapse(fold_strings(pc.fill_null(strings, '')), r'[^0-9a-z]+')
+
+
+def distinctive_names(normalized):
+    """Partie distinctive des noms normalisés : sans les mots génériques, ou le nom entier s'il n'en reste rien."""
+    core = _collapse(pc.replace_substring_regex(normalized, GENERIC_PATTERN, ' '), r'\s+')
+    return pc.if_else(pc.equal(core, ''), normalized, core)
+
+
+def name_numbers(names):
+    """Numéros contenus dans chaque nom, en chiffres ou romains ('mboro ii 2' -> 'ii 2')."""
+    return _collapse(pc.replace_substring_regex(names, NUMBER_FREE_WORD, ' '), r'\s+')
+
+
+def _bucket_trigrams(padded):
+    # Codes des trigrammes de noms de longueurs voisines (matrice noms × largeur)
+    width = padded.dtype.itemsize // 4
+    chars = padded.view(np.uint32).reshape(len(padded), width).astype(np.int64)
+    codes = (chars[:, :-2] << (2 * CHAR_BITS)) | (chars[:, 1:-1] << CHAR_BITS) | chars[:, 2:]
+    valid = np.arange(width - 2) < (np.char.str_len(padded)[:, None] - 2)
+    return np.nonzero(valid)[0], codes[valid]
+
+
+def trigrams(names):
+    """
+    Trigrammes distincts de chaque nom, entouré d'espaces (' khor ' ->
+    ' kh', 'kho', 'hor', 'or ').
+
+    Les noms sont traités par tranches de longueurs (puissances de deux) : la
+    largeur de la matrice de caractères d'une tranche est au plus le double
+    du nom le plus court qu'elle contient, si bien qu'un nom très long ne
+    l'impose pas à tous les autres.
+
+    Returns:
+        tuple: (position du nom, code du trigramme, nombre de trigrammes
+        distincts) ; les codes sont numérotés à partir de 0.
+    """
+    padded = [' ' + name + ' ' for name in names]
+    buckets = np.ceil(np.log2(np.maximum([len(name) for name in padded], 1))).astype(np.int64)
+    rows, codes = [], []
+    for bucket in np.unique(buckets):
+        positions = np.flatnonzero(buckets == bucket)
+        bucket_rows, bucket_codes = _bucket_trigrams(np.array([padded[pos] for pos in positions], dtype=str))
+        rows.append(positions[bucket_rows])
+        codes.append(bucket_codes)
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    codes = np.concatenate(codes) if codes else np.zeros(0, dtype=np.int64)
+    # Ordre des noms rétabli : les codes sont numérotés comme en une seule passe
+    order = np.argsort(rows, kind='stable')
+    rows, codes = rows[order], codes[order]
+    gram_codes, grams = pd.factorize(codes)
+    # Un trigramme répété dans un nom ne compte qu'une fois
+    pairs = pd.unique(rows * len(grams) + gram_codes)
+    return pairs // len(grams), pairs % len(grams), len(grams)
+
+
+def similar_pairs(groups, names, threshold=SIMILARITY_THRESHOLD):
+    """
+    Paires de noms d'un même groupe dont le coefficient de Dice sur les
+    trigrammes atteint `threshold`. Seules les paires partageant au moins un
+    trigramme sont formées, par jointure sur (groupe, trigramme).
+
+    Args:
+        groups (np.ndarray): Groupe (bloc) de chaque nom.
+        names (list): Noms à comparer.
+
+    Returns:
+        pd.DataFrame: colonnes 'left', 'right' (positions, left < right) et 'score'.
+    """
+    name_pos, grams, n_grams = trigrams(names)
+    sizes = np.bincount(name_pos, minlength=len(names))
+    keys = groups[name_pos].astype(np.int64) * n_grams + grams
+    key_codes = pd.factorize(keys)[0]
+    # Un trigramme présent dans un seul nom du groupe ne forme aucune paire
+    shared_key = np.bincount(key_codes)[key_codes] > 1
+    postings = pd.DataFrame({'key': key_codes[shared_key], 'name': name_pos[shared_key]})
+    joined = postings.merge(postings, on='key', suffixes=('_left', '_right'))
+    left, right = joined['name_left'].to_numpy(), joined['name_right'].to_numpy()
+    ordered = left < right
+    pair_codes, pairs = pd.factorize(left[ordered] * len(names) + right[ordered])
+    shared = np.bincount(pair_codes)
+    left, right = pairs // len(names), pairs % len(names)
+    scores = 2 * shared / (sizes[left] + sizes[right])
+    keep = scores >= threshold
+    return pd.DataFrame({'left': left[keep], 'right': right[keep], 'score': scores[keep]})
+
+
+def connected_components(n_nodes, left, right):
+    """Composante connexe de chaque nœud (plus petit nœud de la composante), par propagation vectorisée."""
+    labels = np.arange(n_nodes)
+    while True:
+        updated = labels.copy()
+        np.minimum.at(updated, left, labels[right])
+        np.minimum.at(updated, right, labels[left])
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def _factorize_rows(*codes):
+    # Combinaison de codes entiers (0 <= code < max + 1) en un seul code, puis renumérotation
+    combined = np.zeros(len(codes[0]), dtype=np.int64)
+    for code in codes:
+        combined = combined * (int(code.max(initial=0)) + 1) + code
+    return pd.factorize(combined)[0]
+
+
+def structure_ids(data, threshold=SIMILARITY_THRESHOLD):
+    """
+    Identifiant canonique de la structure de chaque ligne.
+
+    Returns:
+        tuple: (pd.Series int32 'ID Structure' alignée sur `data`, rapport des
+        fusions — une ligne par orthographe rattachée à un autre nom canonique,
+        voir `REPORT_COLUMNS` —, durées des étapes en secondes).
+    """
+    timings = {}
+    start = time.perf_counter()
+    raw_codes, raw_names = pd.factorize(data[NOM_STRUCTURE_COL], use_na_sentinel=False)
+    normalized = normalize_names(raw_names)
+    cores = distinctive_names(normalized)
+    core_codes, core_names = pd.factorize(cores.to_numpy(zero_copy_only=False))
+    number_codes = pd.factorize(name_numbers(pa.array(core_names)).to_numpy(zero_copy_only=False))[0]
+    timings['normalisation'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    blocks = _factorize_rows(*[pd.factorize(data[col], use_na_sentinel=False)[0] for col in BLOCK_COLUMNS])
+    row_cores = core_codes[raw_codes]
+    # Nœud : un nom distinctif dans un bloc ; les variantes exactes y sont déjà fusionnées
+    row_nodes = _factorize_rows(blocks, row_cores)
+    node_first = np.unique(row_nodes, return_index=True)[1]
+    node_cores = row_cores[node_first]
+    node_groups = _factorize_rows(blocks[node_first], number_codes[node_cores])
+    timings['blocage'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Seuls les groupes d'au moins deux noms peuvent former des paires
+    candidates = np.flatnonzero(np.bincount(node_groups)[node_groups] > 1)
+    pairs = similar_pairs(node_groups[candidates], core_names[node_cores[candidates]].tolist(), threshold)
+    pairs['left'], pairs['right'] = candidates[pairs['left']], candidates[pairs['right']]
+    timings['similarité'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    components = connected_components(len(node_first), pairs['left'].to_numpy(), pairs['right'].to_numpy())
+    ids = pd.factorize(components[row_nodes])[0].astype(np.int32)
+    report = merge_report(data, ids, raw_codes, raw_names, row_nodes, pairs)
+    timings['composantes'] = time.perf_counter() - start
+    return pd.Series(ids, index=data.index, name=STRUCTURE_ID_COL), report, timings
+
+
+def merge_report(data, ids, raw_codes, raw_names, row_nodes, pairs):
+    """
+    Orthographes rattachées à une autre : nom canonique (l'orthographe la
+    plus fréquente de la structure), nombre de lignes et meilleur score de
+    similarité du nom (1 pour une variante de casse, d'accents ou d'espaces).
+    """
+    spellings = pd.DataFrame({STRUCTURE_ID_COL: ids, 'raw': raw_codes, 'node': row_nodes})
+    counts = spellings.groupby([STRUCTURE_ID_COL, 'raw', 'node'], sort=False).size().rename('Lignes').reset_index()
+    counts = counts.sort_values([STRUCTURE_ID_COL, 'Lignes'], ascending=[True, False], kind='stable')
+    canonical = counts.drop_duplicates(STRUCTURE_ID_COL).set_index(STRUCTURE_ID_COL)['raw']
+    variants = counts[counts['raw'].to_numpy() != canonical.reindex(counts[STRUCTURE_ID_COL]).to_numpy()]
+
+    best = pd.concat([pairs.set_index('left')['score'], pairs.set_index('right')['score']]).groupby(level=0).max()
+    # Identifiants numérotés à partir de 0 : la première ligne de chaque structure donne son bloc
+    first_rows = np.unique(ids, return_index=True)[1]
+    variant_rows = first_rows[variants[STRUCTURE_ID_COL].to_numpy()]
+    report = data[BLOCK_COLUMNS].iloc[variant_rows].reset_index(drop=True)
+    report.insert(0, STRUCTURE_ID_COL, variants[STRUCTURE_ID_COL].to_numpy())
+    report[CANONICAL_COL] = raw_names[canonical.reindex(variants[STRUCTURE_ID_COL]).to_numpy()]
+    report[NOM_STRUCTURE_COL] = raw_names[variants['raw'].to_numpy()]
+    report['Lignes'] = variants['Lignes'].to_numpy()
+    report['Similarité'] = best.reindex(variants['node']).fillna(1.0).round(3).to_numpy()
+    return report[REPORT_COLUMNS]
+
+
+def drop_duplicate_structures(data):
+    """Garde la dernière ligne de chaque structure ('ID Structure'), index renuméroté."""
+    return data[~data[STRUCTURE_ID_COL].duplicated(keep='last')].reset_index(drop=True)
+
+
+def main():
+    from dataset import DATA_FILE, prepare_data, read_source_csv
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', nargs='?', default=DATA_FILE)
+    parser.add_argument('--threshold', type=float, default=SIMILARITY_THRESHOLD)
+    args = parser.parse_args()
+
+    data = prepare_data(read_source_csv(args.source)[0])
+    ids, report, timings = structure_ids(data, args.threshold)
+    print(f"{len(data):,} lignes, {ids.nunique():,} structures, {len(report):,} orthographes fusionnées")
+    print(', '.join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in timings.items()))
+    if len(report):
+        with pd.option_context('display.max_rows', 200, 'display.width', 200, 'display.max_colwidth', 40):
+            print(report.drop(columns=['Région']).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
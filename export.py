@@ -0,0 +1,103 @@
+"""
+Export des données affichées dans l'explorateur (CSV, Parquet, XLSX).
+
+Les exports sont écrits par morceaux de `EXPORT_CHUNK_ROWS` lignes dans un
+tampon en mémoire, ce qui évite de construire d'un bloc la représentation
+texte de tout le tableau. L'export peut aussi être découpé par région ou par
+district : chaque groupe devient un fichier d'une archive zip.
+Ces fonctions ne dépendent pas de Streamlit ; l'application décide quand les
+appeler (uniquement sur demande) et met leur résultat en cache.
+"""
+import importlib.util
+import io
+import re
+import zipfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from classification import fold_text
+
+
+EXPORT_CHUNK_ROWS = 100_000
+# Une feuille Excel est limitée à 1 048 576 lignes, en-tête compris
+XLSX_MAX_ROWS = 1_048_575
+XLSX_ENGINE = 'openpyxl'
+
+EXPORT_FORMATS = {
+    'csv': {'label': 'CSV (;)', 'extension': 'csv', 'mime': 'text/csv'},
+    'parquet': {'label': 'Parquet', 'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'xlsx': {'label': 'Excel (XLSX)', 'extension': 'xlsx',
+             'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'},
+}
+
+# Découpages proposés : None = un seul fichier, sinon colonnes de regroupement (archive zip)
+EXPORT_SPLITS = {
+    'Fichier unique': None,
+    'Un fichier par région (zip)': ['Région'],
+    'Un fichier par district (zip)': ['Région', 'District Sanitaire'],
+}
+
+
+def available_formats(n_rows):
+    """Formats exportables pour `n_rows` lignes (XLSX exige openpyxl et respecte la limite d'Excel)."""
+    formats = ['csv', 'parquet']
+    if importlib.util.find_spec(XLSX_ENGINE) is not None and n_rows <= XLSX_MAX_ROWS:
+        formats.append('xlsx')
+    return formats
+
+
+def _chunks(data, chunk_rows):
+    for start in range(0, max(len(data), 1), chunk_rows):
+        yield start, data.iloc[start:start + chunk_rows]
+
+
+def _write_csv(data, buffer, chunk_rows):
+    for start, chunk in _chunks(data, chunk_rows):
+        buffer.write(chunk.to_csv(index=False, sep=';', header=start == 0).encode('utf-8'))
+
+
+def _write_parquet(data, buffer, chunk_rows):
+    writer = None
+    for _, chunk in _chunks(data, chunk_rows):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(buffer, table.schema, compression='zstd')
+        writer.write_table(table.cast(writer.schema))
+    writer.close()
+
+
+def _write_xlsx(data, buffer, chunk_rows):
+    if len(data) > XLSX_MAX_ROWS:
+        raise ValueError(f"Trop de lignes pour une feuille Excel ({len(data):,} > {XLSX_MAX_ROWS:,}).")
+    with pd.ExcelWriter(buffer, engine=XLSX_ENGINE) as writer:
+        for start, chunk in _chunks(data, chunk_rows):
+            # La première ligne de la feuille est l'en-tête
+            chunk.to_excel(writer, sheet_name='Données', index=False,
+                           header=start == 0, startrow=0 if start == 0 else start + 1)
+
+
+_WRITERS = {'csv': _write_csv, 'parquet': _write_parquet, 'xlsx': _write_xlsx}
+
+
+def export_bytes(data, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Sérialise `data` au format `fmt` ('csv', 'parquet' ou 'xlsx') et retourne les octets."""
+    buffer = io.BytesIO()
+    _WRITERS[fmt](data, buffer, chunk_rows)
+    return buffer.getvalue()
+
+
+def _file_stem(key):
+    parts = key if isinstance(key, tuple) else (key,)
+    return '_'.join(re.sub(r'[^0-9a-z]+', '-', fold_text(part)).strip('-') or 'na' for part in parts)
+
+
+def export_zip(data, by, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Archive zip contenant un fichier `fmt` par groupe de `by` (ex. ['Région'])."""
+    extension = EXPORT_FORMATS[fmt]['extension']
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for key, group in data.groupby(by if len(by) > 1 else by[0], sort=True, observed=True):
+            archive.writestr(f"{_file_stem(key)}.{extension}", export_bytes(group, fmt, chunk_rows))
+    return buffer.getvalue()
@@ -0,0 +1,108 @@
+"""
+Cache partagé des figures Plotly, borné en octets avec éviction LRU.
+
+Les figures sont indexées par (identifiant du graphique, version des données,
+clé de filtre) : un utilisateur qui revient sur une combinaison de filtres
+déjà vue, ou un autre utilisateur qui la demande, n'a plus à recalculer la
+figure.
+
+Le cache ne conserve pas les objets `Figure` mais leur sérialisation JSON,
+produite une fois à la construction : une chaîne immuable, que les sessions
+partagent sans risque de la modifier. Sa taille est la charge réellement
+envoyée au navigateur ; c'est elle qui est décomptée du budget. Chaque appel
+retourne une nouvelle `go.Figure` reconstruite à partir de ce JSON, propre à
+l'appelant.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from profiling import cache_event
+
+
+DEFAULT_MAX_BYTES = int(os.environ.get('MSAS_FIGURE_CACHE_MB', '64')) * 1024 * 1024
+
+
+def figure_payload(figure):
+    """Sérialisation JSON de la figure et sa taille en octets."""
+    payload = pio.to_json(figure, validate=False)
+    return payload, len(payload.encode('utf-8'))
+
+
+def figure_from_payload(payload):
+    """Nouvelle figure reconstruite à partir de sa sérialisation JSON."""
+    return go.Figure(json.loads(payload), skip_invalid=True)
+
+
+class FigureCache:
+    """Cache LRU de figures sérialisées, thread-safe, borné par un budget en octets."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_served = 0
+
+    def get_or_build(self, key, build, *args):
+        """
+        Retourne la figure associée à `key`, en la construisant avec
+        `build(*args)` si besoin. La figure retournée appartient à l'appelant.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.bytes_served += entry[1]
+        if entry is not None:
+            cache_event(True)
+            return figure_from_payload(entry[0])
+
+        # Construction hors verrou : les autres sessions ne sont pas bloquées
+        cache_event(False)
+        figure = build(*args)
+        payload, size = figure_payload(figure)
+        with self._lock:
+            self.misses += 1
+            self.bytes_served += size
+            if size <= self.max_bytes:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._bytes -= previous[1]
+                self._entries[key] = (payload, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self._bytes -= evicted_size
+                    self.evictions += 1
+        # Reconstruite comme lors d'un succès : le JSON envoyé, et donc l'identifiant
+        # de l'élément calculé par Streamlit, est le même d'un rerun à l'autre
+        return figure_from_payload(payload)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Compteurs du cache (entrées, octets, succès/échecs, octets servis)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'bytes_served': self.bytes_served,
+            }
@@ -0,0 +1,83 @@
+"""
+Index des filtres Région / District, construit une seule fois au chargement.
+
+Plutôt que de recalculer un masque booléen sur tout le DataFrame à chaque
+interaction, on mémorise les positions des lignes de chaque région, de chaque
+couple (région, district), de chaque nom de district et de chaque triplet
+(région, district, statut de convention), ainsi que les listes
+triées proposées dans les menus. Appliquer un filtre devient une simple
+extraction (`take`) des k lignes concernées.
+"""
+import numpy as np
+
+
+def _frozen(positions):
+    positions = np.asarray(positions, dtype=np.int64)
+    positions.flags.writeable = False
+    return positions
+
+
+def build_filter_index(data):
+    """
+    Construit l'index des filtres d'un jeu de données préparé.
+
+    Returns:
+        dict: 'regions' (liste triée), 'districts' (liste triée de tous les districts),
+        'districts_by_region' (région -> districts triés), 'region_rows' (région -> positions),
+        'district_rows' ((région, district) -> positions), 'district_name_rows'
+        (district -> positions, toutes régions confondues), 'status_rows'
+        ((région, district, statut) -> positions).
+    """
+    def rows_by(keys):
+        # observed=True : seules les modalités présentes (colonnes catégorielles)
+        return {key: _frozen(rows) for key, rows in data.groupby(keys, observed=True, sort=True).indices.items()}
+
+    region_rows = rows_by('Région')
+    district_rows = rows_by(['Région', 'District Sanitaire'])
+    district_name_rows = rows_by('District Sanitaire')
+    status_rows = rows_by(['Région', 'District Sanitaire', 'Statut Convention'])
+
+    districts_by_region = {region: [] for region in region_rows}
+    for region, district in district_rows:
+        districts_by_region[region].append(district)
+
+    return {
+        'regions': list(region_rows),
+        'districts': list(district_name_rows),
+        'districts_by_region': districts_by_region,
+        'region_rows': region_rows,
+        'district_rows': district_rows,
+        'district_name_rows': district_name_rows,
+        'status_rows': status_rows,
+    }
+
+
+def filter_positions(index, region=None, district=None):
+    """Positions des lignes correspondant au filtre (None = toutes les lignes)."""
+    if region is None and district is None:
+        return None
+    if region is None:
+        return index['district_name_rows'].get(district, _frozen([]))
+    if district is None:
+        return index['region_rows'].get(region, _frozen([]))
+    return index['district_rows'].get((region, district), _frozen([]))
+
+
+def status_positions(index, region, district, status):
+    """Positions des lignes d'un district ayant le statut de convention `status`."""
+    return index['status_rows'].get((region, district, status), _frozen([]))
+
+
+def select_rows(data, index, region=None, district=None):
+    """
+    Retourne les lignes de `data` correspondant au filtre, dans leur ordre d'origine.
+
+    Des lignes contiguës (cas d'un extrait rangé par région et district) sont
+    renvoyées sous forme de tranche : une vue sur `data`, sans copie.
+    """
+    positions = filter_positions(index, region, district)
+    if positions is None:
+        return data
+    if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+        return data.iloc[positions[0]:positions[-1] + 1]
+    return data.take(positions)
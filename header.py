@@ -0,0 +1,158 @@
+"""
+Titre animé (machine à écrire) du dashboard.
+
+Le HTML est produit sans appel à Streamlit. Deux rendus :
+- `animated_header_html` : document d'iframe dont l'animation est pilotée
+  par `requestAnimationFrame`. Le texte n'est réécrit que lorsqu'un
+  caractère change, l'animation est suspendue tant que l'onglet est caché
+  et s'arrête après `cycles` allers-retours sur le titre et le sous-titre
+  complets. Le document contient déjà le texte final : sans JavaScript, ou
+  avec `prefers-reduced-motion`, il s'affiche tel quel.
+- `static_header_html` : le même titre sans iframe ni script, en Markdown
+  HTML, pour les postes les plus modestes.
+
+Le document ne dépend que de ses paramètres : d'un rerun à l'autre,
+l'élément est identique, le navigateur conserve l'iframe existante sans
+relancer l'animation, et le cache de messages de Streamlit (seuil
+`global.minCachedMessageSize` abaissé dans `.streamlit/config.toml`)
+n'envoie plus qu'une référence à son empreinte.
+"""
+import html
+import json
+
+from assets import FONT_STACK, font_face_css
+
+
+HEADER_MODES = ('animated', 'static')
+DEFAULT_CYCLES = 2
+HEADER_HEIGHT = 180
+
+
+def _compact(source):
+    # Indentation et commentaires ne sont pas envoyés au navigateur
+    lines = (line.strip() for line in source.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith('//'))
+
+_HEADER_CSS = """
+.dynamic-title-container {{ min-height: 120px; }}
+.dynamic-title {{
+    font-size: 2.2rem; font-weight: 700; color: {title_color};
+    border-bottom: 3px solid {title_color};
+    padding-bottom: 10px; margin-bottom: 0.5rem; min-height: 50px;
+}}
+.dynamic-subtitle {{ font-size: 1.1rem; color: #333333; min-height: 30px; }}
+"""
+
+# Le curseur ne clignote que pendant la frappe : une fois l'animation finie,
+# plus aucune image n'est recalculée
+_ANIMATED_CSS = """
+body {{ font-family: {font_stack}; background-color: transparent; }}
+.typing-cursor {{
+    display: none; width: 10px; height: 1.7rem; margin-left: 2px;
+    background-color: {cursor_color}; vertical-align: bottom;
+}}
+.typing .typing-cursor {{ display: inline-block; animation: blink 1s step-end infinite; }}
+@keyframes blink {{
+    from, to {{ background-color: transparent; }}
+    50% {{ background-color: {cursor_color}; }}
+}}
+"""
+
+_ANIMATED_SCRIPT = """
+(function () {
+    var cfg = %s;
+    if (cfg.cycles < 1 || window.matchMedia('(prefers-reduced-motion: reduce)').matches) return;
+    var lines = [document.getElementById('dynamic-title'), document.getElementById('dynamic-subtitle')];
+    var texts = lines.map(function (line) {
+        return line.firstChild || line.appendChild(document.createTextNode(''));
+    });
+    // Découpage par point de code : un emoji n'est jamais coupé en deux
+    var chars = cfg.texts.map(function (text) { return Array.from(text); });
+    var cursor = document.createElement('span');
+    cursor.className = 'typing-cursor';
+    // Segments de la chronologie : [ligne, longueur de départ, longueur d'arrivée, durée]
+    var steps = [];
+    for (var c = 0; c < cfg.cycles; c++) {
+        [0, 1].forEach(function (i) {
+            var n = chars[i].length;
+            steps.push([i, 0, n, n * cfg.typing], [i, n, n, cfg.pause], [i, n, 0, n * cfg.deleting]);
+        });
+    }
+    steps.push([0, 0, chars[0].length, chars[0].length * cfg.typing]);
+    steps.push([1, 0, chars[1].length, chars[1].length * cfg.typing]);
+    var index = 0, elapsed = 0, last = null, shown = [-1, -1];
+
+    function show(i, length) {
+        // Le DOM n'est touché que lorsqu'un caractère apparaît ou disparaît
+        if (shown[i] === length) return;
+        shown[i] = length;
+        texts[i].data = chars[i].slice(0, length).join('');
+    }
+
+    function frame(now) {
+        // Un onglet caché ne reçoit plus d'images : le temps écoulé entre-temps n'est pas compté
+        elapsed += last === null ? 0 : Math.min(now - last, 100);
+        last = now;
+        while (index < steps.length && elapsed >= steps[index][3]) {
+            elapsed -= steps[index][3];
+            show(steps[index][0], steps[index][2]);
+            index++;
+        }
+        if (index >= steps.length) {
+            document.body.classList.remove('typing');
+            cursor.remove();
+            return;
+        }
+        var step = steps[index];
+        var length = Math.round(step[1] + (step[2] - step[1]) * elapsed / step[3]);
+        // Une seule ligne est visible pendant les allers-retours, comme la version d'origine
+        if (index < steps.length - 2) show(1 - step[0], 0);
+        show(step[0], length);
+        if (cursor.parentNode !== lines[step[0]]) lines[step[0]].appendChild(cursor);
+        window.requestAnimationFrame(frame);
+    }
+
+    document.addEventListener('visibilitychange', function () { last = null; });
+    document.body.classList.add('typing');
+    show(0, 0);
+    show(1, 0);
+    window.requestAnimationFrame(frame);
+})();
+"""
+
+
+def animated_header_html(title, subtitle, title_color="#2F3C7E", cursor_color="#2F3C7E",
+                         typing_speed=70, delete_speed=40, pause_duration=1500, cycles=DEFAULT_CYCLES):
+    """
+    Document HTML du titre animé, pour `st.components.v1.html`.
+
+    Args:
+        cycles (int): Nombre d'allers-retours avant que le titre et le
+            sous-titre restent affichés ; 0 affiche directement le texte final.
+        Les autres paramètres sont ceux de `dynamic_typing_header`.
+    """
+    config = {
+        'texts': [title, subtitle], 'cycles': int(cycles), 'typing': typing_speed,
+        'deleting': delete_speed, 'pause': pause_duration,
+    }
+    # `<\\/` empêche un `</script>` du texte de fermer le script
+    script = _compact(_ANIMATED_SCRIPT) % json.dumps(config, ensure_ascii=False).replace('</', '<\\/')
+    style = _compact(font_face_css() + _ANIMATED_CSS.format(font_stack=FONT_STACK, cursor_color=cursor_color)
+                     + _HEADER_CSS.format(title_color=title_color))
+    return (
+        f"<html><head><style>{style}</style></head><body>"
+        f"<div class=\"dynamic-title-container\">"
+        f"<div id=\"dynamic-title\" class=\"dynamic-title\">{html.escape(title)}</div>"
+        f"<div id=\"dynamic-subtitle\" class=\"dynamic-subtitle\">{html.escape(subtitle)}</div>"
+        f"</div><script>{script}</script></body></html>"
+    )
+
+
+def static_header_html(title, subtitle, title_color="#2F3C7E"):
+    """Titre et sous-titre fixes, pour `st.markdown(..., unsafe_allow_html=True)`."""
+    return (
+        f"<style>{_compact(_HEADER_CSS.format(title_color=title_color))}</style>"
+        f"<div class=\"dynamic-title-container\">"
+        f"<div class=\"dynamic-title\">{html.escape(title)}</div>"
+        f"<div class=\"dynamic-subtitle\">{html.escape(subtitle)}</div></div>"
+    )
@@ -0,0 +1,237 @@
+"""
+Ingestion en flux des extraits de conventions volumineux.
+
+Le CSV est lu par morceaux de taille bornée : chaque morceau est préparé
+(classification des types, normalisation des régions, statut), agrégé puis
+fusionné dans l'agrégat courant et dans les accumulateurs statistiques par
+Région × District (voir stats_engine.py), et ses lignes sont ajoutées à un
+magasin Parquet compressé sur disque. La mémoire de pointe dépend donc de la taille
+des morceaux et du nombre de groupes, jamais de la taille du fichier.
+
+Comme `dataset.load_dataset`, chaque structure n'est comptée qu'une fois
+(voir dedup.py) : une première passe ne lit que les colonnes d'identité
+(région, district, nom), en ne gardant que leurs combinaisons distinctes, et
+détermine la dernière ligne de chaque structure, ainsi que le total
+'Valeurs' de chaque district sur ces seules lignes ; la seconde passe ignore
+les autres lignes et recalcule les parts par district à partir de ces totaux
+(voir `dataset.recompute_shares`).
+
+Usage :
+    python -m ingestion fichier.csv --chunksize 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from aggregates import aggregate_chunk, merge_aggregates
+from data_cache import CACHE_DIR
+from classification import NOM_STRUCTURE_COL
+from dataset import (COUNT_DTYPES, DATA_FILE, SOURCE_DTYPES, VISITED_COL, candidate_encodings, compact_counts,
+                     continue_visited, district_totals, identify_structures, prepare_data, recompute_shares)
+from dedup import structure_ids
+from stats_engine import combine_moments, compute_moments
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+DEFAULT_CHUNKSIZE = 200_000
+IDENTITY_COLUMNS = ['Région', 'District Sanitaire', NOM_STRUCTURE_COL]
+
+
+def peak_rss_mb():
+    """Mémoire résidente de pointe du processus, en Mo (None si indisponible)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS et en kilo-octets sous Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def default_store_path(source_path, cache_dir=CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(cache_dir, f"{stem}.rows.parquet")
+
+
+def kept_rows(source_path, encoding, chunksize):
+    """
+    Première passe : positions (dans le CSV) de la dernière ligne de chaque
+    structure, en masque booléen, et total 'Valeurs' de chaque district sur
+    ces lignes (voir `dataset.district_totals`). Seule la dernière ligne de
+    chaque combinaison des colonnes d'identité est conservée d'un morceau à
+    l'autre.
+    """
+    identities = []
+    n_rows = 0
+    reader = pd.read_csv(source_path, encoding=encoding, usecols=IDENTITY_COLUMNS + ['Valeurs'],
+                         dtype={col: SOURCE_DTYPES[col] for col in IDENTITY_COLUMNS + ['Valeurs']},
+                         chunksize=chunksize)
+    for chunk in reader:
+        chunk.index = pd.RangeIndex(n_rows, n_rows + len(chunk))
+        n_rows += len(chunk)
+        identities.append(chunk.drop_duplicates(IDENTITY_COLUMNS, keep='last'))
+    keep = np.zeros(n_rows, dtype=bool)
+    totals = pd.Series(dtype='float64')
+    if identities:
+        # Index : position de la dernière occurrence de chaque combinaison, dans l'ordre du fichier
+        unique = identify_structures(pd.concat(identities).drop_duplicates(IDENTITY_COLUMNS, keep='last'))
+        ids = structure_ids(unique)[0]
+        last = ~ids.duplicated(keep='last')
+        keep[ids.index[last]] = True
+        totals = district_totals(unique[last.to_numpy()])
+    return keep, totals
+
+
+def _ingest(source_path, encoding, chunksize, store_path, on_chunk):
+    aggregates = None
+    moments = None
+    reports = []
+    writer = None
+    tmp_path = f"{store_path}.{os.getpid()}.tmp"
+    start = time.perf_counter()
+    rows_total = 0
+    previous_row = None
+    offset = 0
+    try:
+        keep, totals = kept_rows(source_path, encoding, chunksize)
+        reader = pd.read_csv(source_path, encoding=encoding, dtype=SOURCE_DTYPES, chunksize=chunksize)
+        chunk_start = time.perf_counter()
+        for index, chunk in enumerate(reader):
+            # Le temps mesuré inclut la lecture et l'analyse du morceau
+            chunk = prepare_data(chunk)
+            if previous_row is not None:
+                # Un district à cheval sur deux morceaux garde son nombre de districts visités
+                continue_visited(chunk, previous_row)
+            if len(chunk):
+                previous_row = tuple(chunk[['Région', 'District Sanitaire', VISITED_COL]].iloc[-1])
+            chunk_keep = keep[offset:offset + len(chunk)]
+            offset += len(chunk)
+            if not chunk_keep.all():
+                chunk = chunk[chunk_keep].reset_index(drop=True)
+            recompute_shares(chunk, totals)
+            aggregates = merge_aggregates([aggregates, aggregate_chunk(chunk)])
+            chunk_moments = compute_moments(chunk)
+            moments = chunk_moments if moments is None else combine_moments(moments, chunk_moments)
+
+            # Effectifs en float64 dans le magasin : le schéma, fixé au premier morceau, accepte
+            # ainsi des effectifs plus grands ou non entiers dans les morceaux suivants
+            table = pa.Table.from_pandas(chunk.astype({col: 'float64' for col in COUNT_DTYPES}),
+                                         preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema, compression='zstd')
+            writer.write_table(table.cast(writer.schema))
+
+            elapsed = time.perf_counter() - chunk_start
+            rows_total += len(chunk)
+            report = {
+                'chunk': index,
+                'rows': len(chunk),
+                'rows_total': rows_total,
+                'seconds': round(elapsed, 4),
+                'rows_per_second': round(len(chunk) / elapsed) if elapsed > 0 else None,
+                'peak_rss_mb': peak_rss_mb(),
+                'groups': len(aggregates),
+            }
+            reports.append(report)
+            if on_chunk is not None:
+                on_chunk(report)
+            chunk_start = time.perf_counter()
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if writer is not None:
+        writer.close()
+        os.replace(tmp_path, store_path)
+
+    total = time.perf_counter() - start
+    summary = {
+        'source': os.path.abspath(source_path),
+        'encoding': encoding,
+        'rows': rows_total,
+        'seconds': round(total, 4),
+        'rows_per_second': round(rows_total / total) if total > 0 else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'store': store_path if writer is not None else None,
+    }
+    return merge_aggregates([aggregates]), moments, pd.DataFrame(reports), summary
+
+
+def stream_ingest(source_path=DATA_FILE, chunksize=DEFAULT_CHUNKSIZE, store_path=None,
+                  encoding=None, on_chunk=None):
+    """
+    Ingère un CSV en flux, morceau par morceau.
+
+    Args:
+        source_path (str): Le fichier CSV source.
+        chunksize (int): Nombre de lignes par morceau.
+        store_path (str): Fichier Parquet recevant les lignes préparées
+            (par défaut dans le répertoire du cache).
+        encoding (str): Encodage à essayer en premier (ex. celui du manifeste).
+        on_chunk (callable): Appelée avec le rapport de chaque morceau traité.
+
+    Returns:
+        tuple: (agrégat Région × District × Type × Statut,
+                accumulateurs statistiques par Région × District (None si le
+                fichier est vide), DataFrame des rapports par morceau, résumé global).
+    """
+    store_path = store_path or default_store_path(source_path)
+    os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+    candidates = candidate_encodings(encoding)
+    for candidate in candidates[:-1]:
+        try:
+            return _ingest(source_path, candidate, chunksize, store_path, on_chunk)
+        except UnicodeDecodeError:
+            # Erreur de décodage en cours de lecture : on recommence avec l'encodage suivant
+            continue
+    return _ingest(source_path, candidates[-1], chunksize, store_path, on_chunk)
+
+
+def read_row_store(store_path, region=None, district=None, columns=None):
+    """
+    Relit les lignes du magasin Parquet pour l'explorateur de données brutes.
+
+    Les filtres Région/District sont poussés jusqu'au lecteur Parquet, qui
+    n'ouvre que les groupes de lignes concernés. Les effectifs, stockés en
+    float64, reprennent leur type compact (voir `dataset.compact_counts`).
+    """
+    filters = []
+    if region is not None:
+        filters.append(('Région', '==', region))
+    if district is not None:
+        filters.append(('District Sanitaire', '==', district))
+    return compact_counts(pd.read_parquet(store_path, columns=columns, filters=filters or None))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion en flux d'un extrait de conventions.")
+    parser.add_argument('source', nargs='?', default=DATA_FILE)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--store', help="Magasin Parquet des lignes préparées")
+    parser.add_argument('--aggregates', help="Fichier Parquet où écrire l'agrégat final")
+    args = parser.parse_args()
+
+    def print_report(report):
+        print(f"morceau {report['chunk']:>4} : {report['rows']:>9,} lignes en {report['seconds']:.3f} s "
+              f"({report['rows_per_second'] or 0:,} lignes/s), RSS max {report['peak_rss_mb'] or 0:.0f} Mo")
+
+    aggregates, _, _, summary = stream_ingest(args.source, args.chunksize, args.store, on_chunk=print_report)
+    if args.aggregates:
+        aggregates.to_parquet(args.aggregates, index=False)
+    print(f"Total : {summary['rows']:,} lignes en {summary['seconds']:.2f} s "
+          f"({summary['rows_per_second'] or 0:,} lignes/s), {len(aggregates):,} groupes, "
+          f"encodage {summary['encoding']}, magasin {summary['store']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Profilage optionnel d'un rerun du dashboard.
+
+Un `Profiler` découpe le rerun en étapes (`step`, `call`) : chargement des données,
+indicateurs, section ouverte, synthèse, explorateur... Pour chacune il
+relève le temps écoulé, le nombre de lignes traitées, les succès et échecs
+de cache, et le nombre et la taille sérialisée des éléments envoyés au
+navigateur (figures, tableaux, texte), par type d'élément.
+
+Les modules instrumentés appellent `cache_event` / `cache_miss` sans
+connaître le profileur : ces appels ne font rien hors d'une étape profilée.
+Les enregistrements peuvent être ajoutés à un fichier JSON lines pour une
+analyse hors ligne.
+"""
+import contextvars
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from data_cache import CACHE_DIR
+
+
+PROFILE_LOG = os.environ.get('MSAS_PROFILE_LOG', os.path.join(CACHE_DIR, 'profile.jsonl'))
+
+# Étape profilée en cours dans ce fil d'exécution (None hors profilage)
+_current_span = contextvars.ContextVar('msas_profile_span', default=None)
+
+
+def cache_event(hit):
+    """Compte un succès (`hit=True`) ou un échec de cache dans l'étape en cours."""
+    span = _current_span.get()
+    if span is not None:
+        span['cache_hits' if hit else 'cache_misses'] += 1
+
+
+def cache_miss():
+    """
+    À appeler dans le corps d'une fonction mise en cache par Streamlit : il
+    n'est exécuté qu'en cas d'échec, l'appel `Profiler.call(..., cached=True)`
+    en cours le compte donc comme échec, et comme succès sinon.
+    """
+    span = _current_span.get()
+    if span is not None:
+        span['_missed'] = True
+
+
+def _new_span(name, rows):
+    return {
+        'name': name, 'seconds': 0.0, 'rows': rows, 'cache_hits': 0, 'cache_misses': 0,
+        'elements': 0, 'bytes': 0, 'by_type': {}, '_missed': False,
+    }
+
+
+class Profiler:
+    """
+    Étapes profilées d'un rerun ; inactif (aucune mesure) si `enabled` est faux.
+
+    `step(name)` clôt l'étape en cours et en ouvre une nouvelle : une suite
+    d'appels découpe le script de haut en bas. `call(name, func)` profile un
+    appel isolé à l'intérieur de l'étape en cours.
+    """
+
+    def __init__(self, enabled=True, **context):
+        self.enabled = enabled
+        self.context = context
+        self.spans = []
+        self._start = time.perf_counter()
+        self._open = None
+
+    def _open_span(self, name, rows):
+        span = _new_span(name, rows)
+        self.spans.append(span)
+        return span, _current_span.set(span), time.perf_counter()
+
+    @staticmethod
+    def _close_span(span, token, start):
+        span['seconds'] = time.perf_counter() - start
+        _current_span.reset(token)
+
+    def step(self, name, rows=None):
+        """Clôt l'étape en cours et ouvre l'étape `name`."""
+        if not self.enabled:
+            return
+        self._close_step()
+        self._open = self._open_span(name, rows)
+
+    def _close_step(self):
+        if self._open is not None:
+            self._close_span(*self._open)
+            self._open = None
+
+    def call(self, name, func, *args, rows=None, cached=False):
+        """
+        Appelle `func(*args)` dans une étape `name`.
+
+        Args:
+            rows (int): Lignes traitées ; par défaut celles du résultat
+                lorsqu'il s'agit d'un tableau.
+            cached (bool): `func` est mise en cache par Streamlit et signale
+                ses échecs par `cache_miss()`.
+        """
+        if not self.enabled:
+            return func(*args)
+        span, token, start = self._open_span(name, rows)
+        try:
+            result = func(*args)
+        finally:
+            self._close_span(span, token, start)
+        if rows is None and hasattr(result, 'shape'):
+            span['rows'] = result.shape[0]
+        if cached:
+            span['cache_misses' if span['_missed'] else 'cache_hits'] += 1
+        return result
+
+    def finish(self):
+        """Clôt la dernière étape et retourne l'enregistrement du rerun (voir `record`)."""
+        self._close_step()
+        return self.record()
+
+    def set_rows(self, rows):
+        """Renseigne les lignes traitées par l'étape en cours."""
+        span = _current_span.get()
+        if span is not None:
+            span['rows'] = rows
+
+    def record_element(self, kind, size):
+        """Attribue un élément envoyé au navigateur (type, octets sérialisés) à l'étape en cours."""
+        span = _current_span.get()
+        if span is None:
+            return
+        span['elements'] += 1
+        span['bytes'] += size
+        counts = span['by_type'].setdefault(kind, [0, 0])
+        counts[0] += 1
+        counts[1] += size
+
+    def record(self):
+        """Enregistrement du rerun : contexte, durée totale et étapes (une ligne du journal)."""
+        return {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            **self.context,
+            'seconds': round(time.perf_counter() - self._start, 6),
+            'spans': [
+                {key: (round(value, 6) if key == 'seconds' else value)
+                 for key, value in span.items() if not key.startswith('_')}
+                for span in self.spans
+            ],
+        }
+
+    def to_frame(self):
+        """Une ligne par étape, pour l'affichage dans le panneau de profilage."""
+        return pd.DataFrame([
+            {
+                'Étape': span['name'],
+                'Temps (ms)': round(span['seconds'] * 1000, 1),
+                'Lignes': span['rows'],
+                'Cache (succès/échecs)': f"{span['cache_hits']}/{span['cache_misses']}",
+                'Éléments': span['elements'],
+                'Octets envoyés': span['bytes'],
+                'Détail': ', '.join(f"{kind}: {count} ({size / 1024:,.1f} Ko)"
+                                    for kind, (count, size) in sorted(span['by_type'].items())),
+            }
+            for span in self.spans
+        ])
+
+
+def append_jsonl(record, path=PROFILE_LOG):
+    """Ajoute un enregistrement au fichier JSON lines `path`."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as log:
+        log.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+
+def read_jsonl(path=PROFILE_LOG):
+    """Relit un journal de profilage : une ligne par (rerun, étape)."""
+    rows = []
+    with open(path, encoding='utf-8') as log:
+        for line in log:
+            record = json.loads(line)
+            spans = record.pop('spans')
+            rows.extend({**record, 'run_seconds': record['seconds'], **span} for span in spans)
+    return pd.DataFrame(rows)
@@ -0,0 +1,238 @@
+"""
+Génération hors ligne des rapports du dashboard, pour le Sénégal, chaque
+région et chaque district.
+
+Chaque vue reprend les graphiques du dashboard construits par `charts.py`
+(répartition par type, hiérarchie Région > District, composition par
+région, statut des conventions) et le tableau de performance de
+`scoring.py` : les régions pour la vue nationale, les districts de la
+région pour une vue régionale, le district dans sa région pour une vue de
+district. Les pages HTML partagent une copie locale de plotly.js (aucune
+ressource externe) ; les PNG demandent le paquet `kaleido`. Un CSV résume
+toutes les vues.
+
+Le CSV n'est lu qu'une fois : le cube d'agrégats et les classements sont
+calculés par le processus principal et transmis une seule fois à chaque
+processus du pool, qui ne traite ensuite que des vues.
+
+Usage :
+    python -m reports --output rapports
+    python -m reports --output rapports --formats html png --workers 8
+"""
+import argparse
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import plotly.offline
+
+import charts
+from aggregates import COUNT_COL, build_cube, count_by, rollup, slice_cube
+from dataset import DATA_FILE, load_dataset
+from scoring import batch_scores
+
+
+NATIONAL = 'Sénégal'
+REPORT_FORMATS = ('html', 'png')
+PLOTLY_JS = 'plotly.min.js'
+PERFORMANCE_COLUMNS = {
+    'Efficacite_Signature': 'Efficacité Signature (%)',
+    'Valeur_Moyenne_Structure': 'Valeur Moy./Structure',
+    'Part_Conventions_Signees_mean': 'Part Moy. Conv. Signées (%)',
+    'Score_Global': 'Score Global',
+    'Nb_Structures_count': 'Nb Structures',
+}
+
+# Données partagées par les vues d'un processus (voir `_init_worker`)
+_shared = {}
+
+
+def slugify(text):
+    """Nom de fichier ASCII d'une région ou d'un district ('Thiés' -> 'thies')."""
+    ascii_text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', ascii_text.lower()).strip('-')
+
+
+def report_views(cube):
+    """Vues à produire : (région, district), None signifiant « toutes »."""
+    pairs = cube[['Région', 'District Sanitaire']].drop_duplicates().sort_values(['Région', 'District Sanitaire'])
+    views = [(None, None)]
+    for region, districts in pairs.groupby('Région', sort=True, observed=True)['District Sanitaire']:
+        views.append((region, None))
+        views.extend((region, district) for district in districts)
+    return views
+
+
+def view_name(region, district):
+    if region is None:
+        return NATIONAL
+    return region if district is None else f"{region} / {district}"
+
+
+def view_slug(region, district):
+    if region is None:
+        return slugify(NATIONAL)
+    return slugify(region) if district is None else f"{slugify(region)}--{slugify(district)}"
+
+
+def view_figures(cube_view):
+    """Figures du dashboard pour une vue, à partir du cube restreint à cette vue."""
+    type_counts_df = count_by(cube_view, 'Type').reset_index()
+    type_counts_df.columns = ['Type', 'Nombre']
+    district_analysis = rollup(cube_view, ['Région', 'District Sanitaire'])[['Région', 'District Sanitaire', COUNT_COL]]
+    region_type_counts = rollup(cube_view, ['Région', 'Type'])[['Région', 'Type', COUNT_COL]].rename(
+        columns={COUNT_COL: 'Nombre'})
+    statut_counts = count_by(cube_view, 'Statut Convention')
+    return {
+        'types': charts.create_type_pie_chart(type_counts_df),
+        'hierarchie': charts.create_region_treemap_chart(district_analysis, COUNT_COL),
+        'composition': charts.create_type_stacked_bar_chart(region_type_counts),
+        'conventions': charts.create_animated_summary_chart(
+            statut_counts.get('Signée', 0), statut_counts.get('Non Signée', 0)),
+    }
+
+
+def view_performance(scores, region, district):
+    """Tableau de performance d'une vue, extrait des classements calculés une fois (`batch_scores`)."""
+    if region is None:
+        table = scores[(scores['Classement'] == 'region') & (scores['Périmètre'] == NATIONAL)]
+        key = 'Région'
+    else:
+        table = scores[(scores['Classement'] == 'district') & (scores['Périmètre'] == region)]
+        key = 'District Sanitaire'
+        if district is not None:
+            table = table[table['District Sanitaire'] == district]
+    table = table.sort_values('Score_Global', ascending=False)
+    return table[[key] + list(PERFORMANCE_COLUMNS)].rename(columns=PERFORMANCE_COLUMNS)
+
+
+def view_score(scores, region, district):
+    """Score global d'une région (parmi les régions) ou d'un district (parmi ceux de sa région)."""
+    if region is None:
+        return None
+    if district is None:
+        rows = scores[(scores['Classement'] == 'region') & (scores['Région'] == region)]
+    else:
+        rows = scores[(scores['Classement'] == 'district') & (scores['Périmètre'] == region)
+                      & (scores['District Sanitaire'] == district)]
+    return round(float(rows['Score_Global'].iloc[0]), 2) if len(rows) else None
+
+
+def _html_page(title, figures, performance):
+    sections = [f"<h2>{name.capitalize()}</h2>" + figure.to_html(full_html=False, include_plotlyjs=False)
+                for name, figure in figures.items()]
+    table = performance.to_html(index=False, float_format=lambda value: f"{value:,.1f}", border=0)
+    return (
+        f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title}</title>"
+        f"<script src=\"{PLOTLY_JS}\"></script>"
+        "<style>body { font-family: system-ui, sans-serif; margin: 2rem; } "
+        "table { border-collapse: collapse; } td, th { padding: 4px 10px; border-bottom: 1px solid #ddd; }</style>"
+        f"</head><body><h1>Dashboard CSU Sénégal — {title}</h1>"
+        + "".join(sections)
+        + f"<h2>Performance</h2>{table}</body></html>"
+    )
+
+
+def render_view(view):
+    """Produit les fichiers d'une vue et retourne sa ligne du résumé."""
+    region, district = view
+    cube, scores = _shared['cube'], _shared['scores']
+    output, formats = _shared['output'], _shared['formats']
+    cube_view = slice_cube(cube, region, district)
+    figures = view_figures(cube_view)
+    performance = view_performance(scores, region, district)
+    slug = view_slug(region, district)
+    title = view_name(region, district)
+
+    if 'html' in formats:
+        with open(os.path.join(output, 'html', f"{slug}.html"), 'w', encoding='utf-8') as page:
+            page.write(_html_page(title, figures, performance))
+    if 'png' in formats:
+        png_dir = os.path.join(output, 'png', slug)
+        os.makedirs(png_dir, exist_ok=True)
+        for name, figure in figures.items():
+            figure.write_image(os.path.join(png_dir, f"{name}.png"), width=1100, height=600)
+
+    statut_counts = count_by(cube_view, 'Statut Convention')
+    signed, unsigned = int(statut_counts.get('Signée', 0)), int(statut_counts.get('Non Signée', 0))
+    type_counts = count_by(cube_view, 'Type')
+    return {
+        'Niveau': 'national' if region is None else ('region' if district is None else 'district'),
+        'Région': region,
+        'District Sanitaire': district,
+        'Nb Structures': int(cube_view[COUNT_COL].sum()),
+        'Nb Signées': signed,
+        'Nb Non Signées': unsigned,
+        'Taux Signature (%)': round(signed / (signed + unsigned) * 100, 2) if signed + unsigned else None,
+        'Type Dominant': type_counts.index[0] if len(type_counts) else None,
+        'Score Global': view_score(scores, region, district),
+        'Fichier': slug,
+    }
+
+
+def _init_worker(cube, scores, output, formats):
+    # Reçu une seule fois par processus : les vues n'ont plus qu'à filtrer le cube
+    _shared.update(cube=cube, scores=scores, output=output, formats=formats)
+
+
+def generate_reports(cube, output, formats=('html',), workers=None):
+    """
+    Produit les rapports de toutes les vues du cube dans `output`.
+
+    Args:
+        cube (pd.DataFrame): Cube d'agrégats (voir `aggregates.build_cube`).
+        formats (tuple): Sous-ensemble de `REPORT_FORMATS`.
+        workers (int): Taille du pool de processus (défaut : nombre de
+            processeurs) ; 1 traite les vues dans le processus courant.
+
+    Returns:
+        tuple: (DataFrame du résumé, nombre de vues, durée en secondes).
+    """
+    start = time.perf_counter()
+    scores = batch_scores(cube)
+    os.makedirs(output, exist_ok=True)
+    if 'html' in formats:
+        os.makedirs(os.path.join(output, 'html'), exist_ok=True)
+        with open(os.path.join(output, 'html', PLOTLY_JS), 'w', encoding='utf-8') as script:
+            script.write(plotly.offline.get_plotlyjs())
+    views = report_views(cube)
+    shared = (cube, scores, output, tuple(formats))
+    if workers == 1:
+        _init_worker(*shared)
+        rows = [render_view(view) for view in views]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=shared) as pool:
+            rows = list(pool.map(render_view, views, chunksize=4))
+    summary = pd.DataFrame(rows)
+    summary.to_csv(os.path.join(output, 'resume.csv'), index=False, encoding='utf-8-sig')
+    return summary, len(views), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rapports du dashboard par région et district.")
+    parser.add_argument('source', nargs='?', default=DATA_FILE)
+    parser.add_argument('--output', default='rapports')
+    parser.add_argument('--formats', nargs='+', choices=REPORT_FORMATS, default=['html'])
+    parser.add_argument('--workers', type=int, default=None, help="Processus du pool (défaut : un par cœur)")
+    args = parser.parse_args()
+    if 'png' in args.formats:
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            parser.error("l'export PNG nécessite le paquet kaleido (pip install kaleido)")
+
+    load_start = time.perf_counter()
+    cube = build_cube(load_dataset(args.source))
+    load_seconds = time.perf_counter() - load_start
+    summary, n_views, seconds = generate_reports(cube, args.output, args.formats, args.workers)
+    print(f"Données chargées et agrégées en {load_seconds:.2f} s ({len(cube):,} groupes)")
+    print(f"{n_views} vues en {seconds:.2f} s : {n_views / seconds:.1f} vues/s "
+          f"({', '.join(args.formats)}, {args.workers or os.cpu_count()} processus)")
+    print(f"Résumé : {os.path.join(args.output, 'resume.csv')} ({len(summary)} lignes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Score de performance des régions, districts ou structures.
+
+Le score global est une moyenne pondérée des rangs centiles de plusieurs
+indicateurs (par défaut : efficacité de signature 40 %, valeur moyenne par
+structure 30 %, part moyenne de conventions signées 30 %), ramenée sur 100.
+Les indicateurs sont calculés sur les tables agrégées (cube ou lignes) et
+les rangs par NumPy, éventuellement à l'intérieur de groupes : le mode
+`batch_scores` classe en une passe les régions du pays, les districts du
+pays et les districts de chaque région.
+"""
+import numpy as np
+import pandas as pd
+
+from aggregates import COUNT_COL, rollup
+from classification import NOM_STRUCTURE_COL
+
+
+# Granularités de score : colonnes identifiant une entité
+LEVELS = {
+    'region': ['Région'],
+    'district': ['Région', 'District Sanitaire'],
+    'structure': ['Région', 'District Sanitaire', NOM_STRUCTURE_COL],
+}
+
+DEFAULT_WEIGHTS = {
+    'Efficacite_Signature': 0.4,
+    'Valeur_Moyenne_Structure': 0.3,
+    'Part_Conventions_Signees_mean': 0.3,
+}
+
+# Colonnes de base (sommes arrondies à 2 décimales) dont dérivent les indicateurs
+BASE_COLUMNS = {
+    'Valeurs_sum': 'Valeurs',
+    'Nb_Conventions_Signees_sum': 'Nb Conventions Signées',
+    'Nb_Conventions_Non_Signees_sum': 'Nb Conventions Non Signées',
+}
+
+
+def _signature_efficiency(table):
+    total = table['Nb_Conventions_Signees_sum'] + table['Nb_Conventions_Non_Signees_sum']
+    return (table['Nb_Conventions_Signees_sum'] / total * 100).fillna(0)
+
+
+def _mean_value(table):
+    return (table['Valeurs_sum'] / table['Nb_Structures_count']).fillna(0)
+
+
+# Indicateurs dérivés : nom -> fonction de la table de performance
+INDICATORS = {
+    'Efficacite_Signature': _signature_efficiency,
+    'Valeur_Moyenne_Structure': _mean_value,
+}
+
+
+def level_aggregates(cube, level, rows=None):
+    """
+    Effectifs et sommes par entité de la granularité `level`.
+
+    Les régions et districts sont ré-agrégés depuis le cube ; les structures
+    (une ligne chacune) sont lues dans `rows`.
+    """
+    by = LEVELS[level]
+    if level != 'structure':
+        return rollup(cube, by)
+    if rows is None:
+        raise ValueError("Le score par structure demande les lignes du jeu de données (`rows`).")
+    columns = [col for col in ['Valeurs', 'Nb Conventions Signées', 'Nb Conventions Non Signées',
+                               'Part Conventions Signées'] if col in rows.columns]
+    return rows[by + columns].assign(**{COUNT_COL: 1}).reset_index(drop=True)
+
+
+def performance_table(aggregates, by, indicators=None):
+    """
+    Table des indicateurs de performance par entité.
+
+    Args:
+        aggregates (pd.DataFrame): Sorties de `rollup` / `level_aggregates`
+            (colonnes `by`, `COUNT_COL` et sommes des mesures).
+        by (list): Colonnes identifiant une entité.
+        indicators (dict): Indicateurs dérivés supplémentaires ou remplaçant
+            ceux de `INDICATORS` (nom -> fonction de la table).
+    """
+    table = pd.DataFrame({col: aggregates[col] for col in by})
+    for name, source in BASE_COLUMNS.items():
+        table[name] = aggregates[source]
+    table['Part_Conventions_Signees_mean'] = aggregates['Part Conventions Signées'] / aggregates[COUNT_COL]
+    table['Nb_Structures_count'] = aggregates[COUNT_COL]
+    table = table.round(2)
+    for name, compute in {**INDICATORS, **(indicators or {})}.items():
+        table[name] = compute(table)
+    return table
+
+
+def percentile_ranks(values, groups=None):
+    """
+    Rangs centiles (méthode 'average', comme `Series.rank(pct=True)`) de chaque colonne.
+
+    Args:
+        values (np.ndarray): Tableau (n, k) ; les NaN reçoivent un rang NaN.
+        groups (np.ndarray): Codes entiers (n,) ; les rangs sont alors calculés
+            à l'intérieur de chaque groupe.
+
+    Returns:
+        np.ndarray: Tableau (n, k) de rangs dans ]0, 1].
+    """
+    values = np.asarray(values, dtype='float64')
+    if values.ndim == 1:
+        return percentile_ranks(values[:, None], groups)[:, 0]
+    n = len(values)
+    groups = np.zeros(n, dtype=np.int64) if groups is None else np.asarray(groups)
+    ranks = np.full(values.shape, np.nan)
+    for column in range(values.shape[1]):
+        column_values = values[:, column]
+        valid = ~np.isnan(column_values)
+        order = np.lexsort((column_values, groups))
+        order = order[valid[order]]
+        if len(order) == 0:
+            continue
+        sorted_groups, sorted_values = groups[order], column_values[order]
+        # Début de chaque groupe et de chaque série d'ex aequo dans l'ordre trié
+        new_group = np.r_[True, sorted_groups[1:] != sorted_groups[:-1]]
+        new_run = new_group | np.r_[True, sorted_values[1:] != sorted_values[:-1]]
+        group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(order)), 0))
+        run_id = np.cumsum(new_run) - 1
+        run_start = np.flatnonzero(new_run)
+        run_end = np.r_[run_start[1:], len(order)]
+        group_size = np.diff(np.r_[np.flatnonzero(new_group), len(order)])[np.cumsum(new_group) - 1]
+        # Rang moyen (base 1) de la série d'ex aequo, relatif au début du groupe
+        average_rank = (run_start[run_id] + run_end[run_id] + 1) / 2 - group_start
+        ranks[order, column] = average_rank / group_size
+    return ranks
+
+
+def score_table(table, weights=None, groups=None):
+    """
+    Ajoute la colonne 'Score_Global' (0-100) à une table de performance.
+
+    Les poids sont normalisés par leur somme ; `groups` (codes entiers) limite
+    le classement à l'intérieur de chaque groupe.
+    """
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    names = list(weights)
+    coefficients = np.array([weights[name] for name in names], dtype='float64')
+    ranks = percentile_ranks(table[names].to_numpy(dtype='float64'), groups)
+    scored = table.copy()
+    scored['Score_Global'] = (ranks * (coefficients / coefficients.sum())).sum(axis=1) * 100
+    return scored
+
+
+def score_level(cube, level='region', weights=None, rows=None, indicators=None):
+    """Table de performance notée pour une granularité ('region', 'district' ou 'structure')."""
+    table = performance_table(level_aggregates(cube, level, rows), LEVELS[level], indicators)
+    return score_table(table, weights)
+
+
+def batch_scores(cube, weights=None, indicators=None):
+    """
+    Classements de toutes les sélections du filtre Région en une passe.
+
+    Returns:
+        pd.DataFrame: Une ligne par entité classée, avec 'Classement' ('region'
+        ou 'district'), 'Périmètre' ('Sénégal' ou la région du filtre) et le
+        'Score_Global' dans ce périmètre.
+    """
+    regions = score_level(cube, 'region', weights, indicators=indicators)
+    districts = performance_table(level_aggregates(cube, 'district'), LEVELS['district'], indicators)
+    national = score_table(districts, weights)
+    codes, _ = pd.factorize(districts['Région'], sort=True)
+    by_region = score_table(districts, weights, groups=codes)
+    return pd.concat([
+        regions.assign(Classement='region', Périmètre='Sénégal'),
+        national.assign(Classement='district', Périmètre='Sénégal'),
+        by_region.assign(Classement='district', Périmètre=by_region['Région']),
+    ], ignore_index=True)
@@ -0,0 +1,88 @@
+"""
+Index de recherche de l'explorateur de données brutes.
+
+Chaque colonne textuelle indexée (nom de la structure, district, région,
+type, statut) est encodée une seule fois au chargement en dictionnaire :
+un code entier par ligne et la liste de ses valeurs distinctes, normalisées
+(minuscules, sans accents). Une requête est normalisée de la même façon ;
+chacun de ses mots est cherché par un noyau Arrow dans les seules valeurs
+distinctes, puis le résultat est propagé aux lignes par leurs codes. Une
+ligne est retenue si chaque mot apparaît dans l'une de ses colonnes (en
+sous-chaîne, ou en début de mot avec `prefix=True`).
+"""
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from classification import NOM_STRUCTURE_COL, fold_strings, fold_text
+
+
+SEARCH_COLUMNS = [NOM_STRUCTURE_COL, 'District Sanitaire', 'Région', 'Type', 'Statut Convention']
+# Début de mot : début de la valeur ou caractère qui n'est ni lettre ni chiffre
+WORD_START = r'(?:^|[^0-9a-z])'
+
+
+def _encode_column(values):
+    # Même représentation textuelle que l'ancienne recherche (row.astype(str))
+    codes, uniques = pd.factorize(values.astype(str), use_na_sentinel=False)
+    folded = fold_strings(pa.array(uniques, type=pa.string()))
+    return codes.astype(np.int32), folded
+
+
+def build_search_index(data, columns=None):
+    """
+    Construit l'index de recherche d'un jeu de données préparé.
+
+    Returns:
+        dict: 'columns' (colonnes indexées), 'codes' (colonne -> code de la
+        valeur de chaque ligne, aligné sur les positions de `data`), 'values'
+        (colonne -> valeurs distinctes normalisées, tableau Arrow).
+    """
+    columns = [col for col in (columns or SEARCH_COLUMNS) if col in data.columns]
+    encoded = {col: _encode_column(data[col]) for col in columns}
+    return {
+        'columns': columns,
+        'rows': len(data),
+        'codes': {col: codes for col, (codes, _) in encoded.items()},
+        'values': {col: values for col, (_, values) in encoded.items()},
+    }
+
+
+def _match(values, term, prefix):
+    if prefix:
+        found = pc.match_substring_regex(values, WORD_START + re.escape(term))
+    else:
+        found = pc.match_substring(values, term)
+    return found.to_numpy(zero_copy_only=False)
+
+
+def search_positions(index, query, positions=None, prefix=False):
+    """
+    Positions des lignes contenant tous les mots de `query`.
+
+    Args:
+        index (dict): L'index construit par `build_search_index`.
+        query (str): Le texte recherché (casse et accents indifférents).
+        positions (np.ndarray): Restreint la recherche à ces lignes (ex. le
+            filtre Région / District) ; None pour toutes les lignes.
+        prefix (bool): Si vrai, chaque mot doit apparaître en début de mot.
+
+    Returns:
+        np.ndarray: Les positions trouvées, dans l'ordre de `positions`.
+    """
+    if positions is None:
+        codes = index['codes']
+        keep = np.ones(index['rows'], dtype=bool)
+    else:
+        positions = np.asarray(positions)
+        codes = {col: index['codes'][col][positions] for col in index['columns']}
+        keep = np.ones(len(positions), dtype=bool)
+    for term in fold_text(query).split():
+        found = np.zeros(len(keep), dtype=bool)
+        for col in index['columns']:
+            found |= _match(index['values'][col], term, prefix)[codes[col]]
+        keep &= found
+    return np.flatnonzero(keep) if positions is None else positions[keep]
@@ -0,0 +1,75 @@
+"""
+Sections d'analyse évaluées à la demande.
+
+Chaque section du dashboard est une fonction enregistrée avec
+`register_section`. Seule la section ouverte par l'utilisateur est exécutée
+à chaque rerun ; les résultats qu'elle calcule (figures, tableaux) sont
+mémorisés pour la clé de filtre courante, si bien que revenir sur une
+section déjà ouverte ne recalcule rien. Les figures peuvent en outre passer
+par un `FigureCache` partagé entre sessions.
+"""
+from profiling import cache_event
+
+
+_SECTIONS = {}
+
+
+def register_section(key, label, position):
+    """Décorateur enregistrant `render(memo)` (voir `SectionMemo`) comme section du dashboard."""
+    def decorator(render):
+        _SECTIONS[key] = {'label': label, 'position': position, 'render': render}
+        return render
+    return decorator
+
+
+def section_labels():
+    """Clés et libellés des sections, dans l'ordre d'affichage."""
+    ordered = sorted(_SECTIONS.items(), key=lambda item: item[1]['position'])
+    return {key: section['label'] for key, section in ordered}
+
+
+class SectionMemo:
+    """
+    Mémoire d'une section pour la clé de filtre courante.
+
+    `memo(name, build, *args)` conserve un résultat dans `store` (typiquement
+    `st.session_state`) uniquement pour la clé de filtre et la version des
+    données courantes : un changement de filtre ou de données remplace les
+    résultats mémorisés de la section.
+    Un résultat qui dépend d'un autre choix de la section (ex. les deux
+    instantanés comparés) passe ce choix en `key` : chaque nom ne garde que
+    le résultat de la dernière clé, au lieu d'une entrée par choix essayé.
+    `memo.figure(...)` fait de même pour les figures, mais via le cache de
+    figures partagé entre sessions (borné en octets) lorsqu'il est fourni.
+    """
+
+    def __init__(self, store, section_key, filter_key, figure_cache=None, dataset_version=None):
+        entry = store.get(section_key)
+        if entry is None or entry['filter_key'] != (dataset_version, filter_key):
+            entry = {'filter_key': (dataset_version, filter_key), 'results': {}}
+            store[section_key] = entry
+        self._results = entry['results']
+        self._section_key = section_key
+        self._filter_key = filter_key
+        self._figure_cache = figure_cache
+        self._dataset_version = dataset_version
+
+    def __call__(self, name, build, *args, key=None):
+        entry = self._results.get(name)
+        hit = entry is not None and entry[0] == key
+        cache_event(hit)
+        if not hit:
+            entry = self._results[name] = (key, build(*args))
+        return entry[1]
+
+    def figure(self, name, build, *args, key=None):
+        if self._figure_cache is None:
+            return self(name, build, *args, key=key)
+        cache_key = (f"{self._section_key}/{name}", self._dataset_version, self._filter_key, key)
+        return self._figure_cache.get_or_build(cache_key, build, *args)
+
+
+def run_section(section_key, store, filter_key, figure_cache=None, dataset_version=None):
+    """Exécute la section `section_key` avec sa mémoire pour `filter_key`."""
+    memo = SectionMemo(store, section_key, filter_key, figure_cache, dataset_version)
+    _SECTIONS[section_key]['render'](memo)
@@ -0,0 +1,121 @@
+"""
+Jeu de données partagé, en lecture seule, entre toutes les sessions.
+
+`st.cache_data` remet à chaque appel une copie (dé-sérialisée) du
+DataFrame : chaque session connectée détient alors son propre exemplaire
+des données. Le jeu préparé est donc conservé une seule fois par processus
+(`st.cache_resource`), sous une forme que les sessions ne peuvent pas
+modifier :
+- les colonnes texte sont stockées en chaînes Arrow (`string[pyarrow]`),
+  des tampons immuables sans objet Python par ligne ;
+- les tableaux NumPy des autres colonnes (valeurs, codes des catégories,
+  masques des entiers nullables) sont marqués en lecture seule : une
+  modification en place lève une erreur au lieu d'altérer les données des
+  autres sessions. Le code qui doit modifier un sous-ensemble en fait
+  d'abord une copie explicite (`.copy()`) ; le jeu partagé lui-même n'est
+  jamais modifié (une affectation dans une colonne texte y remplacerait le
+  tableau Arrow de la colonne).
+
+Les filtres produisent des vues (tranche de lignes contiguës, voir
+`filter_index.select_rows`) ou des tableaux de positions plutôt que des
+copies. `owned_bytes` mesure la mémoire réellement propre à une session :
+ce qu'elle détient en excluant les tampons partagés.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pandas.core.arrays.masked import BaseMaskedArray
+
+
+SHARED_STRING_DTYPE = 'string[pyarrow]'
+
+
+def _read_only(values):
+    # Même tableau, sans copie, dont les tampons NumPy ne sont plus modifiables
+    if isinstance(values, pd.arrays.NumpyExtensionArray):
+        return _read_only(values.to_numpy())
+    if isinstance(values, np.ndarray):
+        values = values.view()
+        values.flags.writeable = False
+        return values
+    if isinstance(values, pd.Categorical):
+        return pd.Categorical.from_codes(_read_only(values.codes), dtype=values.dtype)
+    if isinstance(values, BaseMaskedArray):
+        return type(values)(_read_only(values._data), _read_only(values._mask))
+    # Tableaux Arrow : tampons déjà immuables
+    return values
+
+
+def share_frame(data):
+    """
+    Version partageable de `data` : colonnes texte (objet) en chaînes Arrow,
+    tampons NumPy en lecture seule, sans copie des colonnes non textuelles.
+    """
+    text_columns = [col for col in data.columns if data[col].dtype == object]
+    data = data.astype({col: SHARED_STRING_DTYPE for col in text_columns}, copy=False)
+    # Colonnes non consolidées (copy=False) : chacune garde son tableau en lecture seule
+    return pd.DataFrame({col: _read_only(data[col].array) for col in data.columns}, index=data.index, copy=False)
+
+
+def _values(series):
+    # Tableau sous-jacent, sans copie : Categorical, entiers nullables, tableau Arrow ou NumPy
+    if isinstance(series.dtype, pd.CategoricalDtype) or isinstance(series.array, BaseMaskedArray):
+        return series.array
+    if isinstance(series.dtype, pd.ArrowDtype) or getattr(series.dtype, 'storage', None) == 'pyarrow':
+        return series.array.__arrow_array__()
+    return series.to_numpy()
+
+
+def _column_buffers(values):
+    # (adresse, taille) des tampons d'une colonne
+    if isinstance(values, pd.Categorical):
+        return _column_buffers(values.codes)
+    if isinstance(values, BaseMaskedArray):
+        return _column_buffers(values._data) + _column_buffers(values._mask)
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        chunks = values.chunks if isinstance(values, pa.ChunkedArray) else [values]
+        return [(buffer.address, buffer.size) for chunk in chunks for buffer in chunk.buffers() if buffer is not None]
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return [(values.__array_interface__['data'][0], values.nbytes)]
+    return []
+
+
+def buffer_ranges(data):
+    """Plages mémoire [début, fin) des tampons de `data`, pour reconnaître les vues sur ces données."""
+    return sorted((address, address + size) for col in data.columns
+                  for address, size in _column_buffers(_values(data[col])) if size)
+
+
+def _is_shared(buffers, ranges):
+    return bool(buffers) and all(any(start <= address < end for start, end in ranges) for address, _ in buffers)
+
+
+def owned_bytes(obj, shared_ranges, _seen=None):
+    """
+    Octets détenus par `obj` (DataFrame, Series, tableau, conteneurs), hors
+    tampons partagés désignés par `shared_ranges` (voir `buffer_ranges`).
+
+    Une vue sur les données partagées ne compte que pour ses métadonnées ;
+    une copie compte pour sa taille complète.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return sum(owned_bytes(obj[col], shared_ranges, seen) for col in obj.columns) + obj.index.memory_usage()
+    if isinstance(obj, pd.Series):
+        values = _values(obj)
+        if _is_shared(_column_buffers(values), shared_ranges):
+            return 0
+        return int(obj.memory_usage(index=False, deep=True))
+    if isinstance(obj, np.ndarray):
+        return 0 if _is_shared(_column_buffers(obj), shared_ranges) else obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(owned_bytes(key, shared_ranges, seen) + owned_bytes(value, shared_ranges, seen)
+                                        for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(owned_bytes(item, shared_ranges, seen) for item in obj)
+    return sys.getsizeof(obj)
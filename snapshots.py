@@ -0,0 +1,324 @@
+"""
+Historique versionné des extraits du jeu de données des conventions.
+
+Chaque mission de terrain produit un nouvel extrait CSV, éventuellement
+partiel (quelques régions ou districts). Plutôt que de remplacer le fichier
+et de tout recalculer, `append_snapshot` l'ajoute comme instantané :
+- chaque ligne est rattachée à une structure par sa clé d'identité
+  (région, district, nom normalisé sans accents ni espaces multiples) ;
+  une variante d'orthographe d'une structure de l'extrait ou de l'état
+  courant (voir dedup.py) reprend la clé de cette structure ;
+  les lignes identiques à l'état courant sont ignorées, les autres sont
+  nouvelles ou modifiées ;
+- les structures absentes de l'extrait gardent leur dernier état connu ;
+- le cube d'agrégats de l'instantané reprend celui du précédent et ne
+  ré-agrège que les districts touchés ;
+- les changements (statut avant / après) sont conservés par instantané.
+
+Le magasin (répertoire `MSAS_SNAPSHOT_DIR`, par défaut sous le cache) contient
+un manifeste JSON, l'état courant de chaque structure (Parquet) et, par
+instantané, son cube et ses changements. Les cubes datés forment la
+dimension temporelle ; `progression` compare deux instantanés à partir de
+leurs cubes et `status_moves` ne relit que les changements de l'intervalle,
+sans jamais retraiter l'historique.
+
+Usage :
+    python -m snapshots add extrait_mission.csv --label "Mission de mars" --date 2025-03-31
+    python -m snapshots list
+"""
+import argparse
+import json
+import os
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from aggregates import COUNT_COL, CUBE_DIMENSIONS, aggregate_chunk, rollup
+from classification import NOM_STRUCTURE_COL, fold_strings
+from data_cache import CACHE_DIR, _write_atomic, source_fingerprint
+from dataset import read_source_csv, prepare_data, recompute_shares
+from dedup import BLOCK_COLUMNS, structure_ids
+
+
+SNAPSHOT_DIR = os.environ.get('MSAS_SNAPSHOT_DIR', os.path.join(CACHE_DIR, 'snapshots'))
+MANIFEST_FILE = 'manifest.json'
+KEY_COL = 'Clé Structure'
+HASH_COL = 'Empreinte'
+FIRST_COL = 'Premier Instantané'
+LAST_COL = 'Dernier Instantané'
+SNAPSHOT_COL = 'Instantané'
+DISTRICT_KEY = ['Région', 'District Sanitaire']
+CHANGE_COLUMNS = [KEY_COL, 'Région', 'District Sanitaire', NOM_STRUCTURE_COL,
+                  'Statut Précédent', 'Statut Convention', 'Nature']
+
+
+def structure_keys(data):
+    """Clé d'identité de chaque structure : 'région|district|nom', sans accents, casse ni espaces superflus."""
+    parts = [
+        pc.utf8_trim_whitespace(pc.replace_substring_regex(
+            fold_strings(pa.array(data[col], type=pa.string(), from_pandas=True)), r'\s+', ' '))
+        for col in ['Région', 'District Sanitaire', NOM_STRUCTURE_COL]
+    ]
+    return pd.Series(pc.binary_join_element_wise(*parts, '|').to_numpy(zero_copy_only=False),
+                     index=data.index, name=KEY_COL)
+
+
+def canonical_keys(data, state):
+    """
+    Clé de chaque ligne de `data` après déduplication floue (`dedup.structure_ids`)
+    avec l'extrait lui-même et l'état courant : une ligne rattachée à une
+    structure de `state` reprend sa clé, sinon celle de la première ligne de
+    sa structure dans l'extrait.
+    """
+    identity = BLOCK_COLUMNS + [NOM_STRUCTURE_COL]
+    columns = identity + [KEY_COL]
+    incoming = data[identity].assign(**{KEY_COL: structure_keys(data)}).astype(object)
+    # Les lignes de l'état précèdent celles de l'extrait : leur clé est retenue en premier
+    frames = [state[columns].astype(object), incoming] if len(state) else [incoming]
+    combined = pd.concat(frames, ignore_index=True)
+    ids = structure_ids(combined)[0]
+    keys = combined[KEY_COL].groupby(ids.to_numpy()).transform('first')
+    return pd.Series(keys.to_numpy()[len(state):], index=data.index, name=KEY_COL)
+
+
+def _row_hashes(data, columns):
+    # Empreinte du contenu d'une ligne : une ligne identique à l'état courant n'est pas un changement
+    return pd.util.hash_pandas_object(data[columns], index=False).to_numpy()
+
+
+def read_manifest(store=SNAPSHOT_DIR):
+    """Manifeste du magasin : {'snapshots': [...], 'state': fichier de l'état courant}."""
+    try:
+        with open(os.path.join(store, MANIFEST_FILE), encoding='utf-8') as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {'snapshots': [], 'state': None}
+
+
+def store_version(store=SNAPSHOT_DIR):
+    """Identifiant du dernier instantané (None si le magasin est vide), pour les caches."""
+    snapshots = read_manifest(store)['snapshots']
+    return snapshots[-1]['id'] if snapshots else None
+
+
+def _save_manifest(manifest, store):
+    def write(path):
+        with open(path, 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, ensure_ascii=False)
+    _write_atomic(os.path.join(store, MANIFEST_FILE), write)
+
+
+def _write_parquet(frame, path):
+    _write_atomic(path, lambda tmp_path: frame.to_parquet(tmp_path, index=False))
+
+
+def _district_mask(frame, districts):
+    pairs = pd.MultiIndex.from_frame(frame[DISTRICT_KEY].astype(str))
+    return pairs.isin(list(districts))
+
+
+def append_snapshot(source, label=None, extract_date=None, store=SNAPSHOT_DIR):
+    """
+    Ajoute l'extrait CSV `source` au magasin.
+
+    Args:
+        label (str): Libellé de l'instantané (par défaut le nom du fichier).
+        extract_date (str): Date de l'extrait (ISO), par défaut aujourd'hui.
+
+    Returns:
+        dict: L'entrée du manifeste (lignes lues, nouvelles, modifiées, districts
+        recalculés) ; celle de l'instantané existant si l'extrait a déjà été ajouté.
+    """
+    manifest = read_manifest(store)
+    source_hash = source_fingerprint(source)['hash']
+    for entry in manifest['snapshots']:
+        if entry['source_hash'] == source_hash:
+            return entry
+
+    snapshot_id = f"{len(manifest['snapshots']) + 1:04d}"
+    previous_entry = manifest['snapshots'][-1] if manifest['snapshots'] else None
+    if manifest['state']:
+        state = pd.read_parquet(os.path.join(store, manifest['state']))
+    else:
+        state = pd.DataFrame({KEY_COL: pd.Series(dtype=object), HASH_COL: pd.Series(dtype='uint64'),
+                              'Statut Convention': pd.Series(dtype=object), FIRST_COL: pd.Series(dtype=object)})
+
+    data, _ = read_source_csv(source)
+    data = prepare_data(data)
+    data[KEY_COL] = canonical_keys(data, state)
+    # Une structure présente plusieurs fois dans l'extrait : la dernière ligne fait foi,
+    # puis les parts par district sont recalculées sur les lignes conservées
+    data = recompute_shares(data.drop_duplicates(KEY_COL, keep='last').reset_index(drop=True))
+    value_columns = [col for col in data.columns if col != KEY_COL]
+    data[HASH_COL] = _row_hashes(data, value_columns)
+
+    # Position de chaque structure de l'extrait dans l'état courant (-1 : nouvelle)
+    positions = pd.Index(state[KEY_COL]).get_indexer(data[KEY_COL])
+    is_new = positions < 0
+    known = positions[~is_new]
+    is_changed = np.zeros(len(data), dtype=bool)
+    is_changed[~is_new] = state[HASH_COL].to_numpy()[known] != data[HASH_COL].to_numpy()[~is_new]
+    incoming = data[is_new | is_changed].copy()
+    previous_status = np.full(len(data), None, dtype=object)
+    previous_status[~is_new] = state['Statut Convention'].to_numpy()[known]
+    first_seen = np.full(len(data), snapshot_id, dtype=object)
+    first_seen[~is_new] = state[FIRST_COL].to_numpy()[known]
+    incoming['Statut Précédent'] = previous_status[is_new | is_changed]
+    incoming['Nature'] = np.where(is_new, 'nouvelle', 'modifiée')[is_new | is_changed]
+
+    os.makedirs(os.path.join(store, snapshot_id), exist_ok=True)
+    affected = set(incoming[DISTRICT_KEY].astype(str).itertuples(index=False, name=None))
+    if len(incoming):
+        updated = incoming[value_columns + [KEY_COL, HASH_COL]].assign(
+            **{FIRST_COL: first_seen[is_new | is_changed], LAST_COL: snapshot_id})
+        kept = state[~state[KEY_COL].isin(incoming[KEY_COL])]
+        state = pd.concat([kept, updated], ignore_index=True) if len(kept) else updated.reset_index(drop=True)
+
+    # Cube : celui de l'instantané précédent, seuls les districts touchés sont ré-agrégés
+    if previous_entry is None:
+        cube = aggregate_chunk(state)
+    else:
+        previous_cube = snapshot_cube(previous_entry['id'], store)
+        cube = pd.concat([previous_cube[~_district_mask(previous_cube, affected)],
+                          aggregate_chunk(state[_district_mask(state, affected)])], ignore_index=True)
+    _write_parquet(cube, os.path.join(store, snapshot_id, 'cube.parquet'))
+    _write_parquet(incoming[CHANGE_COLUMNS], os.path.join(store, snapshot_id, 'changes.parquet'))
+
+    state_file = f"state-{snapshot_id}.parquet"
+    if len(incoming) or previous_entry is None:
+        _write_parquet(state, os.path.join(store, state_file))
+    else:
+        state_file = manifest['state']
+    entry = {
+        'id': snapshot_id,
+        'label': label or os.path.splitext(os.path.basename(source))[0],
+        'date': extract_date or date.today().isoformat(),
+        'added': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'source': os.path.abspath(source),
+        'source_hash': source_hash,
+        'rows': len(data),
+        'new': int(is_new.sum()),
+        'changed': int(is_changed.sum()),
+        'structures': len(state),
+        'districts_recomputed': len(affected) if previous_entry else None,
+    }
+    old_state = manifest['state']
+    manifest = {'snapshots': manifest['snapshots'] + [entry], 'state': state_file}
+    # Le manifeste est écrit en dernier : un ajout interrompu laisse le magasin dans l'état précédent
+    _save_manifest(manifest, store)
+    if old_state and old_state != state_file:
+        os.remove(os.path.join(store, old_state))
+    return entry
+
+
+def snapshot_list(store=SNAPSHOT_DIR):
+    """Instantanés du magasin, du plus ancien au plus récent (un DataFrame)."""
+    return pd.DataFrame(read_manifest(store)['snapshots'])
+
+
+def snapshot_cube(snapshot_id, store=SNAPSHOT_DIR):
+    """Cube d'agrégats (voir `aggregates.py`) de l'état à la date de l'instantané."""
+    return pd.read_parquet(os.path.join(store, snapshot_id, 'cube.parquet'))
+
+
+def snapshot_cubes(store=SNAPSHOT_DIR):
+    """Cubes de tous les instantanés empilés : la dimension temporelle (colonnes `Instantané` et `Date`)."""
+    snapshots = read_manifest(store)['snapshots']
+    if not snapshots:
+        return pd.DataFrame(columns=[SNAPSHOT_COL, 'Date'] + CUBE_DIMENSIONS + [COUNT_COL])
+    return pd.concat([
+        snapshot_cube(entry['id'], store).assign(**{SNAPSHOT_COL: entry['id'], 'Date': entry['date']})
+        for entry in snapshots
+    ], ignore_index=True)
+
+
+def signature_counts(cubes, by=('Région',)):
+    """Structures signées, non signées et taux de signature par instantané et par `by`."""
+    by = [SNAPSHOT_COL, 'Date'] + list(by)
+    counts = cubes.pivot_table(index=by, columns='Statut Convention', values=COUNT_COL,
+                               aggfunc='sum', fill_value=0, observed=True)
+    counts = counts.reindex(columns=['Signée', 'Non Signée'], fill_value=0).reset_index()
+    counts.columns.name = None
+    total = counts['Signée'] + counts['Non Signée']
+    counts['Taux Signature (%)'] = (counts['Signée'] / total.where(total > 0) * 100).fillna(0).round(2)
+    return counts
+
+
+def progression(start_id, end_id, by='Région', store=SNAPSHOT_DIR):
+    """
+    Évolution des signatures entre deux instantanés, par `by` (Région ou District Sanitaire).
+
+    Ne lit que les deux cubes concernés.
+    """
+    keys = [by] if by == 'Région' else DISTRICT_KEY
+    tables = []
+    for snapshot_id, suffix in [(start_id, 'début'), (end_id, 'fin')]:
+        table = rollup(snapshot_cube(snapshot_id, store), keys + ['Statut Convention'])
+        table = table.pivot_table(index=keys, columns='Statut Convention', values=COUNT_COL,
+                                  aggfunc='sum', fill_value=0, observed=True)
+        table = table.reindex(columns=['Signée', 'Non Signée'], fill_value=0)
+        total = table.sum(axis=1)
+        tables.append(pd.DataFrame({
+            f'Signées ({suffix})': table['Signée'],
+            f'Taux ({suffix}, %)': (table['Signée'] / total.where(total > 0) * 100).fillna(0),
+        }))
+    result = tables[0].join(tables[1], how='outer').fillna(0)
+    result['Δ Signées'] = result['Signées (fin)'] - result['Signées (début)']
+    result['Δ Taux (pts)'] = result['Taux (fin, %)'] - result['Taux (début, %)']
+    return result.round(2).reset_index()
+
+
+def status_moves(start_id, end_id, store=SNAPSHOT_DIR):
+    """
+    Structures dont le statut a changé entre deux instantanés (`start_id` exclu, `end_id` inclus).
+
+    Seuls les fichiers de changements de l'intervalle sont lus : pour chaque
+    structure, le statut avant le premier changement et après le dernier.
+    """
+    ids = [entry['id'] for entry in read_manifest(store)['snapshots'] if start_id < entry['id'] <= end_id]
+    changes = [pd.read_parquet(os.path.join(store, snapshot_id, 'changes.parquet')).assign(**{SNAPSHOT_COL: snapshot_id})
+               for snapshot_id in ids]
+    if not changes:
+        return pd.DataFrame(columns=CHANGE_COLUMNS + [SNAPSHOT_COL])
+    changes = pd.concat(changes, ignore_index=True)
+    grouped = changes.groupby(KEY_COL, sort=False)
+    moves = grouped.last()
+    moves['Statut Précédent'] = grouped['Statut Précédent'].first()
+    moves = moves[moves['Statut Précédent'].notna() & (moves['Statut Précédent'] != moves['Statut Convention'])]
+    return moves.reset_index()[CHANGE_COLUMNS[:-1] + [SNAPSHOT_COL]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Historique des extraits du jeu de données.")
+    parser.add_argument('--store', default=SNAPSHOT_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help="Ajoute un extrait CSV comme nouvel instantané")
+    add.add_argument('source')
+    add.add_argument('--label')
+    add.add_argument('--date', help="Date de l'extrait (AAAA-MM-JJ), par défaut aujourd'hui")
+    commands.add_parser('list', help="Liste les instantanés")
+    args = parser.parse_args()
+
+    if args.command == 'add':
+        count = len(read_manifest(args.store)['snapshots'])
+        entry = append_snapshot(args.source, args.label, args.date, args.store)
+        if len(read_manifest(args.store)['snapshots']) == count:
+            print(f"Extrait déjà présent : instantané {entry['id']} ({entry['label']})")
+            return
+        print(f"Instantané {entry['id']} ({entry['label']}, {entry['date']}) : {entry['rows']:,} lignes, "
+              f"{entry['new']:,} nouvelles, {entry['changed']:,} modifiées, "
+              f"{entry['districts_recomputed'] if entry['districts_recomputed'] is not None else 'tous les'} "
+              f"district(s) recalculé(s), {entry['structures']:,} structures suivies")
+        return
+    snapshots = snapshot_list(args.store)
+    if snapshots.empty:
+        print(f"Aucun instantané dans {args.store}")
+        return
+    print(snapshots[['id', 'label', 'date', 'rows', 'new', 'changed', 'structures']].to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""
+Moteur statistique de l'onglet « Analyses Statistiques Avancées ».
+
+Pour chaque groupe Région × District, les colonnes numériques sont résumées
+par des accumulateurs fusionnables :
+
+- moments centrés à la Welford : effectif, moyenne, somme des carrés des
+  écarts (M2) et co-moments, calculés paire par paire sur les lignes où les
+  deux colonnes sont renseignées ;
+- minimum et maximum ;
+- une esquisse de quantiles : les valeurs distinctes et leurs effectifs,
+  compressées en au plus `SKETCH_SIZE` centroïdes lorsqu'elles sont trop
+  nombreuses (quantiles exacts en deçà, approchés au-delà).
+
+Deux groupes se fusionnent sans revenir aux lignes (formules de Chan et al.),
+si bien que toute sélection de filtres se ramène à une fusion de groupes et
+qu'ajouter des lignes ne demande que de résumer les nouvelles lignes puis de
+fusionner (`combine_moments`). On en déduit par opérations sur tableaux :
+moyenne, écart-type, coefficient de variation, résumé descriptif, médiane et
+matrice de corrélation. Les valeurs manquantes sont ignorées, paire par paire
+pour les corrélations, comme le font `describe()` et `corr()`.
+"""
+import numpy as np
+import pandas as pd
+
+
+STATS_COLUMNS = ['Valeurs', 'Nb Conventions Signées', 'Nb Conventions Non Signées',
+                 'Part Structures Ciblées', 'Part Conventions Signées', 'Part Conventions Non Signées']
+STATS_DIMENSIONS = ['Région', 'District Sanitaire']
+# Nombre maximal de centroïdes d'une esquisse de quantiles
+SKETCH_SIZE = 256
+# M2 relatif (M2 / (n · moyenne²)) en deçà duquel une colonne est considérée constante
+VARIANCE_TOLERANCE = 1e-24
+# Accumulateurs (g, k, k) : [i, j] porte sur la colonne i, lignes où i et j sont renseignées
+PAIR_FIELDS = ('n', 'mean', 'm2', 'comoment')
+
+
+def _compress_sketch(values, weights, size=SKETCH_SIZE):
+    """Regroupe des points triés en au plus `size` centroïdes de poids voisins."""
+    if len(values) <= size:
+        return values, weights
+    cumulative = np.cumsum(weights)
+    bucket = np.minimum(((cumulative - weights / 2) / cumulative[-1] * size).astype(np.int64), size - 1)
+    bucket_weights = np.bincount(bucket, weights, minlength=size)
+    bucket_values = np.bincount(bucket, weights * values, minlength=size)
+    keep = bucket_weights > 0
+    return bucket_values[keep] / bucket_weights[keep], bucket_weights[keep]
+
+
+def sketch_quantiles(sketch, quantiles):
+    """Quantiles (interpolation linéaire, comme `np.percentile`) d'une esquisse."""
+    values, weights = sketch
+    quantiles = np.asarray(quantiles, dtype='float64')
+    total = weights.sum()
+    if total == 0:
+        return np.full(quantiles.shape, np.nan)
+    cumulative = np.cumsum(weights)
+    position = quantiles * (total - 1)
+    lower = np.floor(position)
+    # Valeur au rang r (base 0) : premier point dont l'effectif cumulé dépasse r
+    lower_value = values[np.minimum(np.searchsorted(cumulative, lower, side='right'), len(values) - 1)]
+    upper_value = values[np.minimum(np.searchsorted(cumulative, lower + 1, side='right'), len(values) - 1)]
+    return lower_value + (position - lower) * (upper_value - lower_value)
+
+
+def grouped_sketches(codes, values, weights, n_groups, size=SKETCH_SIZE):
+    """
+    Esquisses de `n_groups` groupes à partir de points (groupe, valeur,
+    effectif) : un seul tri de tous les points, puis cumul des effectifs des
+    valeurs égales d'un même groupe. Les valeurs manquantes sont ignorées.
+
+    Returns:
+        np.ndarray: esquisses (valeurs triées, effectifs), de forme (n_groups,).
+    """
+    kept = ~np.isnan(values)
+    codes, values, weights = codes[kept], values[kept], weights[kept]
+    # Tri par valeur puis tri stable (à base) par groupe : équivaut à `np.lexsort`, en plus rapide
+    order = np.argsort(values)
+    order = order[np.argsort(codes[order], kind='stable')]
+    codes, values, weights = codes[order], values[order], weights[order]
+    starts = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (values[1:] != values[:-1])])[:len(codes)]
+    codes, values, weights = codes[starts], values[starts], np.add.reduceat(weights, starts)
+    bounds = np.searchsorted(codes, np.arange(n_groups + 1))
+    sketches = np.empty(n_groups, dtype=object)
+    sketches[:] = list(zip(np.split(values, bounds[1:-1]), np.split(weights, bounds[1:-1])))
+    # Seuls les groupes de plus de `size` valeurs distinctes sont compressés
+    for group in np.flatnonzero(np.diff(bounds) > size):
+        sketches[group] = _compress_sketch(*sketches[group], size)
+    return sketches
+
+
+def _group_sums(rows, starts):
+    # rows (r, m), lignes triées par groupe -> sommes (g, r) ; une tranche contiguë par groupe
+    return np.add.reduceat(rows, starts, axis=1).T
+
+
+def compute_moments(data, by=None, columns=None):
+    """
+    Résume les colonnes `columns` de `data` pour chaque groupe de `by`.
+
+    Les lignes sont triées par groupe une fois ; chaque accumulateur est
+    ensuite une somme par tranche de groupe (`np.add.reduceat`) calculée pour
+    tous les groupes à la fois. Les colonnes qui ont les mêmes valeurs
+    manquantes partagent leurs effectifs et leurs sommes.
+
+    Returns:
+        dict: 'keys' (DataFrame des clés de groupe), 'columns', les
+        accumulateurs paire par paire `PAIR_FIELDS` (g, k, k), 'min', 'max'
+        (g, k) et 'sketches' (g, k), esquisses de quantiles.
+    """
+    by = STATS_DIMENSIONS if by is None else by
+    columns = [col for col in (columns or STATS_COLUMNS) if col in data.columns]
+    groups = data.groupby(by, sort=True, observed=True)
+    codes = groups.ngroup().to_numpy()
+    keys = groups.size().index
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    # Une ligne par colonne (k, m) : les sommes par groupe parcourent des tranches contiguës
+    values = np.ascontiguousarray(data[columns].to_numpy(dtype='float64')[order].T)
+    n_groups, k = len(keys), len(columns)
+    # Les groupes observés ne sont jamais vides : la tranche du groupe g commence à starts[g]
+    starts = np.searchsorted(codes, np.arange(n_groups))
+
+    moments = {name: np.zeros((n_groups, k, k)) for name in PAIR_FIELDS}
+    moments['min'] = np.full((n_groups, k), np.nan)
+    moments['max'] = np.full((n_groups, k), np.nan)
+    moments['sketches'] = np.empty((n_groups, k), dtype=object)
+    moments.update({'keys': keys.to_frame(index=False), 'columns': columns})
+    if not n_groups:
+        return moments
+
+    valid = ~np.isnan(values)
+    # Décalage par la première valeur renseignée du groupe : un groupe constant donne des écarts nuls exacts
+    first_row = np.minimum.reduceat(np.where(valid, np.arange(values.shape[1]), values.shape[1]), starts, axis=1)
+    first = np.where(first_row < values.shape[1],
+                     np.take_along_axis(values, np.minimum(first_row, values.shape[1] - 1), axis=1), 0.0).T
+    x = np.where(valid, values - first.T[:, codes], 0.0)
+
+    # [g, i, j] : colonne i sur les lignes où i et j sont renseignées ; les
+    # colonnes j de même motif de valeurs manquantes donnent les mêmes sommes
+    n, s, squares = (np.zeros((n_groups, k, k)) for _ in range(3))
+    pattern_of = np.array([next(i for i in range(j + 1) if np.array_equal(valid[i], valid[j])) for j in range(k)])
+    for pattern in np.unique(pattern_of):
+        weight = valid[pattern].astype('float64')
+        same = pattern_of == pattern
+        n[:, :, same] = _group_sums(valid * weight, starts)[:, :, None]
+        s[:, :, same] = _group_sums(x * weight, starts)[:, :, None]
+        squares[:, :, same] = _group_sums(x * x * weight, starts)[:, :, None]
+    # Produits croisés symétriques : triangle inférieur, puis recopie
+    cross = np.zeros((n_groups, k, k))
+    for j in range(k):
+        cross[:, j:, j] = _group_sums(x[j:] * x[j], starts)
+    cross = np.tril(cross) + np.tril(cross, -1).transpose(0, 2, 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shifted_mean = np.where(n > 0, s / n, 0.0)
+    moments['n'] = n
+    moments['mean'] = shifted_mean + first[:, :, None]
+    moments['m2'] = np.maximum(squares - s * shifted_mean, 0.0)
+    moments['comoment'] = cross - s * shifted_mean.transpose(0, 2, 1)
+    with np.errstate(invalid='ignore'):
+        moments['min'] = np.fmin.reduceat(values, starts, axis=1).T
+        moments['max'] = np.fmax.reduceat(values, starts, axis=1).T
+    for column in range(k):
+        moments['sketches'][:, column] = grouped_sketches(codes, values[column], np.ones(len(codes)), n_groups)
+    return moments
+
+
+def slice_moments(moments, region=None, district=None):
+    """Restreint les moments aux groupes d'une région et/ou d'un district (None = pas de filtre)."""
+    mask = np.ones(len(moments['keys']), dtype=bool)
+    if region is not None:
+        mask &= (moments['keys']['Région'] == region).to_numpy()
+    if district is not None:
+        mask &= (moments['keys']['District Sanitaire'] == district).to_numpy()
+    sliced = {name: value[mask] if isinstance(value, np.ndarray) else value for name, value in moments.items()}
+    sliced['keys'] = moments['keys'][mask].reset_index(drop=True)
+    return sliced
+
+
+def merge_moments(moments, by=None, sketches=True):
+    """
+    Fusionne les groupes sur les dimensions `by` (None = un seul groupe pour toute la sélection).
+
+    Args:
+        sketches (bool): Faux pour ne fusionner que les moments, min et max
+            (moyennes, écarts-types, corrélations) : le résultat n'a alors pas
+            d'esquisses de quantiles.
+    """
+    keys = moments['keys']
+    if by is None:
+        codes, merged_keys = np.zeros(len(keys), dtype=np.int64), pd.DataFrame(index=[0])
+    else:
+        codes, index = pd.MultiIndex.from_frame(keys[by]).factorize(sort=True)
+        merged_keys = index.to_frame(index=False, name=by)
+    n_out, k = len(merged_keys), len(moments['columns'])
+
+    # Fusion à plusieurs groupes (Chan et al.) : les écarts des moyennes de groupe
+    # à la moyenne fusionnée complètent M2 et les co-moments
+    n_g, mean_g = moments['n'], moments['mean']
+    n = np.zeros((n_out, k, k))
+    np.add.at(n, codes, n_g)
+    weighted = np.zeros((n_out, k, k))
+    np.add.at(weighted, codes, n_g * mean_g)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(n > 0, weighted / n, 0.0)
+    delta = mean_g - mean[codes]
+    m2 = np.zeros((n_out, k, k))
+    np.add.at(m2, codes, moments['m2'] + n_g * delta * delta)
+    comoment = np.zeros((n_out, k, k))
+    np.add.at(comoment, codes, moments['comoment'] + n_g * delta * delta.transpose(0, 2, 1))
+
+    merged = {'keys': merged_keys, 'columns': moments['columns'],
+              'n': n, 'mean': mean, 'm2': m2, 'comoment': comoment}
+    for name, reduce in (('min', np.fmin), ('max', np.fmax)):
+        out = np.full((n_out, k), np.nan)
+        reduce.at(out, codes, moments[name])
+        merged[name] = out
+    if sketches:
+        merged['sketches'] = np.empty((n_out, k), dtype=object)
+        for column in range(k):
+            parts = moments['sketches'][:, column]
+            lengths = np.fromiter((len(part[0]) for part in parts), dtype=np.int64, count=len(parts))
+            values = np.concatenate([part[0] for part in parts]) if len(parts) else np.zeros(0)
+            weights = np.concatenate([part[1] for part in parts]) if len(parts) else np.zeros(0)
+            merged['sketches'][:, column] = grouped_sketches(np.repeat(codes, lengths), values, weights, n_out)
+    return merged
+
+
+def combine_moments(*parts):
+    """
+    Fusionne des moments calculés séparément (ex. le résumé existant et celui
+    de nouvelles lignes) en conservant un groupe par clé.
+    """
+    stacked = {'keys': pd.concat([part['keys'] for part in parts], ignore_index=True),
+               'columns': parts[0]['columns']}
+    for name in PAIR_FIELDS + ('min', 'max', 'sketches'):
+        stacked[name] = np.concatenate([part[name] for part in parts])
+    return merge_moments(stacked, list(stacked['keys'].columns))
+
+
+def _diagonal(array):
+    return np.diagonal(array, axis1=-2, axis2=-1)
+
+
+def mean_std(moments):
+    """Moyennes et écarts-types par groupe, sous forme de tableaux (g, k)."""
+    n, mean, m2 = _diagonal(moments['n']), _diagonal(moments['mean']), _diagonal(moments['m2'])
+    # Une moyenne fusionnée peut différer d'un ulp : elle reste dans [min, max],
+    # et une colonne constante (min == max) a une variance nulle exacte
+    mean = np.where(n > 0, np.clip(mean, moments['min'], moments['max']), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = np.where(moments['min'] == moments['max'], 0.0, m2) / (n - 1)
+    return mean, np.sqrt(np.where(n > 1, variance, np.nan))
+
+
+def selection_quantiles(moments, quantiles):
+    """Quantiles de chaque colonne d'une sélection fusionnée en un groupe, de forme (q, k)."""
+    return np.column_stack([sketch_quantiles(sketch, quantiles) for sketch in moments['sketches'][0]])
+
+
+def describe_from_moments(moments):
+    """Résumé équivalent à `describe()` pour une sélection fusionnée en un groupe."""
+    mean, std = mean_std(moments)
+    quartiles = selection_quantiles(moments, [0.25, 0.5, 0.75])
+    rows = [_diagonal(moments['n'])[0], mean[0], std[0], moments['min'][0], *quartiles, moments['max'][0]]
+    return pd.DataFrame(rows, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+                        columns=moments['columns'])
+
+
+def correlation_from_moments(moments):
+    """Matrice de corrélation de Pearson (paires complètes) d'une sélection fusionnée en un groupe."""
+    n, mean, m2, comoment = (moments[name][0] for name in PAIR_FIELDS)
+    # m2[i, j] : colonne i sur les lignes de la paire ; m2.T[i, j] : colonne j
+    constant = (moments['min'] == moments['max'])[0][:, None]
+    m2 = np.where(constant | (m2 <= VARIANCE_TOLERANCE * n * mean * mean), 0.0, m2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = comoment / np.sqrt(m2 * m2.T)
+    corr = np.where((n > 1) & (m2 > 0) & (m2.T > 0), np.clip(corr, -1.0, 1.0), np.nan)
+    np.fill_diagonal(corr, np.where(np.isnan(np.diag(corr)), np.nan, 1.0))
+    return pd.DataFrame(corr, index=moments['columns'], columns=moments['columns'])
+
+
+def cv_from_moments(moments, by='Région'):
+    """
+    Coefficients de variation (%) par groupe, en format long (groupe, Variable, CV (%)).
+
+    Moyenne et écart-type sont arrondis à 3 décimales avant le calcul, et les
+    couples de moyenne nulle sont écartés, comme dans l'ancien tableau.
+    """
+    mean, std = mean_std(moments)
+    mean, std = mean.round(3), std.round(3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cv = std / np.abs(mean) * 100
+    groups, variables = np.nonzero(mean != 0)
+    return pd.DataFrame({
+        by: moments['keys'][by].to_numpy()[groups],
+        'Variable': np.asarray(moments['columns'], dtype=object)[variables],
+        'CV (%)': cv[groups, variables],
+    })
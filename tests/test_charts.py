@@ -0,0 +1,17 @@
+"""Tests des graphiques de distribution résumés côté serveur (`charts._distribution_chart`)."""
+import numpy as np
+import pandas as pd
+
+from charts import _distribution_chart
+
+
+def test_summarized_violin_skips_density_of_all_nan_group():
+    frame = pd.DataFrame({
+        'Région': ['A'] * 6 + ['B'] * 4 + ['C'] * 3,
+        'Nb_Structures': [1, 2, 3, 4, 5, 6, 2, 3, 3, 4] + [np.nan] * 3,
+    })
+    fig = _distribution_chart(frame, 'Région', 'Nb_Structures', 'titre', violin=True, max_points=5)
+
+    densities = [trace for trace in fig.data if trace.type == 'scatter' and trace.fill == 'toself']
+    assert [trace.name for trace in densities] == ['A', 'B']
+    assert [trace.name for trace in fig.data if trace.type == 'box'] == ['A', 'B', 'C']
@@ -0,0 +1,43 @@
+"""Tests du rechargement à chaud (`data_reloader.DatasetReloader`)."""
+import shutil
+
+from data_reloader import DatasetReloader
+from dataset import DATA_FILE, load_versioned_dataset
+
+
+def _write_rows(path, lines, n_rows):
+    # En-tête + les `n_rows` premières lignes de l'extrait réel
+    path.write_text(''.join(lines[:n_rows + 1]), encoding='utf-8')
+
+
+def test_reload_swaps_in_file_modified_during_build(tmp_path):
+    source = tmp_path / 'conventions.csv'
+    shutil.copy(DATA_FILE, source)
+    lines = source.read_text(encoding='utf-8').splitlines(keepends=True)
+    cache_dir = tmp_path / 'cache'
+    _write_rows(source, lines, 100)
+    rewrites = []
+
+    def build(path):
+        data, data_version = load_versioned_dataset(path, str(cache_dir))
+        if rewrites:
+            # Le fichier change pendant la reconstruction, après sa lecture
+            _write_rows(source, lines, rewrites.pop())
+        return {'data': data, 'data_version': data_version}
+
+    reloader = DatasetReloader(str(source), build)
+    assert len(reloader.current()['data']) == 100
+
+    _write_rows(source, lines, 200)
+    rewrites.append(300)
+    assert reloader.reload()
+    state = reloader.current()
+    assert (state['version'], len(state['data'])) == (2, 200)
+
+    # La reconstruction suivante voit une autre version et substitue les données récentes
+    assert reloader.reload()
+    expected, expected_version = load_versioned_dataset(str(source), str(tmp_path / 'check'))
+    state = reloader.current()
+    assert (state['version'], state['data_version']) == (3, expected_version)
+    assert state['data'].equals(expected)
+    assert not reloader.reload()
@@ -0,0 +1,54 @@
+"""Tests de la conversion des effectifs au schéma compact (`dataset.compact_counts`)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset import compact_counts
+
+
+def counts(valeurs, signees, non_signees):
+    return pd.DataFrame({
+        'Valeurs': valeurs,
+        'Nb Conventions Signées': signees,
+        'Nb Conventions Non Signées': non_signees,
+    }, dtype='float64')
+
+
+def test_missing_counts_stay_missing_as_nullable_integers():
+    data = compact_counts(counts([3, np.nan, 5], [1, 2, np.nan], [2, np.nan, 5]))
+
+    assert data.dtypes.astype(str).tolist() == ['Int32', 'Int16', 'Int16']
+    assert data['Valeurs'].isna().tolist() == [False, True, False]
+    assert data['Nb Conventions Signées'].tolist()[:2] == [1, 2]
+    # Les sommes ignorent les valeurs manquantes, comme l'ancien remplissage par 0
+    assert data['Nb Conventions Non Signées'].sum() == 7
+
+
+def test_fractional_counts_warn_and_fall_back_to_float():
+    with pytest.warns(UserWarning, match=r"'Valeurs' : 1 valeur\(s\) non entière\(s\).*ligne 1"):
+        data = compact_counts(counts([3, 1.5, 5], [1, 2, 3], [0, 0, 0]))
+
+    assert data['Valeurs'].dtype == 'float64'
+    assert data['Valeurs'].tolist() == [3, 1.5, 5]
+    assert data['Nb Conventions Signées'].dtype == 'Int16'
+
+
+def test_infinite_counts_are_reported_as_non_integer():
+    with pytest.warns(UserWarning, match='non entière'):
+        data = compact_counts(counts([3, np.inf, 5], [1, 2, 3], [0, 0, 0]))
+    assert data['Valeurs'].dtype == 'float64'
+
+
+def test_out_of_range_counts_widen_the_integer_type():
+    data = compact_counts(counts([3, 3_000_000_000, 5], [40_000, 2, np.nan], [-40_000, 0, 0]))
+
+    assert data.dtypes.astype(str).tolist() == ['Int64', 'Int32', 'Int32']
+    assert data['Valeurs'].iloc[1] == 3_000_000_000
+    assert data['Nb Conventions Signées'].iloc[0] == 40_000
+    assert data['Nb Conventions Non Signées'].iloc[0] == -40_000
+
+
+def test_counts_beyond_int64_warn_and_fall_back_to_float():
+    with pytest.warns(UserWarning, match="hors de l'étendue de Int64"):
+        data = compact_counts(counts([3, 1e20, 5], [1, 2, 3], [0, 0, 0]))
+    assert data['Valeurs'].dtype == 'float64'
@@ -0,0 +1,76 @@
+"""Tests de la déduplication des structures (`dedup.structure_ids`, `dataset.deduplicate_structures`)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from classification import NOM_STRUCTURE_COL
+from dataset import SHARE_SOURCES, deduplicate_structures, prepare_data
+from dedup import (SIMILARITY_THRESHOLD, STRUCTURE_ID_COL, distinctive_names, normalize_names, similar_pairs,
+                   structure_ids)
+
+
+def district(names, values=None, signed=None):
+    """Lignes au format du CSV source, toutes dans le même district."""
+    values = [1.0] * len(names) if values is None else values
+    signed = values if signed is None else signed
+    total = sum(values)
+    return pd.DataFrame({
+        'Région': 'DAKAR',
+        'District Sanitaire': 'Pikine',
+        'NOMBRE DE DISTRICTS SANITAIRES VISITES': ['1'] + ['--'] * (len(names) - 1),
+        NOM_STRUCTURE_COL: names,
+        'Valeurs': values,
+        'Nb Conventions Signées': signed,
+        'Nb Conventions Non Signées': [v - s for v, s in zip(values, signed)],
+        'Part Structures Ciblées': [v / total * 100 for v in values],
+        'Part Conventions Signées': [s / total * 100 for s in signed],
+        'Part Conventions Non Signées': [(v - s) / total * 100 for v, s in zip(values, signed)],
+    })
+
+
+def test_variant_pair_is_merged_and_shares_are_recomputed():
+    data = prepare_data(district(['Poste de Santé de Khor ', 'Poste de Santé Thiaroye', 'Poste de santé Khor'],
+                                 values=[1.0, 2.0, 1.0], signed=[0.0, 2.0, 1.0]))
+    result = deduplicate_structures(data)
+
+    assert result[NOM_STRUCTURE_COL].tolist() == ['Poste de Santé Thiaroye', 'Poste de santé Khor']
+    # Parts rapportées au total des lignes conservées (3), et non plus du CSV (4)
+    assert result['Part Structures Ciblées'].tolist() == pytest.approx([200 / 3, 100 / 3])
+    assert result['Part Conventions Signées'].tolist() == pytest.approx([200 / 3, 100 / 3])
+    assert result['Part Conventions Non Signées'].tolist() == pytest.approx([0, 0])
+    assert result['Part Structures Ciblées'].sum() == pytest.approx(100)
+
+
+def test_names_differing_only_by_number_stay_distinct():
+    data = prepare_data(district(['Poste de Santé 1', 'Poste de Santé 2', 'Poste de Santé Keur Massar I',
+                                  'Poste de Santé Keur Massar II']))
+    result = deduplicate_structures(data)
+
+    assert result[STRUCTURE_ID_COL].tolist() == [0, 1, 2, 3]
+    # Aucune ligne écartée : les parts du CSV sont inchangées
+    assert result['Part Structures Ciblées'].tolist() == pytest.approx([25] * 4)
+
+
+def test_transitive_chain_forms_one_structure():
+    names = ['Poste de Santé Diamaguene Sicap Mbao', 'Poste de Santé Diamaguene Sicap Mbaw',
+             'Poste de Santé Diamaguen Sicap Mbaw', 'Poste de Santé Thiaroye']
+    cores = distinctive_names(normalize_names(names[:3])).to_pylist()
+    scores = similar_pairs(np.zeros(3, dtype=int), cores, threshold=0).set_index(['left', 'right'])['score']
+    # Le premier et le dernier nom de la chaîne ne sont pas assez proches entre eux
+    assert scores[0, 2] < SIMILARITY_THRESHOLD <= min(scores[0, 1], scores[1, 2])
+
+    data = prepare_data(district(names))
+    assert structure_ids(data)[0].tolist() == [0, 0, 0, 1]
+    result = deduplicate_structures(data)
+    assert result[NOM_STRUCTURE_COL].tolist() == names[2:]
+    assert result['Part Structures Ciblées'].tolist() == pytest.approx([50, 50])
+
+
+def test_missing_count_gives_missing_share():
+    data = prepare_data(district(['Poste de Santé Khor', 'Poste de Santé Thiaroye'], values=[1.0, np.nan],
+                                 signed=[1.0, 0.0]))
+    result = deduplicate_structures(data)
+
+    assert result['Part Structures Ciblées'].iloc[0] == pytest.approx(100)
+    assert np.isnan(result['Part Structures Ciblées'].iloc[1])
+    assert set(SHARE_SOURCES) <= set(result.columns)
@@ -0,0 +1,61 @@
+"""Tests des exports par morceaux (`export`) contre l'ancien export CSV d'un bloc."""
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from export import available_formats, export_bytes, export_zip
+
+
+@pytest.fixture
+def frame():
+    n = 23
+    return pd.DataFrame({
+        'Région': pd.Categorical(['DAKAR', 'THIÈS', 'SAINT-LOUIS'] * 7 + ['DAKAR', 'THIÈS']),
+        'NOM DES STRUCTURES SANITAIRES CIBLES': [f'Poste de santé n°{i}; "annexe"' for i in range(n)],
+        'Valeurs': pd.array(list(range(n - 1)) + [None], dtype='Int32'),
+        'Part Conventions Signées': np.linspace(0, 100, n).astype('float32'),
+    })
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 5, 22, 23, 100])
+def test_csv_is_identical_to_single_block_export(frame, chunk_rows):
+    # Ancien bouton de téléchargement : to_csv du tableau entier
+    expected = frame.to_csv(index=False, sep=';').encode('utf-8')
+
+    assert export_bytes(frame, 'csv', chunk_rows) == expected
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 5, 22, 100])
+def test_parquet_round_trips_across_chunks(frame, chunk_rows):
+    result = pd.read_parquet(io.BytesIO(export_bytes(frame, 'parquet', chunk_rows)))
+
+    pd.testing.assert_frame_equal(result, frame)
+
+
+@pytest.mark.skipif('xlsx' not in available_formats(0), reason="openpyxl absent")
+@pytest.mark.parametrize('chunk_rows', [5, 22, 100])
+def test_xlsx_round_trips_across_chunks(frame, chunk_rows):
+    result = pd.read_excel(io.BytesIO(export_bytes(frame, 'xlsx', chunk_rows)))
+    expected = frame.astype({'Région': str, 'Valeurs': 'float64', 'Part Conventions Signées': 'float64'})
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-6)
+
+
+def test_empty_selection_exports_header_only(frame):
+    empty = frame.iloc[:0]
+
+    assert export_bytes(empty, 'csv', 5) == empty.to_csv(index=False, sep=';').encode('utf-8')
+    result = pd.read_parquet(io.BytesIO(export_bytes(empty, 'parquet', 5)))
+    assert result.empty and result.columns.tolist() == empty.columns.tolist()
+
+
+def test_zip_holds_one_file_per_group(frame):
+    with zipfile.ZipFile(io.BytesIO(export_zip(frame, ['Région'], 'csv', chunk_rows=3))) as archive:
+        names = archive.namelist()
+        dakar = archive.read('dakar.csv')
+
+    assert names == ['dakar.csv', 'saint-louis.csv', 'thies.csv']
+    assert dakar == frame[frame['Région'] == 'DAKAR'].to_csv(index=False, sep=';').encode('utf-8')
@@ -0,0 +1,36 @@
+"""Tests du cache partagé de figures (`figure_cache.FigureCache`)."""
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from figure_cache import FigureCache, figure_payload
+
+
+def _bar(values):
+    return go.Figure(go.Bar(x=list(range(len(values))), y=values), layout=dict(title='titre'))
+
+
+def test_hit_returns_independent_real_figure():
+    cache = FigureCache()
+    built = cache.get_or_build('k', _bar, [1, 2, 3])
+    built_json = pio.to_json(built, validate=False)
+    first = cache.get_or_build('k', _bar, [9, 9, 9])
+    first.update_layout(title='modifié')
+    first.data[0].y = [0, 0, 0]
+    second = cache.get_or_build('k', _bar, [9, 9, 9])
+
+    assert isinstance(second, go.Figure) and second is not first
+    # Même JSON (donc même élément Streamlit) au succès qu'à la construction
+    assert pio.to_json(second, validate=False) == built_json
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_entries_are_charged_their_json_size_and_evicted_lru():
+    size = figure_payload(_bar([1, 2, 3]))[1]
+    cache = FigureCache(max_bytes=2 * size)
+    for key in ['a', 'b', 'a', 'c']:
+        cache.get_or_build(key, _bar, [1, 2, 3])
+
+    stats = cache.stats()
+    assert (stats['entries'], stats['bytes'], stats['evictions']) == (2, 2 * size, 1)
+    cache.get_or_build('a', _bar, [1, 2, 3])
+    assert cache.stats()['hits'] == 2
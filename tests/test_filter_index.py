@@ -0,0 +1,64 @@
+"""Tests de l'index des filtres (`filter_index`) contre les anciens masques booléens."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from filter_index import build_filter_index, filter_positions, select_rows, status_positions
+
+
+@pytest.fixture
+def frame():
+    # DAKAR est rangé d'un bloc ; les lignes de THIES sont entrecoupées d'une autre région
+    return pd.DataFrame({
+        'Région': pd.Categorical(['DAKAR', 'DAKAR', 'DAKAR', 'THIES', 'FATICK', 'THIES', 'THIES'],
+                                 categories=['DAKAR', 'FATICK', 'KOLDA', 'THIES']),
+        'District Sanitaire': ['Pikine', 'Pikine', 'Rufisque', 'Mbour', 'Gossas', 'Mbour', 'Pikine'],
+        'Statut Convention': ['Signée', 'Non Signée', 'Signée', 'Signée', 'Signée', 'Non Signée', 'Signée'],
+        'Valeurs': np.arange(7),
+    })
+
+
+def inline_filter(data, region=None, district=None):
+    """Ancien filtre de la barre latérale : masques booléens successifs."""
+    filtered = data if region is None else data[data['Région'] == region]
+    return filtered if district is None else filtered[filtered['District Sanitaire'] == district]
+
+
+@pytest.mark.parametrize('region, district', [
+    (None, None), ('DAKAR', None), ('THIES', None), ('DAKAR', 'Pikine'), ('THIES', 'Mbour'),
+    (None, 'Pikine'), ('KOLDA', None), ('DAKAR', 'Mbour'),
+])
+def test_select_rows_matches_boolean_masks(frame, region, district):
+    index = build_filter_index(frame)
+
+    pd.testing.assert_frame_equal(select_rows(frame, index, region, district), inline_filter(frame, region, district))
+
+
+def test_contiguous_rows_are_a_view_and_scattered_rows_a_take(frame):
+    index = build_filter_index(frame)
+    dakar = select_rows(frame, index, 'DAKAR')
+    thies = select_rows(frame, index, 'THIES')
+
+    assert np.shares_memory(dakar['Valeurs'].to_numpy(), frame['Valeurs'].to_numpy())
+    assert not np.shares_memory(thies['Valeurs'].to_numpy(), frame['Valeurs'].to_numpy())
+    assert thies.index.tolist() == [3, 5, 6]
+
+
+def test_menus_list_present_values_in_sorted_order(frame):
+    index = build_filter_index(frame)
+
+    assert index['regions'] == ['DAKAR', 'FATICK', 'THIES']
+    assert index['districts'] == sorted(frame['District Sanitaire'].unique())
+    assert index['districts_by_region'] == {'DAKAR': ['Pikine', 'Rufisque'], 'FATICK': ['Gossas'],
+                                            'THIES': ['Mbour', 'Pikine']}
+
+
+def test_positions_are_read_only(frame):
+    index = build_filter_index(frame)
+    positions = filter_positions(index, 'THIES')
+
+    assert filter_positions(index) is None
+    with pytest.raises(ValueError):
+        positions[0] = 0
+    assert status_positions(index, 'THIES', 'Mbour', 'Non Signée').tolist() == [5]
+    assert status_positions(index, 'KOLDA', 'Kolda', 'Signée').tolist() == []
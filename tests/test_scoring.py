@@ -0,0 +1,90 @@
+"""Tests du score de performance (`scoring`) contre l'ancien calcul par `Series.rank(pct=True)`."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import COUNT_COL, build_cube, rollup
+from scoring import batch_scores, percentile_ranks, score_level
+
+
+@pytest.fixture
+def rows():
+    # DAKAR et THIES ont des indicateurs identiques (ex aequo) ; deux districts de
+    # FATICK sont ex aequo entre eux, et KOLDA n'a aucune convention (taux 0)
+    records = [
+        ('DAKAR', 'Pikine', 4, 3, 1, 60.0), ('DAKAR', 'Rufisque', 2, 1, 1, 40.0),
+        ('THIES', 'Mbour', 4, 3, 1, 60.0), ('THIES', 'Tivaouane', 2, 1, 1, 40.0),
+        ('FATICK', 'Foundiougne', 3, 1, 2, 50.0), ('FATICK', 'Gossas', 3, 1, 2, 50.0),
+        ('FATICK', 'Niakhar', 5, 4, 1, 80.0), ('KOLDA', 'Velingara', 1, 0, 0, 0.0),
+    ]
+    data = pd.DataFrame(records, columns=['Région', 'District Sanitaire', 'Valeurs', 'Nb Conventions Signées',
+                                         'Nb Conventions Non Signées', 'Part Conventions Signées'])
+    data['Type'] = 'Poste de Santé'
+    data['Statut Convention'] = np.where(data['Nb Conventions Signées'] > 0, 'Signée', 'Non Signée')
+    return data
+
+
+def inline_scores(totals, by):
+    """Ancien tableau de performance de l'onglet statistique, calculé sur les sommes par entité."""
+    table = pd.DataFrame({
+        **{col: totals[col] for col in by},
+        'Valeurs_sum': totals['Valeurs'],
+        'Nb_Conventions_Signees_sum': totals['Nb Conventions Signées'],
+        'Nb_Conventions_Non_Signees_sum': totals['Nb Conventions Non Signées'],
+        'Part_Conventions_Signees_mean': totals['Part Conventions Signées'] / totals[COUNT_COL],
+        'Nb_Structures_count': totals[COUNT_COL],
+    }).round(2)
+    total_conv = table['Nb_Conventions_Signees_sum'] + table['Nb_Conventions_Non_Signees_sum']
+    table['Efficacite_Signature'] = (table['Nb_Conventions_Signees_sum'] / total_conv * 100).fillna(0)
+    table['Valeur_Moyenne_Structure'] = (table['Valeurs_sum'] / table['Nb_Structures_count']).fillna(0)
+    return table
+
+
+def inline_global_score(table, ranks):
+    return (ranks(table['Efficacite_Signature']) * 0.4 + ranks(table['Valeur_Moyenne_Structure']) * 0.3
+            + ranks(table['Part_Conventions_Signees_mean']) * 0.3) * 100
+
+
+def test_region_scores_match_inline_ranking_with_ties(rows):
+    cube = build_cube(rows)
+    table = inline_scores(rollup(cube, ['Région']), ['Région'])
+    expected = inline_global_score(table, lambda values: values.rank(pct=True))
+    result = score_level(cube, 'region')
+
+    np.testing.assert_allclose(result['Score_Global'], expected)
+    scores = result.set_index('Région')['Score_Global']
+    assert scores['DAKAR'] == scores['THIES']
+
+
+def test_district_scores_within_each_region_match_grouped_ranking(rows):
+    cube = build_cube(rows)
+    table = inline_scores(rollup(cube, ['Région', 'District Sanitaire']), ['Région', 'District Sanitaire'])
+    expected = inline_global_score(table, lambda values: values.groupby(table['Région']).rank(pct=True))
+    result = batch_scores(cube)
+    by_region = result[(result['Classement'] == 'district') & (result['Périmètre'] != 'Sénégal')]
+
+    np.testing.assert_allclose(by_region['Score_Global'], expected)
+    fatick = by_region.set_index('District Sanitaire')['Score_Global']
+    assert fatick['Foundiougne'] == fatick['Gossas']
+    # Seul district de sa région : rang 1 pour chaque indicateur
+    assert fatick['Velingara'] == 100
+
+
+def test_national_rankings_match_inline_ranking(rows):
+    cube = build_cube(rows)
+    result = batch_scores(cube)
+    national = result[(result['Classement'] == 'district') & (result['Périmètre'] == 'Sénégal')]
+    table = inline_scores(rollup(cube, ['Région', 'District Sanitaire']), ['Région', 'District Sanitaire'])
+
+    np.testing.assert_allclose(national['Score_Global'], inline_global_score(table, lambda v: v.rank(pct=True)))
+    assert set(result['Classement']) == {'region', 'district'}
+
+
+def test_percentile_ranks_match_pandas_with_ties_nan_and_groups():
+    values = np.array([[3.0, 1.0], [1.0, np.nan], [3.0, 1.0], [2.0, 5.0], [3.0, 1.0], [np.nan, 2.0]])
+    groups = np.array([0, 1, 0, 1, 1, 0])
+    frame = pd.DataFrame(values)
+
+    np.testing.assert_allclose(percentile_ranks(values), frame.rank(pct=True).to_numpy())
+    np.testing.assert_allclose(percentile_ranks(values, groups), frame.groupby(groups).rank(pct=True).to_numpy())
+
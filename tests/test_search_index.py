@@ -0,0 +1,77 @@
+"""Tests de la recherche de l'explorateur (`search_index`) contre l'ancien filtre ligne à ligne."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from classification import NOM_STRUCTURE_COL, fold_text
+from dataset import prepare_data
+from search_index import SEARCH_COLUMNS, build_search_index, search_positions
+
+
+@pytest.fixture
+def frame():
+    names = ['Centre de Santé de Saint-louis', 'Poste de santé Diamaguene', 'Poste de santé de Khor ',
+             'Poste de santé de Ngalléle', 'Hôpital Régional de Thiès', 'Poste de Santé Keur Massar',
+             'Case de santé Thiokho', 'Poste de santé Mbour Maure']
+    regions = ['SAINT-LOUIS'] * 4 + ['THIES', 'DAKAR', 'THIES', 'THIES']
+    districts = ['Saint-Louis'] * 4 + ['Thiès', 'Keur Massar', 'Mbour', 'Mbour']
+    signed = [1.0, 0.0, 1.0, 0.0, 2.0, 1.0, 0.0, 1.0]
+    return prepare_data(pd.DataFrame({
+        'Région': regions,
+        'District Sanitaire': districts,
+        'NOMBRE DE DISTRICTS SANITAIRES VISITES': ['1', '--', '--', '--', '1', '1', '1', '--'],
+        NOM_STRUCTURE_COL: names,
+        'Valeurs': 2.0,
+        'Nb Conventions Signées': signed,
+        'Nb Conventions Non Signées': [2.0 - s for s in signed],
+        'Part Structures Ciblées': 25.0,
+        'Part Conventions Signées': 12.5,
+        'Part Conventions Non Signées': 12.5,
+    }))
+
+
+def inline_search(data, term, fold=False):
+    """Ancien filtre de l'explorateur : sous-chaîne sans casse dans l'une des colonnes de la ligne."""
+    text = data[SEARCH_COLUMNS].astype(str)
+    if fold:
+        text = text.map(fold_text)
+        term = fold_text(term)
+    return np.flatnonzero(text.apply(lambda row: row.str.contains(term, case=False, regex=False).any(), axis=1))
+
+
+@pytest.mark.parametrize('term', ['poste', 'THIES', 'khor', 'Non', 'santé', 'maure', 'introuvable'])
+def test_single_term_matches_inline_search(frame, term):
+    index = build_search_index(frame)
+
+    np.testing.assert_array_equal(search_positions(index, term), inline_search(frame, term))
+
+
+@pytest.mark.parametrize('term', ['thies', 'THIÈS', 'ngallele', 'Hopital regional', 'SANTE'])
+def test_accents_and_case_are_folded(frame, term):
+    index = build_search_index(frame)
+    # Chaque mot peut apparaître dans une colonne différente de la ligne
+    expected = np.flatnonzero(np.logical_and.reduce([np.isin(np.arange(len(frame)), inline_search(frame, word, fold=True))
+                                                     for word in term.split()]))
+
+    assert len(expected)
+    np.testing.assert_array_equal(search_positions(index, term), expected)
+
+
+def test_prefix_search_matches_word_starts_only(frame):
+    index = build_search_index(frame)
+
+    # 'hor' est dans 'Khor' et 'Thiokho' mais n'ouvre aucun mot
+    assert search_positions(index, 'hor').tolist() == [2]
+    assert search_positions(index, 'hor', prefix=True).tolist() == []
+    assert search_positions(index, 'kho', prefix=True).tolist() == [2]
+    assert search_positions(index, 'thio', prefix=True).tolist() == [6]
+    # Début de mot après un tiret ('Saint-louis')
+    assert search_positions(index, 'louis', prefix=True).tolist() == [0, 1, 2, 3]
+
+
+def test_search_within_filter_positions_keeps_their_order(frame):
+    index = build_search_index(frame)
+    positions = np.array([7, 6, 4, 2])
+
+    assert search_positions(index, 'poste', positions).tolist() == [7, 2]
+    assert search_positions(index, 'mbour non signee', positions).tolist() == [6]
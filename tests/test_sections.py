@@ -0,0 +1,53 @@
+"""Tests de la mémoire des sections (`sections.SectionMemo`)."""
+import plotly.graph_objects as go
+
+from figure_cache import FigureCache
+from sections import SectionMemo
+
+
+def counting(calls):
+    def build(*args):
+        calls.append(args)
+        return sum(args)
+    return build
+
+
+def test_keyed_result_is_replaced_instead_of_accumulated():
+    store, calls = {}, []
+    build = counting(calls)
+    for start, end in [(1, 2), (1, 3), (2, 3), (1, 3)]:
+        memo = SectionMemo(store, 'progression', filter_key=(None, None), dataset_version='v1')
+        assert memo('progression', build, start, end, key=('s', start, end)) == start + end
+
+    assert len(calls) == 4
+    assert list(store['progression']['results']) == ['progression']
+    # La même sélection au rerun suivant est servie par la mémoire
+    memo = SectionMemo(store, 'progression', filter_key=(None, None), dataset_version='v1')
+    assert memo('progression', build, 1, 3, key=('s', 1, 3)) == 4
+    assert len(calls) == 4
+
+
+def test_filter_or_data_change_resets_the_section():
+    store, calls = {}, []
+    build = counting(calls)
+    SectionMemo(store, 'stats', ('DAKAR', None), dataset_version='v1')('total', build, 1)
+    SectionMemo(store, 'stats', ('DAKAR', None), dataset_version='v1')('total', build, 1)
+    SectionMemo(store, 'stats', ('THIES', None), dataset_version='v1')('total', build, 1)
+    SectionMemo(store, 'stats', ('THIES', None), dataset_version='v2')('total', build, 1)
+
+    assert len(calls) == 3
+
+
+def test_keyed_figures_go_through_the_shared_cache():
+    store, cache, calls = {}, FigureCache(), []
+
+    def build(title):
+        calls.append(title)
+        return go.Figure(layout={'title': {'text': title}})
+
+    for key in ['a', 'b', 'a']:
+        memo = SectionMemo(store, 'progression', (None, None), cache, dataset_version='v1')
+        assert memo.figure('fig_progress', build, key, key=key).layout.title.text == key
+
+    assert calls == ['a', 'b']
+    assert cache.stats()['entries'] == 2
@@ -0,0 +1,46 @@
+"""Tests du jeu de données partagé en lecture seule (`shared_data.share_frame`)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from shared_data import buffer_ranges, owned_bytes, share_frame
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'Région': pd.Categorical(['DAKAR', 'THIES', 'DAKAR']),
+        'Nom': ['Poste A', 'Poste B', 'Poste C'],
+        'Valeurs': pd.array([1, None, 3], dtype='Int32'),
+        'Part': np.array([0.5, 0.25, 1.0], dtype='float32'),
+        'Identifiant': np.array([0, 1, 2]),
+    })
+
+
+@pytest.mark.parametrize('column', ['Région', 'Valeurs', 'Part', 'Identifiant'])
+def test_shared_frame_rejects_in_place_writes(frame, column):
+    shared = share_frame(frame)
+    with pytest.raises(ValueError, match='read-only'):
+        shared.loc[0, column] = shared.loc[1, column]
+    rows = shared.iloc[0:2]
+    with pytest.raises(ValueError, match='read-only'):
+        rows.loc[0, column] = shared.loc[1, column]
+
+
+def test_copies_of_shared_frame_are_writable_and_independent(frame):
+    shared = share_frame(frame)
+    subset = shared.iloc[0:2].copy()
+    subset.loc[0, 'Valeurs'] = 7
+    subset.loc[0, 'Région'] = 'THIES'
+
+    assert shared.loc[0, 'Valeurs'] == 1
+    assert shared.loc[0, 'Région'] == 'DAKAR'
+    assert shared['Nom'].dtype == 'string[pyarrow]'
+
+
+def test_sharing_does_not_copy_numeric_columns(frame):
+    shared = share_frame(frame)
+    ranges = buffer_ranges(shared)
+
+    assert np.shares_memory(shared['Part'].to_numpy(), frame['Part'].to_numpy())
+    assert owned_bytes(shared.iloc[1:3], ranges) == shared.iloc[1:3].index.memory_usage()
@@ -0,0 +1,94 @@
+"""Tests du moteur statistique (`stats_engine`) contre `describe()`, `corr()` et `std()` de pandas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats_engine import (combine_moments, compute_moments, correlation_from_moments, cv_from_moments,
+                          describe_from_moments, mean_std, merge_moments)
+
+
+COLUMNS = ['Valeurs', 'Nb Conventions Signées', 'Part Conventions Signées', 'Vide']
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    # Groupes de tailles inégales, dont un district d'une seule ligne
+    sizes = {('DAKAR', 'Pikine'): 40, ('DAKAR', 'Rufisque'): 7, ('THIES', 'Mbour'): 1, ('THIES', 'Tivaouane'): 22}
+    keys = [key for key, size in sizes.items() for _ in range(size)]
+    n = len(keys)
+    data = pd.DataFrame(keys, columns=['Région', 'District Sanitaire'])
+    data['Valeurs'] = rng.integers(0, 20, n).astype('float64')
+    data['Nb Conventions Signées'] = data['Valeurs'] * 0.5 + rng.normal(0, 1, n)
+    data['Part Conventions Signées'] = rng.uniform(0, 100, n)
+    data['Vide'] = np.nan
+    # Valeurs manquantes éparses : les corrélations portent sur les paires complètes
+    data.loc[rng.choice(n, 8, replace=False), 'Nb Conventions Signées'] = np.nan
+    data.loc[rng.choice(n, 5, replace=False), 'Part Conventions Signées'] = np.nan
+    return data.sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+def test_describe_matches_pandas(frame):
+    moments = merge_moments(compute_moments(frame, columns=COLUMNS))
+    result = describe_from_moments(moments)
+    expected = frame[COLUMNS].describe()
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-10)
+    assert result['Vide'].iloc[1:].isna().all() and result.loc['count', 'Vide'] == 0
+
+
+def test_correlation_matches_pandas(frame):
+    moments = merge_moments(compute_moments(frame, columns=COLUMNS), sketches=False)
+    result = correlation_from_moments(moments)
+
+    pd.testing.assert_frame_equal(result, frame[COLUMNS].corr(), check_exact=False, rtol=1e-10, atol=1e-12)
+
+
+def test_grouped_mean_std_match_pandas(frame):
+    moments = compute_moments(frame, columns=COLUMNS)
+    mean, std = mean_std(merge_moments(moments, by=['Région'], sketches=False))
+    grouped = frame.groupby('Région')[COLUMNS]
+
+    np.testing.assert_allclose(mean, grouped.mean().to_numpy(), rtol=1e-10)
+    np.testing.assert_allclose(std, grouped.std().to_numpy(), rtol=1e-10)
+    # District d'une seule ligne : écart-type non défini, comme pour pandas
+    _, district_std = mean_std(moments)
+    single = moments['keys']['District Sanitaire'].eq('Mbour').to_numpy()
+    assert np.isnan(district_std[single]).all()
+
+
+def test_cv_matches_inline_computation(frame):
+    result = cv_from_moments(merge_moments(compute_moments(frame, columns=COLUMNS), by=['Région'], sketches=False))
+    stats = frame.groupby('Région')[COLUMNS].agg(['mean', 'std']).round(3)
+    expected = {(region, column): stats.loc[region, (column, 'std')] / abs(stats.loc[region, (column, 'mean')]) * 100
+                for region in stats.index for column in COLUMNS if stats.loc[region, (column, 'mean')] != 0}
+
+    assert {(row['Région'], row['Variable']): row['CV (%)'] for _, row in result.iterrows()} == pytest.approx(expected, nan_ok=True)
+
+
+@pytest.mark.parametrize('bounds', [[1], [5, 6, 60], [69]])
+def test_combining_uneven_partitions_matches_single_pass(frame, bounds):
+    edges = [0, *bounds, len(frame)]
+    parts = [compute_moments(frame.iloc[start:end], columns=COLUMNS) for start, end in zip(edges, edges[1:])]
+    combined = merge_moments(combine_moments(*parts))
+    whole = merge_moments(compute_moments(frame, columns=COLUMNS))
+
+    pd.testing.assert_frame_equal(describe_from_moments(combined), describe_from_moments(whole),
+                                  check_exact=False, rtol=1e-10)
+    pd.testing.assert_frame_equal(correlation_from_moments(combined), frame[COLUMNS].corr(),
+                                  check_exact=False, rtol=1e-10, atol=1e-12)
+
+
+def test_combine_keeps_one_group_per_key(frame):
+    combined = combine_moments(compute_moments(frame.iloc[:30], columns=COLUMNS),
+                               compute_moments(frame.iloc[30:], columns=COLUMNS))
+    whole = compute_moments(frame, columns=COLUMNS)
+
+    pd.testing.assert_frame_equal(combined['keys'], whole['keys'])
+    # La moyenne d'une paire sans ligne complète n'a pas de sens : seuls les effectifs sont comparés
+    observed = whole['n'] > 0
+    np.testing.assert_array_equal(combined['n'], whole['n'])
+    for name in ('mean', 'm2', 'comoment'):
+        np.testing.assert_allclose(combined[name][observed], whole[name][observed], rtol=1e-10, atol=1e-9)
+    for name in ('min', 'max'):
+        np.testing.assert_array_equal(combined[name], whole[name])